@@ -112,6 +112,44 @@ class CLI:
                 'removed from the graph. By default, cartography will use a UNIX timestamp as the update tag.'
             ),
         )
+        parser.add_argument(
+            '--sync-max-workers',
+            type=int,
+            default=1,
+            help=(
+                'The maximum number of sync stages (aws, gcp, okta, ...) to run concurrently. Each concurrent stage '
+                'uses its own Neo4j session and stages that depend on the output of other stages wait for them to '
+                'finish. Default = 1, which runs the stages one after another.'
+            ),
+        )
+        parser.add_argument(
+            '--neo4j-write-queue-size',
+            type=int,
+            default=0,
+            help=(
+                'The maximum number of fetched batches that may wait to be written to Neo4j. When greater than 0, the '
+                'AWS EC2, GCP Compute and Azure Compute syncs write to Neo4j on a background thread while they keep '
+                'fetching from the cloud APIs, and block when this many batches are waiting. Default = 0, which '
+                'writes each batch before fetching the next one.'
+            ),
+        )
+        parser.add_argument(
+            '--neo4j-query-instrumentation',
+            action='store_true',
+            help=(
+                'Record the wall time, rows sent and summary counters of every Neo4j query by query shape and by the '
+                'intel module that ran it. The measurements are sent as statsd metrics if --statsd-enabled is on.'
+            ),
+        )
+        parser.add_argument(
+            '--neo4j-query-report-file',
+            type=str,
+            default=None,
+            help=(
+                'Path to write a JSON report of the slowest Neo4j queries of each intel module to at the end of the '
+                'sync. Implies --neo4j-query-instrumentation.'
+            ),
+        )
         parser.add_argument(
             '--aws-sync-all-profiles',
             action='store_true',
@@ -135,6 +173,78 @@ class CLI:
                 'syncing other accounts and delay raising an exception until the very end.'
             ),
         )
+        parser.add_argument(
+            '--aws-account-max-workers',
+            type=int,
+            default=1,
+            help=(
+                'The maximum number of AWS accounts to sync concurrently when syncing multiple accounts. Each account '
+                'is synced with its own boto3 session and Neo4j session. Accounts can share AWSAccount and AWSPrincipal '
+                'nodes, e.g. a role that several accounts trust; the create-indexes stage adds uniqueness constraints '
+                'on their keys so that concurrent accounts do not create duplicates of them. Default = 1, which syncs '
+                'the accounts one after another.'
+            ),
+        )
+        parser.add_argument(
+            '--aws-region-max-workers',
+            type=int,
+            default=1,
+            help=(
+                'The maximum number of AWS regions to fetch concurrently for each resource type within an account. '
+                'The fetched data is still loaded into Neo4j one region at a time. Default = 1, which fetches the '
+                'regions one after another.'
+            ),
+        )
+        parser.add_argument(
+            '--aws-resource-max-workers',
+            type=int,
+            default=1,
+            help=(
+                'The maximum number of AWS resource syncs (s3, kms, ec2:instance, ...) to run concurrently within an '
+                'account. Resource syncs that rely on data from other resource syncs still wait for them, and '
+                'permission_relationships and resourcegroupstaggingapi always run last. Default = 1, which runs the '
+                'resource syncs one after another.'
+            ),
+        )
+        parser.add_argument(
+            '--aws-s3-max-workers',
+            type=int,
+            default=1,
+            help=(
+                'The maximum number of S3 buckets whose location, ACL, policy, encryption, versioning, public access '
+                'block and ownership controls are fetched concurrently. Default = 1, which fetches the buckets one '
+                'after another.'
+            ),
+        )
+        parser.add_argument(
+            '--aws-iam-bulk-fetch',
+            action='store_true',
+            help=(
+                'Fetch AWS IAM groups, roles and the inline and managed policies of all principals with paginated '
+                'GetAccountAuthorizationDetails calls instead of several IAM API calls per principal. Recommended for '
+                'accounts with many principals, where the per-principal calls are throttled.'
+            ),
+        )
+        parser.add_argument(
+            '--aws-permission-relationships-max-workers',
+            type=int,
+            default=1,
+            help=(
+                'The number of worker processes used to calculate the relationships defined in the '
+                '--permission-relationships-file. Each process evaluates a share of the resources of a relationship. '
+                'Default = 1, which calculates them in the cartography process.'
+            ),
+        )
+        parser.add_argument(
+            '--gcp-project-max-workers',
+            type=int,
+            default=1,
+            help=(
+                'The maximum number of GCP projects to sync concurrently. Each project is synced with its own Google '
+                'API clients and Neo4j session. Shared VPC host projects are synced first, one at a time, which needs '
+                'the compute.projects.get permission. Default = 1, which syncs the projects one after another.'
+            ),
+        )
         parser.add_argument(
             '--oci-sync-all-profiles',
             action='store_true',
@@ -388,6 +498,26 @@ class CLI:
                 'The path to kubeconfig file specifying context to access K8s cluster(s).'
             ),
         )
+        parser.add_argument(
+            '--k8s-page-size',
+            type=int,
+            default=None,
+            help=(
+                'List K8s pods and services in pages of this many items and load each page into Neo4j as it arrives, '
+                'so that memory use does not grow with the size of the cluster. By default everything is listed and '
+                'loaded at once.'
+            ),
+        )
+        parser.add_argument(
+            '--k8s-cluster-max-workers',
+            type=int,
+            default=1,
+            help=(
+                'The maximum number of K8s clusters (kubeconfig contexts) to sync concurrently. Each cluster is synced '
+                'with its own Neo4j session. Contexts that point to the same API server are always synced one after '
+                'another. Default = 1, which syncs the clusters one after another.'
+            ),
+        )
         parser.add_argument(
             '--nist-cve-url',
             type=str,
@@ -403,6 +533,16 @@ class CLI:
                 'If set, CVE data will be synced from NIST.'
             ),
         )
+        parser.add_argument(
+            '--cve-cache-dir',
+            type=str,
+            default=None,
+            help=(
+                'A directory to cache the downloaded NIST CVE feeds in. Feeds are only downloaded and loaded again '
+                'when the sha256 in their .meta file changes, and the cached feeds are used when NIST cannot be '
+                'reached.'
+            ),
+        )
         parser.add_argument(
             '--statsd-enabled',
             action='store_true',
@@ -7,6 +7,12 @@ from typing import Union
 
 import neo4j
 
+from cartography.util import batch
+
+# Number of dicts written per UNWIND transaction by `load_graph_data()`. Large enough to amortize the Bolt round-trip,
+# small enough to keep each transaction's memory footprint on the Neo4j server reasonable.
+DEFAULT_BATCH_SIZE = 10000
+
 
 def read_list_of_values_tx(tx: neo4j.Transaction, query: str, **kwargs) -> List[Union[str, int]]:
     """
@@ -146,3 +152,57 @@ def read_single_dict_tx(tx: neo4j.Transaction, query: str, **kwargs) -> Dict[str
 
     result.consume()
     return value
+
+
+def write_list_of_dicts_tx(tx: neo4j.Transaction, query: str, **kwargs) -> None:
+    """
+    Runs the given write query in the given transaction object and consumes the result.
+
+    Example usage:
+        query = "UNWIND {DictList} AS item MERGE (a:TestNode{name: item.name}) SET a.age = item.age"
+
+        neo4j_session.write_transaction(write_list_of_dicts_tx, query, DictList=[{'name': 'Bart', 'age': 10}])
+
+    :param tx: A neo4j write transaction object
+    :param query: A neo4j query string that writes data to the graph.
+    :param kwargs: kwargs that are passed to tx.run()'s kwargs argument.
+    :return: None
+    """
+    tx.run(query, kwargs).consume()
+
+
+def load_graph_data(
+    neo4j_session: neo4j.Session,
+    query: str,
+    dict_list: List[Dict[str, Any]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    list_param_name: str = 'DictList',
+    **kwargs,
+) -> None:
+    """
+    Writes a list of dicts to the graph in chunks of `batch_size`, one write transaction per chunk. This replaces the
+    pattern of calling `neo4j_session.run()` once per item, which costs a network round-trip and a transaction for
+    every row.
+
+    Example usage:
+        query = "UNWIND {DictList} AS item MERGE (a:TestNode{id: item.Id}) SET a.name = item.Name"
+
+        load_graph_data(neo4j_session, query, [{'Id': 1, 'Name': 'Homer'}])
+
+    :param neo4j_session: The Neo4j session
+    :param query: A neo4j query string that UNWINDs the `{<list_param_name>}` parameter.
+    :param dict_list: The data to write.
+    :param batch_size: The maximum number of dicts written per transaction.
+    :param list_param_name: The name of the query parameter that receives each chunk of `dict_list`.
+    :param kwargs: Other query parameters, passed unchanged with every chunk.
+    :return: None
+    """
+    if batch_size < 1:
+        raise ValueError(f'batch_size must be a positive integer, got {batch_size}.')
+    for data_batch in batch(dict_list, size=batch_size):
+        neo4j_session.write_transaction(
+            write_list_of_dicts_tx,
+            query,
+            **{list_param_name: data_batch},
+            **kwargs,
+        )
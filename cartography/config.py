@@ -17,12 +17,49 @@ class Config:
         See https://neo4j.com/docs/driver-manual/1.7/client-applications/. Optional.
     :type update_tag: int
     :param update_tag: Update tag for a cartography sync run. Optional.
+    :type sync_max_workers: int
+    :param sync_max_workers: Maximum number of sync stages to run concurrently. Stages are run one after another if
+        this is 1 (default). Optional.
+    :type neo4j_write_queue_size: int
+    :param neo4j_write_queue_size: Maximum number of fetched batches that may wait to be written to Neo4j. If greater
+        than 0, the AWS EC2, GCP Compute and Azure Compute syncs write to Neo4j on a background thread while they keep
+        fetching from the cloud APIs. Writes happen inline if this is 0 (default). Optional.
+    :type neo4j_query_instrumentation: bool
+    :param neo4j_query_instrumentation: If True, record the wall time, rows sent and summary counters of every Neo4j
+        query by query shape and calling module, and send them as statsd metrics if statsd is enabled. Optional.
+    :type neo4j_query_report_file: str
+    :param neo4j_query_report_file: Path to write a JSON report of the slowest Neo4j queries of each intel module to
+        at the end of the sync. Turns on neo4j_query_instrumentation. Optional.
     :type aws_sync_all_profiles: bool
     :param aws_sync_all_profiles: If True, AWS sync will run for all non-default profiles in the AWS_CONFIG_FILE. If
         False (default), AWS sync will run using the default credentials only. Optional.
     :type aws_best_effort_mode: bool
     :param aws_best_effort_mode: If True, AWS sync will not raise any exceptions, just log. If False (default),
         exceptions will be raised.
+    :type aws_account_max_workers: int
+    :param aws_account_max_workers: Maximum number of AWS accounts to sync concurrently, each with its own boto3 and
+        Neo4j session. Accounts are synced one after another if this is 1 (default). Optional.
+    :type aws_region_max_workers: int
+    :param aws_region_max_workers: Maximum number of regional AWS API calls to make concurrently for each resource
+        type. Results are still loaded into Neo4j one region at a time. Regions are fetched one after another if this
+        is 1 (default). Optional.
+    :type aws_resource_max_workers: int
+    :param aws_resource_max_workers: Maximum number of AWS resource syncs (s3, kms, ec2:instance, ...) to run
+        concurrently within an account, each with its own Neo4j session. Syncs that depend on the data of other syncs
+        still wait for them. Resource syncs run one after another if this is 1 (default). Optional.
+    :type aws_s3_max_workers: int
+    :param aws_s3_max_workers: Maximum number of S3 buckets whose location and details are fetched concurrently.
+        Buckets are fetched one after another if this is 1 (default). Optional.
+    :type aws_iam_bulk_fetch: bool
+    :param aws_iam_bulk_fetch: If True, AWS IAM groups, roles and the policies of all principals are fetched with
+        paginated GetAccountAuthorizationDetails calls instead of several API calls per principal. Optional.
+    :type aws_permission_relationships_max_workers: int
+    :param aws_permission_relationships_max_workers: Number of worker processes used to calculate AWS permission
+        relationships, each evaluating a share of the resources. Calculated in the sync process if this is 1
+        (default). Optional.
+    :type gcp_project_max_workers: int
+    :param gcp_project_max_workers: Maximum number of GCP projects to sync concurrently, each with its own Google API
+        resource objects and Neo4j session. Projects are synced one after another if this is 1 (default). Optional.
     :type azure_sync_all_subscriptions: bool
     :param azure_sync_all_subscriptions: If True, Azure sync will run for all profiles in azureProfile.json. If
         False (default), Azure sync will run using current user session via CLI credentials. Optional.
@@ -71,10 +108,19 @@ class Config:
     :param statsd_port: If statsd_enabled is True, send metrics to this port on statsd_host. Optional.
     :type: k8s_kubeconfig: str
     :param k8s_kubeconfig: Path to kubeconfig file for kubernetes cluster(s). Optional
+    :type k8s_page_size: int
+    :param k8s_page_size: If set, list Kubernetes pods and services in pages of this many items and load each page
+        into Neo4j as it arrives. Everything is listed and loaded at once if this is None (default). Optional.
+    :type k8s_cluster_max_workers: int
+    :param k8s_cluster_max_workers: Maximum number of Kubernetes clusters to sync concurrently, each with its own Neo4j
+        session. Clusters are synced one after another if this is 1 (default). Optional.
     :type: pagerduty_api_key: str
     :param pagerduty_api_key: API authentication key for pagerduty. Optional.
     :type: nist_cve_url: str
     :param nist_cve_url: NIST CVE data provider base URI, e.g. https://nvd.nist.gov/feeds/json/cve/1.1. Optional.
+    :type cve_cache_dir: str
+    :param cve_cache_dir: Directory to cache downloaded NVD feed archives in. Feeds whose content is unchanged since
+        the last load are skipped, and cached archives are used if NVD cannot be reached. Optional.
     """
 
     def __init__(
@@ -84,8 +130,19 @@ class Config:
         neo4j_password=None,
         neo4j_max_connection_lifetime=None,
         update_tag=None,
+        sync_max_workers=1,
+        neo4j_write_queue_size=0,
+        neo4j_query_instrumentation=False,
+        neo4j_query_report_file=None,
         aws_sync_all_profiles=False,
         aws_best_effort_mode=False,
+        aws_account_max_workers=1,
+        aws_region_max_workers=1,
+        aws_resource_max_workers=1,
+        aws_s3_max_workers=1,
+        aws_iam_bulk_fetch=False,
+        aws_permission_relationships_max_workers=1,
+        gcp_project_max_workers=1,
         aws_resource_name=None,
         aws_resource_type=None,
         aws_region=None,
@@ -109,6 +166,8 @@ class Config:
         jamf_user=None,
         jamf_password=None,
         k8s_kubeconfig=None,
+        k8s_page_size=None,
+        k8s_cluster_max_workers=1,
         statsd_enabled=False,
         statsd_prefix=None,
         statsd_host=None,
@@ -116,6 +175,7 @@ class Config:
         pagerduty_api_key=None,
         nist_cve_url=None,
         cve_enabled=False,
+        cve_cache_dir=None,
         crowdstrike_client_id=None,
         crowdstrike_client_secret=None,
         crowdstrike_api_url=None,
@@ -125,8 +185,19 @@ class Config:
         self.neo4j_password = neo4j_password
         self.neo4j_max_connection_lifetime = neo4j_max_connection_lifetime
         self.update_tag = update_tag
+        self.sync_max_workers = sync_max_workers
+        self.neo4j_write_queue_size = neo4j_write_queue_size
+        self.neo4j_query_instrumentation = neo4j_query_instrumentation
+        self.neo4j_query_report_file = neo4j_query_report_file
         self.aws_sync_all_profiles = aws_sync_all_profiles
         self.aws_best_effort_mode = aws_best_effort_mode
+        self.aws_account_max_workers = aws_account_max_workers
+        self.aws_region_max_workers = aws_region_max_workers
+        self.aws_resource_max_workers = aws_resource_max_workers
+        self.aws_s3_max_workers = aws_s3_max_workers
+        self.aws_iam_bulk_fetch = aws_iam_bulk_fetch
+        self.aws_permission_relationships_max_workers = aws_permission_relationships_max_workers
+        self.gcp_project_max_workers = gcp_project_max_workers
         self.aws_resource_type = aws_resource_type
         self.aws_resource_name = aws_resource_name
         self.aws_region = aws_region
@@ -150,6 +221,8 @@ class Config:
         self.jamf_user = jamf_user
         self.jamf_password = jamf_password
         self.k8s_kubeconfig = k8s_kubeconfig
+        self.k8s_page_size = k8s_page_size
+        self.k8s_cluster_max_workers = k8s_cluster_max_workers
         self.statsd_enabled = statsd_enabled
         self.statsd_prefix = statsd_prefix
         self.statsd_host = statsd_host
@@ -157,6 +230,7 @@ class Config:
         self.pagerduty_api_key = pagerduty_api_key
         self.nist_cve_url = nist_cve_url
         self.cve_enabled = cve_enabled
+        self.cve_cache_dir = cve_cache_dir
         self.crowdstrike_client_id = crowdstrike_client_id
         self.crowdstrike_client_secret = crowdstrike_client_secret
         self.crowdstrike_api_url = crowdstrike_api_url
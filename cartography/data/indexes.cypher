@@ -12,7 +12,6 @@ CREATE INDEX ON :APIGatewayResource(id);
 CREATE INDEX ON :APIGatewayResource(lastupdated);
 CREATE INDEX ON :APIGatewayStage(id);
 CREATE INDEX ON :APIGatewayStage(lastupdated);
-CREATE INDEX ON :AWSAccount(id);
 CREATE INDEX ON :AWSAccount(lastupdated);
 CREATE INDEX ON :AWSCidrBlock(id);
 CREATE INDEX ON :AWSCidrBlock(lastupdated);
@@ -44,7 +43,6 @@ CREATE INDEX ON :AWSPolicy(name);
 CREATE INDEX ON :AWSPolicy(lastupdated);
 CREATE INDEX ON :AWSPolicyStatement(id);
 CREATE INDEX ON :AWSPolicyStatement(lastupdated);
-CREATE INDEX ON :AWSPrincipal(arn);
 CREATE INDEX ON :AWSPrincipal(lastupdated);
 CREATE INDEX ON :AWSRole(arn);
 CREATE INDEX ON :AWSRole(lastupdated);
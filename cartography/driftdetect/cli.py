@@ -98,6 +98,15 @@ class CLI:
                 'them. Drift-detection does not guarantee the order in which the detector jobs are executed.'
             ),
         )
+        parser_get_state.add_argument(
+            '--max-workers',
+            type=int,
+            default=1,
+            help=(
+                'The number of detector queries to run concurrently, each on its own Neo4j session. Defaults to 1, '
+                'which runs the detectors one after another.'
+            ),
+        )
         parser_get_drift = subparsers.add_parser(
             name='get-drift',
             help=(
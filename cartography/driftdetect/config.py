@@ -14,6 +14,8 @@ class UpdateConfig:
     :param neo4j_user: User name for a Neo4j graph database service. Optional.
     :type neo4j_password: string
     :param neo4j_password: Password for a Neo4j graph database service. Optional.
+    :type max_workers: int
+    :param max_workers: Number of detector queries to run concurrently, each on its own Neo4j session. Optional.
     """
 
     def __init__(
@@ -22,11 +24,13 @@ class UpdateConfig:
         neo4j_uri,
         neo4j_user=None,
         neo4j_password=None,
+        max_workers=1,
     ):
         self.neo4j_uri = neo4j_uri
         self.neo4j_user = neo4j_user
         self.neo4j_password = neo4j_password
         self.drift_detection_directory = drift_detection_directory
+        self.max_workers = max_workers
 
 
 class GetDriftConfig:
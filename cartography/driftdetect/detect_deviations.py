@@ -21,7 +21,7 @@ def run_drift_detection(config):
         shortcut_serializer = ShortcutSchema()
         shortcut_data = FileSystem.load(os.path.join(config.query_directory, "shortcut.json"))
         shortcut = shortcut_serializer.load(shortcut_data)
-        start_state_data = FileSystem.load(
+        start_state_data = FileSystem.load_state(
             os.path.join(
                 config.query_directory, shortcut.shortcuts.get(
                     config.start_state,
@@ -30,7 +30,7 @@ def run_drift_detection(config):
             ),
         )
         start_state = state_serializer.load(start_state_data)
-        end_state_data = FileSystem.load(
+        end_state_data = FileSystem.load_state(
             os.path.join(
                 config.query_directory, shortcut.shortcuts.get(
                     config.end_state,
@@ -39,6 +39,11 @@ def run_drift_detection(config):
             ),
         )
         end_state = state_serializer.load(end_state_data)
+        if end_state.primary_key:
+            new_results, missing_results, changed_results = perform_keyed_drift_detection(start_state, end_state)
+            return get_drift_as_json(
+                new_results, missing_results, end_state.name, end_state.properties, changed_results,
+            )
         new_results, missing_results = perform_drift_detection(start_state, end_state)
         return get_drift_as_json(new_results, missing_results, end_state.name, end_state.properties)
     except ValidationError as err:
@@ -70,15 +75,66 @@ def perform_drift_detection(start_state, end_state):
     :return: tuple of additions and subtractions between the end and start detector in the form of drift_info_detector
     pairs
     """
+    _check_comparable(start_state, end_state)
+    new_results = compare_states(start_state, end_state)
+    missing_results = compare_states(end_state, start_state)
+    return new_results, missing_results
+
+
+def perform_keyed_drift_detection(start_state, end_state):
+    """
+    Returns differences between two States whose results are identified by the end state's primary_key property.
+    Results whose key is in both states but whose other properties differ are reported as changed instead of as a
+    removal plus an addition.
+
+    :type start_state: State
+    :param start_state: The earlier state chronologically to be compared to.
+    :type end_state: State
+    :param end_state: The later state chronologically to be compared to.
+    :return: tuple of additions, subtractions, and (start result, end result) pairs of changed results
+    """
+    _check_comparable(start_state, end_state)
+    if end_state.primary_key not in end_state.properties:
+        raise ValueError(f"Primary key {end_state.primary_key} is not one of the state properties.")
+    key_index = end_state.properties.index(end_state.primary_key)
+    start_by_key = _index_results(start_state.results, key_index)
+    end_by_key = _index_results(end_state.results, key_index)
+
+    new_results = []
+    missing_results = []
+    changed_results = []
+    for key, end_results in end_by_key.items():
+        start_results = start_by_key.get(key, [])
+        added = [result for result in end_results if result not in start_results]
+        removed = [result for result in start_results if result not in end_results]
+        if len(added) == 1 and len(removed) == 1:
+            changed_results.append((_parse_drift(removed[0]), _parse_drift(added[0])))
+        else:
+            new_results.extend(_parse_drift(result) for result in added)
+            missing_results.extend(_parse_drift(result) for result in removed)
+    for key, start_results in start_by_key.items():
+        if key not in end_by_key:
+            missing_results.extend(_parse_drift(result) for result in start_results)
+    return new_results, missing_results, changed_results
+
+
+def _check_comparable(start_state, end_state):
     if start_state.name != end_state.name:
         raise ValueError("State names do not match.")
     if start_state.validation_query != end_state.validation_query:
         raise ValueError("State queries do not match.")
     if start_state.properties != end_state.properties:
         raise ValueError("State properties do not match.")
-    new_results = compare_states(start_state, end_state)
-    missing_results = compare_states(end_state, start_state)
-    return new_results, missing_results
+
+
+def _index_results(results, key_index):
+    """
+    Group results by the value of their key property, keeping the results of each key in order.
+    """
+    index = {}
+    for result in results:
+        index.setdefault(result[key_index], []).append(result)
+    return index
 
 
 def compare_states(start_state, end_state):
@@ -91,16 +147,20 @@ def compare_states(start_state, end_state):
     :param end_state: The later state chronologically to be compared to.
     :return: list of tuples of differences between states in the form (dictionary, State object)
     """
-    differences = []
-    for result in end_state.results:
-        if result in start_state.results:
-            continue
-        drift = []
-        for field in result:
-            value = field.split("|")
-            if len(value) > 1:
-                drift.append(value)
-            else:
-                drift.append(field)
-        differences.append(drift)
-    return differences
+    # Results are lists of strings, so index them as tuples for constant time lookups.
+    start_results = {tuple(result) for result in start_state.results}
+    return [_parse_drift(result) for result in end_state.results if tuple(result) not in start_results]
+
+
+def _parse_drift(result):
+    """
+    Split the list fields of a result, which get_state() joined with "|", back into lists.
+    """
+    drift = []
+    for field in result:
+        value = field.split("|")
+        if len(value) > 1:
+            drift.append(value)
+        else:
+            drift.append(field)
+    return drift
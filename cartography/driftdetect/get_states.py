@@ -1,6 +1,10 @@
+import heapq
+import json
 import logging
 import os.path
+import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 import neo4j.exceptions
 from marshmallow import ValidationError
@@ -10,10 +14,15 @@ from cartography.driftdetect.add_shortcut import add_shortcut
 from cartography.driftdetect.serializers import ShortcutSchema
 from cartography.driftdetect.serializers import StateSchema
 from cartography.driftdetect.storage import FileSystem
+from cartography.driftdetect.storage import get_storage
 from cartography.driftdetect.util import valid_directory
 
 logger = logging.getLogger(__name__)
 
+# Number of results that are sorted in memory. Larger results are sorted in chunks of this size that are spilled to
+# temporary files and merged.
+EXTERNAL_SORT_CHUNK_SIZE = 100000
+
 
 def run_get_states(config):
     """
@@ -67,27 +76,53 @@ def run_get_states(config):
             )
         return
 
-    with neo4j_driver.session() as session:
-        filename = '.'.join([str(i) for i in time.gmtime()] + ["json"])
-        state_serializer = StateSchema()
-        shortcut_serializer = ShortcutSchema()
-        for query_directory in FileSystem.walk(config.drift_detection_directory):
-            try:
-                get_query_state(session, query_directory, state_serializer, FileSystem, filename)
-                add_shortcut(FileSystem, shortcut_serializer, query_directory, 'most-recent', filename)
-            except ValidationError as err:
-                msg = "Unable to create State for directory {}, with data \n{}".format(
-                    query_directory,
-                    err.messages,
-                )
-                logger.exception(msg)
-            except KeyError as err:
-                msg = f"Could not find {err} field in state template for directory {query_directory}."
-                logger.exception(msg)
-            except FileNotFoundError as err:
-                logger.exception(err)
-            except neo4j.exceptions.CypherSyntaxError as err:
-                logger.exception(err)
+    timestamp = '.'.join([str(i) for i in time.gmtime()])
+    query_directories = list(FileSystem.walk(config.drift_detection_directory))
+    max_workers = getattr(config, 'max_workers', 1)
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(lambda d: update_query_directory(neo4j_driver, d, timestamp), query_directories))
+    else:
+        for query_directory in query_directories:
+            update_query_directory(neo4j_driver, query_directory, timestamp)
+
+
+def update_query_directory(neo4j_driver, query_directory, timestamp):
+    """
+    Gets the most recent state of a query on a new session and points the 'most-recent' shortcut at it. The state is
+    written with the storage named by the optional "storage" field of the directory's template, JSON by default.
+    Errors are logged so that the other query directories are still updated.
+
+    :type neo4j_driver: neo4j Driver.
+    :param neo4j_driver: neo4j driver to open the session with. Drivers, unlike sessions, can be shared by threads.
+    :type query_directory: String.
+    :param query_directory: Path to query directory.
+    :type timestamp: String.
+    :param timestamp: Filename of the new state, without its extension.
+    :return:
+    """
+    try:
+        template_data = FileSystem.load(os.path.join(query_directory, "template.json"))
+        storage = get_storage(template_data.get('storage'))
+        filename = f'{timestamp}.{storage.state_extension}'
+        with neo4j_driver.session() as session:
+            get_query_state(session, query_directory, StateSchema(), storage, filename)
+        add_shortcut(FileSystem, ShortcutSchema(), query_directory, 'most-recent', filename)
+    except ValidationError as err:
+        msg = "Unable to create State for directory {}, with data \n{}".format(
+            query_directory,
+            err.messages,
+        )
+        logger.exception(msg)
+    except KeyError as err:
+        msg = f"Could not find {err} field in state template for directory {query_directory}."
+        logger.exception(msg)
+    except FileNotFoundError as err:
+        logger.exception(err)
+    except neo4j.exceptions.CypherSyntaxError as err:
+        logger.exception(err)
+    except ValueError as err:
+        logger.exception(f"Unable to create State for directory {query_directory}: {err}")
 
 
 def get_query_state(session, query_directory, state_serializer, storage, filename):
@@ -104,14 +139,19 @@ def get_query_state(session, query_directory, state_serializer, storage, filenam
     :param storage: Storage object to supports loading, writing, and walking.
     :type filename: String.
     :param filename: Path to filename.
-    :return: The created state.
+    :return: The created state. Its results are streamed to the state file and not kept.
     """
     state_data = storage.load(os.path.join(query_directory, "template.json"))
+    state_data.pop('storage', None)
     state = state_serializer.load(state_data)
-    get_state(session, state)
+    new_results = session.run(state.validation_query)
+    logger.debug(f"Updating results for {state.name}")
+    state.properties = new_results.keys()
+    state.results = []
     new_state_data = state_serializer.dump(state)
+    del new_state_data['results']
     fp = os.path.join(query_directory, filename)
-    storage.write(new_state_data, fp)
+    storage.write_state(new_state_data, iter_sorted_results(new_results), fp)
     return state
 
 
@@ -130,16 +170,64 @@ def get_state(session, state):
     logger.debug(f"Updating results for {state.name}")
 
     state.properties = new_results.keys()
-    results = []
-
-    for record in new_results:
-        values = []
-        for field in record.values():
-            if isinstance(field, list):
-                s = "|".join(sorted(str(i) for i in field))
-                values.append(s)
-            else:
-                values.append(str(field))
-        results.append(values)
-
-    state.results = sorted(results)
+    state.results = list(iter_sorted_results(new_results))
+
+
+def stringify_record(record):
+    """
+    Converts the values of a record to strings, joining list values with "|".
+
+    :type record: neo4j Record
+    :param record: Record returned by a validation query.
+    :return: List of Strings.
+    """
+    values = []
+    for field in record.values():
+        if isinstance(field, list):
+            s = "|".join(sorted(str(i) for i in field))
+            values.append(s)
+        else:
+            values.append(str(field))
+    return values
+
+
+def iter_sorted_results(records, chunk_size=EXTERNAL_SORT_CHUNK_SIZE):
+    """
+    Yields the stringified records in sorted order. Up to chunk_size records are sorted in memory, more are sorted with
+    an external merge sort so that memory use stays bounded however large the result is.
+
+    :type records: Iterable of neo4j Records
+    :param records: Records returned by a validation query.
+    :type chunk_size: int
+    :param chunk_size: Number of records to sort in memory.
+    :yield: List of Strings.
+    """
+    chunk = []
+    chunk_files = []
+    try:
+        for record in records:
+            chunk.append(stringify_record(record))
+            if len(chunk) >= chunk_size:
+                chunk_files.append(_spill_chunk(sorted(chunk)))
+                chunk = []
+        chunk.sort()
+        if not chunk_files:
+            yield from chunk
+            return
+        readers = [(json.loads(line) for line in chunk_file) for chunk_file in chunk_files]
+        yield from heapq.merge(chunk, *readers)
+    finally:
+        for chunk_file in chunk_files:
+            chunk_file.close()
+
+
+def _spill_chunk(results):
+    """
+    Writes sorted results to a temporary file, one JSON list per line, and returns the file rewound for reading.
+    """
+    chunk_file = tempfile.TemporaryFile(mode='w+')
+    for result in results:
+        chunk_file.write(json.dumps(result))
+        chunk_file.write('\n')
+    chunk_file.seek(0)
+    return chunk_file
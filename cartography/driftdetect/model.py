@@ -15,6 +15,9 @@ class State:
     :param properties: List of keys in order that the cypher query will return.
     :type results: List of List of Strings
     :param results: List of all results of running the validation query
+    :type primary_key: String
+    :param primary_key: Optional property that identifies a result. If set, drift detection also reports results whose
+        other properties changed.
     """
 
     def __init__(
@@ -23,9 +26,11 @@ class State:
             validation_query,
             properties,
             results,
+            primary_key=None,
     ):
 
         self.name = name
         self.validation_query = validation_query
         self.properties = properties
         self.results = results
+        self.primary_key = primary_key
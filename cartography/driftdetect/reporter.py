@@ -58,9 +58,17 @@ def report_drift(new_results, missing_results, state_name, state_properties):
     if missing_results:
         report_drift_missing(missing_results, state_properties)
 
-def get_drift_as_json(new_results, missing_results, state_name, state_properties):
+def get_drift_as_json(new_results, missing_results, state_name, state_properties, changed_results=None):
     drift = {
         'added': report_as_json(new_results, state_properties),
         'removed': report_as_json(missing_results, state_properties)
     }
+    if changed_results is not None:
+        drift['changed'] = [
+            {
+                'before': report_as_json([before], state_properties)[0],
+                'after': report_as_json([after], state_properties)[0],
+            }
+            for before, after in changed_results
+        ]
     return drift
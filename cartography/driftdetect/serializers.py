@@ -14,6 +14,7 @@ class StateSchema(Schema):
     validation_query = fields.Str()
     properties = fields.List(fields.Str())
     results = fields.List(fields.List(fields.Str()))
+    primary_key = fields.Str(allow_none=True)
 
     @post_load
     def make_state(self, data, **kwargs):
@@ -22,6 +23,7 @@ class StateSchema(Schema):
             data['validation_query'],
             data['properties'],
             data['results'],
+            data.get('primary_key'),
         )
 
 
@@ -1,8 +1,22 @@
 import json
+import mmap
 import os
+import struct
+import sys
+import zlib
+from array import array
+
+# Compact state files start with this and end with the offset of their header, see CompactFileSystem.
+COMPACT_MAGIC = b'CARTOGRAPHY-STATE-1\n'
+_OFFSET = struct.Struct('<Q')
 
 
 class FileSystem:
+    """
+    Stores states as indented, key-sorted JSON. This is the default storage.
+    """
+    state_extension = 'json'
+
     @classmethod
     def load(cls, file_path):
         """
@@ -29,6 +43,76 @@ class FileSystem:
             json.dump(data, json_file, sort_keys=True, indent=4)
             json_file.write('\n')
 
+    @classmethod
+    def write_stream(cls, data, stream_key, items, file_path):
+        """
+        Writes a JSON object (dict) to a file like write(), except that the list stored under stream_key is taken from
+        an iterable and written as it is consumed, so that it is never held in memory. The file is only put in place
+        once it has been written completely.
+        :type data: Dict
+        :param data: Dictionary in JSON format, without stream_key.
+        :type stream_key: string
+        :param stream_key: Key of the streamed list.
+        :type items: Iterable
+        :param items: Items of the streamed list.
+        :type file_path: string
+        :param file_path: Filepath to be written to.
+        :return:
+        """
+        tmp_path = f'{file_path}.tmp'
+        try:
+            with open(tmp_path, 'w') as json_file:
+                json_file.write('{')
+                separator = '\n'
+                for key in sorted(set(data) | {stream_key}):
+                    json_file.write(f'{separator}    {json.dumps(key)}: ')
+                    separator = ',\n'
+                    if key == stream_key:
+                        cls._write_list(json_file, items)
+                    else:
+                        json_file.write(_indent(json.dumps(data[key], sort_keys=True, indent=4), 1))
+                json_file.write('\n}\n')
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def _write_list(cls, json_file, items):
+        separator = '[\n'
+        for item in items:
+            json_file.write(separator + '        ' + _indent(json.dumps(item, sort_keys=True, indent=4), 2))
+            separator = ',\n'
+        json_file.write('[]' if separator == '[\n' else '\n    ]')
+
+    @classmethod
+    def load_state(cls, file_path):
+        """
+        Loads a state (dict) from a file written by any storage.
+        :type file_path: string.
+        :param file_path: Filepath for the file.
+        :return: Dictionary in JSON format.
+        """
+        with open(file_path, 'rb') as state_file:
+            is_compact = state_file.read(len(COMPACT_MAGIC)) == COMPACT_MAGIC
+        if is_compact:
+            return CompactFileSystem.load_compact(file_path)
+        return cls.load(file_path)
+
+    @classmethod
+    def write_state(cls, data, results, file_path):
+        """
+        Writes a state to a file.
+        :type data: Dict
+        :param data: State in JSON format, without its results.
+        :type results: Iterable of List of Strings.
+        :param results: Results of the state. Consumed while the file is written.
+        :type file_path: string
+        :param file_path: Filepath to be written to.
+        :return:
+        """
+        cls.write_stream(data, 'results', results, file_path)
+
     @classmethod
     def walk(cls, drift_detection_directory):
         """
@@ -50,3 +134,113 @@ class FileSystem:
         :return: Bool
         """
         return os.path.isfile(filename)
+
+
+def _indent(text, level):
+    """
+    Indents every line but the first of a JSON document nested `level` levels deep in a document written with indent=4.
+    """
+    return text.replace('\n', '\n' + '    ' * level)
+
+
+class CompactFileSystem(FileSystem):
+    """
+    Stores the results of states in compressed columns, which are much smaller and faster to load than JSON for large
+    results. Every other file, e.g. templates and shortcuts, is still JSON.
+
+    A compact state file is COMPACT_MAGIC, then two zlib-compressed blocks per result column: a JSON list of the
+    distinct values of the column, and the index into that list of each row's value as little-endian uint32s. Then
+    comes a zlib-compressed JSON header with the other fields of the state and the size of every block, and finally
+    the offset of the header as a little-endian uint64. Files are memory-mapped when read.
+    """
+    state_extension = 'state'
+
+    @classmethod
+    def write_state(cls, data, results, file_path):
+        columns = None
+        row_count = 0
+        for result in results:
+            if columns is None:
+                columns = [({}, array('I')) for _ in result]
+            if len(result) != len(columns):
+                raise ValueError(f"Result {result} does not have {len(columns)} fields.")
+            for value, (codes_by_value, codes) in zip(result, columns):
+                codes.append(codes_by_value.setdefault(value, len(codes_by_value)))
+            row_count += 1
+
+        tmp_path = f'{file_path}.tmp'
+        try:
+            with open(tmp_path, 'wb') as state_file:
+                state_file.write(COMPACT_MAGIC)
+                blocks = []
+                for codes_by_value, codes in columns or []:
+                    if sys.byteorder == 'big':
+                        codes.byteswap()
+                    values_block = zlib.compress(json.dumps(list(codes_by_value)).encode('utf-8'))
+                    codes_block = zlib.compress(codes.tobytes())
+                    state_file.write(values_block)
+                    state_file.write(codes_block)
+                    blocks.append([len(values_block), len(codes_block)])
+                header_offset = state_file.tell()
+                header = {'data': data, 'rows': row_count, 'blocks': blocks}
+                state_file.write(zlib.compress(json.dumps(header, sort_keys=True).encode('utf-8')))
+                state_file.write(_OFFSET.pack(header_offset))
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def load_compact(cls, file_path):
+        """
+        Loads a state (dict) from a compact state file.
+        :type file_path: string.
+        :param file_path: Filepath for the file.
+        :return: Dictionary in JSON format.
+        """
+        with open(file_path, 'rb') as state_file, mmap.mmap(state_file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                if view[:len(COMPACT_MAGIC)] != COMPACT_MAGIC:
+                    raise ValueError(f"{file_path} is not a compact state file.")
+                header_offset, = _OFFSET.unpack(view[-_OFFSET.size:])
+                header = json.loads(zlib.decompress(view[header_offset:-_OFFSET.size]))
+                columns = []
+                offset = len(COMPACT_MAGIC)
+                for values_size, codes_size in header['blocks']:
+                    values = json.loads(zlib.decompress(view[offset:offset + values_size]))
+                    offset += values_size
+                    codes = array('I')
+                    codes.frombytes(zlib.decompress(view[offset:offset + codes_size]))
+                    offset += codes_size
+                    if sys.byteorder == 'big':
+                        codes.byteswap()
+                    columns.append([values[code] for code in codes])
+            finally:
+                view.release()
+        data = header['data']
+        if columns:
+            data['results'] = [list(result) for result in zip(*columns)]
+        else:
+            data['results'] = [[] for _ in range(header['rows'])]
+        return data
+
+
+STORAGES = {
+    'json': FileSystem,
+    'compact': CompactFileSystem,
+}
+
+
+def get_storage(name):
+    """
+    Returns the storage with the given name, see STORAGES. None selects the default JSON storage.
+    :type name: string
+    :param name: Name of the storage.
+    :return: Storage class.
+    """
+    if name is None:
+        return FileSystem
+    if name not in STORAGES:
+        raise ValueError(f"Unknown storage {name}, expected one of {', '.join(sorted(STORAGES))}.")
+    return STORAGES[name]
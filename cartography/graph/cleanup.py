@@ -0,0 +1,232 @@
+import logging
+import re
+import time
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+from typing import Optional
+from typing import Tuple
+
+import neo4j
+import neo4j.exceptions
+
+from cartography.stats import get_stats_client
+
+
+logger = logging.getLogger(__name__)
+stat_handler = get_stats_client(__name__)
+
+# Matches the iterative cleanup statements used by the JSON jobs, e.g.
+#   MATCH (n:EC2Instance)<-[:RESOURCE]-(:AWSAccount{id: {AWS_ID}}) WHERE n.lastupdated <> {UPDATE_TAG}
+#   WITH n LIMIT {LIMIT_SIZE} DETACH DELETE (n)
+# optionally followed by `RETURN COUNT(*) AS TotalCompleted`.
+_ITERATIVE_DELETE_RE = re.compile(
+    r'^\s*(?P<match>.+?)\s+WITH\s+(?:DISTINCT\s+)?(?P<var>\w+)\s+LIMIT\s+\{LIMIT_SIZE\}\s+'
+    r'(?P<detach>DETACH\s+)?DELETE\s+\(?\s*(?P=var)\s*\)?'
+    r'(?:\s+RETURN\s+COUNT\(\*\)\s+AS\s+\w+)?\s*;?\s*$',
+    re.IGNORECASE | re.DOTALL,
+)
+
+
+_WHERE_RE = re.compile(r'\bWHERE\b', re.IGNORECASE)
+_CLAUSE_RE = re.compile(r'\b(?:MATCH|WITH|UNWIND)\b', re.IGNORECASE)
+
+
+def _add_predicate(match_clause: str, predicate: str) -> str:
+    """
+    Return the given MATCH clause with `predicate` ANDed into its final WHERE, or with a new WHERE if it has none.
+    """
+    wheres = list(_WHERE_RE.finditer(match_clause))
+    where = wheres[-1] if wheres else None
+    # A WHERE followed by another clause belongs to an earlier MATCH.
+    if where is None or _CLAUSE_RE.search(match_clause, where.end()):
+        return f"{match_clause} WHERE {predicate}"
+    return f"{match_clause[:where.start()]}WHERE {predicate} AND ({match_clause[where.end():].strip()})"
+
+
+class CleanupQuery(NamedTuple):
+    """
+    An iterative `... WITH x LIMIT {LIMIT_SIZE} [DETACH] DELETE x` statement split into its parts.
+    """
+    match_clause: str
+    variable: str
+    detach: bool
+    is_relationship: bool
+
+    @property
+    def collect_query(self) -> str:
+        """
+        Returns one page of the matching ids, in id order, starting after `{LastItemId}`.
+        """
+        var = self.variable
+        return (
+            f"{_add_predicate(self.match_clause, f'id({var}) > {{LastItemId}}')} "
+            f"RETURN DISTINCT id({var}) AS item_id ORDER BY item_id LIMIT {{PageSize}}"
+        )
+
+    @property
+    def delete_query(self) -> str:
+        """
+        Deletes the items in `{ItemIds}`. The ids were collected in an earlier transaction, so the original pattern and
+        WHERE are matched again to make sure that an item touched by a sync since then is not deleted.
+        """
+        var = self.variable
+        detach = 'DETACH ' if self.detach else ''
+        return (
+            f"UNWIND {{ItemIds}} AS item_id {_add_predicate(self.match_clause, f'id({var}) = item_id')} "
+            f"WITH DISTINCT {var} {detach}DELETE {var}"
+        )
+
+
+def parse_cleanup_query(query: str) -> Optional[CleanupQuery]:
+    """
+    Return the parts of the given iterative delete statement, or None if it does not have the expected shape and must
+    be run with the LIMIT loop.
+    """
+    match = _ITERATIVE_DELETE_RE.match(query)
+    if not match:
+        return None
+    var = match.group('var')
+    match_clause = match.group('match')
+    return CleanupQuery(
+        match_clause=match_clause,
+        variable=var,
+        detach=bool(match.group('detach')),
+        is_relationship=re.search(rf'\[\s*{var}\s*[:\]]', match_clause) is not None,
+    )
+
+
+class AdaptiveBatchSize:
+    """
+    A batch size that grows while transactions finish well under `target_seconds` and shrinks when they take longer,
+    staying between `min_size` and `max_size`.
+    """
+
+    def __init__(self, initial_size: int, min_size: int, max_size: int, target_seconds: float):
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.size = min(max(initial_size, self.min_size), self.max_size)
+        self.target_seconds = target_seconds
+
+    def record(self, elapsed_seconds: float) -> None:
+        if elapsed_seconds > self.target_seconds:
+            self.size = max(self.min_size, self.size // 2)
+        elif elapsed_seconds < self.target_seconds / 2:
+            self.size = min(self.max_size, self.size * 2)
+
+    def back_off(self) -> bool:
+        """
+        Halve the batch size after a transaction failed because it was too large. Returns False if the size is already
+        at `min_size`, in which case the caller should give up.
+        """
+        if self.size <= self.min_size:
+            return False
+        self.size = max(self.min_size, self.size // 2)
+        return True
+
+
+def is_batch_size_error(error: Exception) -> bool:
+    """
+    Return True if the given error may go away when the same work is retried in smaller transactions: transient errors
+    that the driver gave up retrying, and the server running out of transaction or heap memory.
+    """
+    if isinstance(error, neo4j.exceptions.TransientError):
+        return True
+    if isinstance(error, neo4j.exceptions.Neo4jError):
+        return 'memory' in (error.code or '').lower() or 'outofmemory' in str(error).lower()
+    return False
+
+
+CLEANUP_INITIAL_BATCH_SIZE = 1000
+CLEANUP_MAX_BATCH_SIZE = 50000
+CLEANUP_TARGET_TRANSACTION_SECONDS = 2.0
+# Number of ids read per collect transaction, so that a large cleanup does not hold every stale id in memory at once.
+CLEANUP_COLLECT_PAGE_SIZE = 50000
+
+
+def _collect_ids_tx(tx: neo4j.Transaction, query: str, parameters: Dict) -> List[int]:
+    return [record['item_id'] for record in tx.run(query, parameters)]
+
+
+def _delete_ids_tx(tx: neo4j.Transaction, query: str, parameters: Dict) -> Tuple[int, int]:
+    counters = tx.run(query, parameters).consume().counters
+    return counters.nodes_deleted, counters.relationships_deleted
+
+
+def run_batched_cleanup(
+    neo4j_session: neo4j.Session, cleanup_query: CleanupQuery, parameters: Dict, min_batch_size: int = 100,
+    adaptive: bool = True,
+) -> Tuple[int, int]:
+    """
+    Delete everything matched by the given cleanup statement: read the matching ids in pages of
+    `CLEANUP_COLLECT_PAGE_SIZE`, and delete each page in id-keyed batches sized by `AdaptiveBatchSize`, or in batches of
+    `min_batch_size` if `adaptive` is False.
+
+    :param neo4j_session: The Neo4j session
+    :param cleanup_query: The parsed cleanup statement, see `parse_cleanup_query()`.
+    :param parameters: The statement parameters, e.g. UPDATE_TAG and AWS_ID.
+    :param min_batch_size: The smallest number of ids deleted per transaction. Usually the statement's iterationsize.
+    :param adaptive: If False, every transaction deletes `min_batch_size` ids, and failed transactions are not retried
+    with smaller batches.
+    :return: The number of nodes and the number of relationships deleted.
+    """
+    if adaptive:
+        batch_size = AdaptiveBatchSize(
+            CLEANUP_INITIAL_BATCH_SIZE, min_batch_size, CLEANUP_MAX_BATCH_SIZE, CLEANUP_TARGET_TRANSACTION_SECONDS,
+        )
+    else:
+        # With equal bounds the size never grows, and back_off() always gives up.
+        batch_size = AdaptiveBatchSize(
+            min_batch_size, min_batch_size, min_batch_size, CLEANUP_TARGET_TRANSACTION_SECONDS,
+        )
+    nodes_deleted = 0
+    relationships_deleted = 0
+    last_item_id = -1
+    while True:
+        item_ids: List[int] = neo4j_session.read_transaction(
+            _collect_ids_tx,
+            cleanup_query.collect_query,
+            {**parameters, 'LastItemId': last_item_id, 'PageSize': CLEANUP_COLLECT_PAGE_SIZE},
+        )
+        logger.debug("Collected %d stale items to delete.", len(item_ids))
+        page_nodes_deleted, page_relationships_deleted = _delete_ids(
+            neo4j_session, cleanup_query, parameters, item_ids, batch_size,
+        )
+        nodes_deleted += page_nodes_deleted
+        relationships_deleted += page_relationships_deleted
+        if len(item_ids) < CLEANUP_COLLECT_PAGE_SIZE:
+            break
+        last_item_id = item_ids[-1]
+
+    stat_handler.incr('nodes_deleted', nodes_deleted)
+    stat_handler.incr('relationships_deleted', relationships_deleted)
+    return nodes_deleted, relationships_deleted
+
+
+def _delete_ids(
+    neo4j_session: neo4j.Session, cleanup_query: CleanupQuery, parameters: Dict, item_ids: List[int],
+    batch_size: AdaptiveBatchSize,
+) -> Tuple[int, int]:
+    nodes_deleted = 0
+    relationships_deleted = 0
+    start = 0
+    while start < len(item_ids):
+        item_batch = item_ids[start:start + batch_size.size]
+        started_at = time.monotonic()
+        try:
+            batch_nodes_deleted, batch_relationships_deleted = neo4j_session.write_transaction(
+                _delete_ids_tx, cleanup_query.delete_query, {**parameters, 'ItemIds': item_batch},
+            )
+        except neo4j.exceptions.Neo4jError as e:
+            if is_batch_size_error(e) and batch_size.back_off():
+                logger.warning(
+                    "Cleanup batch of %d items failed (%s), retrying with %d.",
+                    len(item_batch), e.code, batch_size.size,
+                )
+                continue
+            raise
+        nodes_deleted += batch_nodes_deleted
+        relationships_deleted += batch_relationships_deleted
+        batch_size.record(time.monotonic() - started_at)
+        start += len(item_batch)
+    return nodes_deleted, relationships_deleted
@@ -0,0 +1,317 @@
+import hashlib
+import json
+import logging
+import sys
+import threading
+import time
+import warnings
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+import neo4j
+
+from cartography.stats import get_stats_client
+
+
+logger = logging.getLogger(__name__)
+stat_handler = get_stats_client('neo4j.query')
+
+# Summary counters that are recorded for every query.
+COUNTERS = (
+    'nodes_created',
+    'nodes_deleted',
+    'relationships_created',
+    'relationships_deleted',
+    'properties_set',
+    'labels_added',
+    'labels_removed',
+)
+
+# Callers in these modules only pass queries through, so a query is attributed to the module that called them.
+_PASS_THROUGH_MODULES = ('cartography.graph.', 'cartography.client.', 'cartography.util', 'neo4j')
+
+_QUERY_TEXT_LENGTH = 500
+
+
+def normalize_query(query: str) -> str:
+    return ' '.join(query.split())
+
+
+def query_shape_hash(query: str) -> str:
+    """
+    Return a short hash that is the same for every run of a query, whatever its parameters and whitespace.
+    """
+    return hashlib.sha1(normalize_query(query).encode('utf-8')).hexdigest()[:12]
+
+
+def get_caller_module() -> str:
+    """
+    Return the name of the intel module that is running the current query. If there is none, e.g. for queries run by
+    cartography.sync itself, return the nearest module that does not just pass queries through.
+    """
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module.startswith('cartography.intel.'):
+            return module
+        if fallback is None and module != __name__ and not module.startswith(_PASS_THROUGH_MODULES):
+            fallback = module
+        frame = frame.f_back
+    return fallback or 'unknown'
+
+
+def count_rows_sent(parameters: Dict[str, Any]) -> int:
+    """
+    Return the number of rows that a query writes: the length of its longest list parameter, which is the list that
+    batched queries UNWIND, or 1 for queries without one.
+    """
+    return max((len(value) for value in parameters.values() if isinstance(value, list)), default=1)
+
+
+class QueryStats:
+    """
+    Totals for every run of one query shape from one module.
+    """
+
+    def __init__(self, module: str, shape: str, query: str):
+        self.module = module
+        self.shape = shape
+        self.query = query
+        self.count = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'shape': self.shape,
+            'query': self.query,
+            'count': self.count,
+            'total_seconds': round(self.total_seconds, 6),
+            'max_seconds': round(self.max_seconds, 6),
+            'rows': self.rows,
+            'counters': self.counters,
+        }
+
+
+class QueryRecorder:
+    """
+    Collects the timings and counters of the queries run through instrumented sessions, see `InstrumentedDriver`.
+    Safe to use from several threads.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: Dict[tuple, QueryStats] = {}
+
+    def record(
+        self, query: str, module: str, seconds: float, rows: int, counters: Optional[Any] = None,
+    ) -> None:
+        """
+        :param query: The query that was run.
+        :param module: The module that ran it, see `get_caller_module()`.
+        :param seconds: The wall time from running the query until all of its records were received.
+        :param rows: The number of rows sent with the query, see `count_rows_sent()`.
+        :param counters: The `neo4j.SummaryCounters` of the query, if it was completed.
+        """
+        shape = query_shape_hash(query)
+        with self._lock:
+            stats = self._stats.get((module, shape))
+            if stats is None:
+                stats = QueryStats(module, shape, normalize_query(query)[:_QUERY_TEXT_LENGTH])
+                self._stats[(module, shape)] = stats
+            stats.count += 1
+            stats.total_seconds += seconds
+            stats.max_seconds = max(stats.max_seconds, seconds)
+            stats.rows += rows
+            for name in COUNTERS:
+                stats.counters[name] += getattr(counters, name, 0)
+
+        if stat_handler.is_enabled():
+            prefix = f'{module}.{shape}'
+            stat_handler.timing(f'{prefix}.time', seconds * 1000)
+            stat_handler.incr(f'{prefix}.rows', rows)
+            for name in COUNTERS:
+                count = getattr(counters, name, 0)
+                if count:
+                    stat_handler.incr(f'{prefix}.{name}', count)
+
+    def report(self, top: int = 20) -> Dict[str, Any]:
+        """
+        Return the recorded queries grouped by module, with the modules and the queries of each module ranked by their
+        total time. Only the `top` slowest queries of each module are listed.
+        """
+        with self._lock:
+            all_stats = list(self._stats.values())
+        modules: Dict[str, List[QueryStats]] = {}
+        for stats in all_stats:
+            modules.setdefault(stats.module, []).append(stats)
+        ranked = sorted(modules.items(), key=lambda item: -sum(s.total_seconds for s in item[1]))
+        return {
+            module: {
+                'total_seconds': round(sum(s.total_seconds for s in module_stats), 6),
+                'query_count': sum(s.count for s in module_stats),
+                'queries': [
+                    s.as_dict() for s in sorted(module_stats, key=lambda s: -s.total_seconds)[:top]
+                ],
+            }
+            for module, module_stats in ranked
+        }
+
+    def write_report(self, file_path: str, top: int = 20) -> None:
+        with open(file_path, 'w') as report_file:
+            json.dump(self.report(top), report_file, indent=4)
+            report_file.write('\n')
+        logger.info("Wrote Neo4j query report to %s.", file_path)
+
+
+class BufferedResult:
+    """
+    The records and summary of a query that has already been run to completion. Supports the parts of the
+    `neo4j.Result` API that cartography uses.
+    """
+
+    def __init__(self, keys: List[str], records: List[neo4j.Record], summary: Any):
+        self._keys = keys
+        self._records = records
+        self._summary = summary
+        self._position = 0
+
+    def keys(self) -> List[str]:
+        return self._keys
+
+    def __iter__(self) -> Iterator[neo4j.Record]:
+        while self._position < len(self._records):
+            record = self._records[self._position]
+            self._position += 1
+            yield record
+
+    def peek(self) -> Optional[neo4j.Record]:
+        if self._position < len(self._records):
+            return self._records[self._position]
+        return None
+
+    def single(self) -> Optional[neo4j.Record]:
+        records = list(self)
+        if not records:
+            return None
+        if len(records) > 1:
+            warnings.warn("Expected a result with a single record, but this result contains at least one more")
+        return records[0]
+
+    def data(self, *keys: str) -> List[Dict[str, Any]]:
+        return [record.data(*keys) for record in self]
+
+    def value(self, key: Any = 0, default: Any = None) -> List[Any]:
+        return [record.value(key, default) for record in self]
+
+    def values(self, *keys: Any) -> List[List[Any]]:
+        return [record.values(*keys) for record in self]
+
+    def consume(self) -> Any:
+        self._position = len(self._records)
+        return self._summary
+
+
+def _run_recorded(
+    recorder: QueryRecorder, run_func: Callable, query: Any, parameters: Optional[Dict], **kwparameters: Any,
+) -> BufferedResult:
+    """
+    Run a query with the given session or transaction `run_func`, wait for all of its records, and record it.
+    """
+    module = get_caller_module()
+    started_at = time.monotonic()
+    result = run_func(query, parameters, **kwparameters)
+    keys = result.keys()
+    records = list(result)
+    summary = result.consume()
+    seconds = time.monotonic() - started_at
+    rows = count_rows_sent({**(parameters or {}), **kwparameters})
+    recorder.record(getattr(query, 'text', query), module, seconds, rows, summary.counters)
+    return BufferedResult(keys, records, summary)
+
+
+class InstrumentedTransaction:
+    """
+    Wraps a `neo4j.Transaction` so that every query run in it is recorded.
+    """
+
+    def __init__(self, tx: neo4j.Transaction, recorder: QueryRecorder):
+        self._tx = tx
+        self._recorder = recorder
+
+    def run(self, query: Any, parameters: Optional[Dict] = None, **kwparameters: Any) -> BufferedResult:
+        return _run_recorded(self._recorder, self._tx.run, query, parameters, **kwparameters)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._tx, name)
+
+
+class InstrumentedSession:
+    """
+    Wraps a `neo4j.Session` so that every query run with it, directly or in a transaction function, is recorded.
+
+    Results are read completely before they are returned, so that their timing covers the whole query and their
+    summary counters are known. Callers see the same records as from an uninstrumented session.
+    """
+
+    def __init__(self, session: neo4j.Session, recorder: QueryRecorder):
+        self._session = session
+        self._recorder = recorder
+
+    def run(self, query: Any, parameters: Optional[Dict] = None, **kwparameters: Any) -> BufferedResult:
+        return _run_recorded(self._recorder, self._session.run, query, parameters, **kwparameters)
+
+    def read_transaction(self, transaction_function: Callable, *args: Any, **kwargs: Any) -> Any:
+        return self._session.read_transaction(self._wrap(transaction_function), *args, **kwargs)
+
+    def write_transaction(self, transaction_function: Callable, *args: Any, **kwargs: Any) -> Any:
+        return self._session.write_transaction(self._wrap(transaction_function), *args, **kwargs)
+
+    def begin_transaction(self, *args: Any, **kwargs: Any) -> InstrumentedTransaction:
+        return InstrumentedTransaction(self._session.begin_transaction(*args, **kwargs), self._recorder)
+
+    def _wrap(self, transaction_function: Callable) -> Callable:
+        def instrumented_transaction_function(tx: neo4j.Transaction, *args: Any, **kwargs: Any) -> Any:
+            return transaction_function(InstrumentedTransaction(tx, self._recorder), *args, **kwargs)
+        return instrumented_transaction_function
+
+    def __enter__(self) -> 'InstrumentedSession':
+        self._session.__enter__()
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        self._session.__exit__(exc_type, exc_value, traceback)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+
+class InstrumentedDriver:
+    """
+    Wraps a `neo4j.Driver` so that its sessions are `InstrumentedSession`s.
+    """
+
+    def __init__(self, driver: neo4j.Driver, recorder: QueryRecorder):
+        self._driver = driver
+        self._recorder = recorder
+
+    def session(self, **config: Any) -> InstrumentedSession:
+        return InstrumentedSession(self._driver.session(**config), self._recorder)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._driver, name)
+
+
+# Records the queries of all instrumented drivers of this process, see cartography.util.get_neo4j_driver().
+_query_recorder = QueryRecorder()
+
+
+def get_query_recorder() -> QueryRecorder:
+    return _query_recorder
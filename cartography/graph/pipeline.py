@@ -0,0 +1,96 @@
+import logging
+import queue
+import threading
+from typing import Any
+from typing import Callable
+from typing import Optional
+
+import neo4j
+
+logger = logging.getLogger(__name__)
+
+# Sentinel put on the queue to tell the writer thread that no more writes are coming.
+_STOP = object()
+
+
+class WritePipeline:
+    """
+    Decouples fetching data from cloud APIs from writing it to Neo4j.
+
+    The sync code stays the producer: it fetches and transforms a batch of data, then hands the write to `submit()`
+    instead of calling the load function itself. With a `queue_size` greater than 0, a single writer thread drains the
+    submitted writes into Neo4j in the order they were submitted, so the next batch can be fetched while the previous
+    one is being written. `submit()` blocks when `queue_size` writes are already waiting, which keeps memory bounded
+    if Neo4j is slower than the APIs. With a `queue_size` of 0 (the default), `submit()` runs the write immediately.
+
+    The writer thread owns the given Neo4j session until the pipeline is closed, so everything that uses the session
+    inside the `with` block, including cleanup jobs, must go through `submit()`.
+
+    Example usage:
+        with WritePipeline(neo4j_session, queue_size) as pipeline:
+            for region in regions:
+                data = get_things(boto3_session, region)
+                pipeline.submit(load_things, data, region, update_tag)
+            pipeline.submit(cleanup_things, common_job_parameters)
+
+    If a write fails, later writes are skipped, the next `submit()` raises the error so that the producer stops
+    fetching, and leaving the `with` block raises it too.
+    """
+
+    def __init__(self, neo4j_session: neo4j.Session, queue_size: int = 0):
+        """
+        :param neo4j_session: The Neo4j session that the submitted writes are run with.
+        :param queue_size: The maximum number of writes that may wait to be run. 0 runs every write inline.
+        """
+        if queue_size < 0:
+            raise ValueError(f'queue_size must not be negative, got {queue_size}.')
+        self._neo4j_session = neo4j_session
+        self._queue_size = queue_size
+        self._queue: Optional[queue.Queue] = None
+        self._writer: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    def __enter__(self) -> 'WritePipeline':
+        if self._queue_size > 0:
+            self._queue = queue.Queue(maxsize=self._queue_size)
+            self._writer = threading.Thread(target=self._drain, name='cartography-writer', daemon=True)
+            self._writer.start()
+        return self
+
+    def __exit__(self, exc_type: Any, exc_value: Any, traceback: Any) -> None:
+        if self._writer is not None:
+            self._queue.put(_STOP)  # type: ignore
+            self._writer.join()
+            self._writer = None
+            self._queue = None
+        if exc_type is None and self._error is not None:
+            raise self._error
+
+    def submit(self, load_func: Callable, *args: Any, **kwargs: Any) -> None:
+        """
+        Run `load_func(neo4j_session, *args, **kwargs)`, either now or on the writer thread.
+        """
+        if self._error is not None:
+            raise self._error
+        if self._queue is None:
+            load_func(self._neo4j_session, *args, **kwargs)
+        else:
+            self._queue.put((load_func, args, kwargs))
+
+    def _drain(self) -> None:
+        while True:
+            item = self._queue.get()  # type: ignore
+            if item is _STOP:
+                return
+            if self._error is not None:
+                # Keep draining after a failure so that a producer blocked on a full queue is released.
+                continue
+            load_func, args, kwargs = item
+            try:
+                load_func(self._neo4j_session, *args, **kwargs)
+            except BaseException as e:
+                logger.error(
+                    "Neo4j write '%s' failed, skipping the remaining writes.",
+                    getattr(load_func, '__name__', load_func),
+                )
+                self._error = e
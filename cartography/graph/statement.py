@@ -1,19 +1,31 @@
 import json
 import logging
 import os
+import time
 from pathlib import Path
 from typing import Any
 from typing import Dict
 from typing import Union
 
 import neo4j
+import neo4j.exceptions
 
+from cartography.graph.cleanup import AdaptiveBatchSize
+from cartography.graph.cleanup import is_batch_size_error
+from cartography.graph.cleanup import parse_cleanup_query
+from cartography.graph.cleanup import run_batched_cleanup
 from cartography.stats import get_stats_client
 
 
 logger = logging.getLogger(__name__)
 stat_handler = get_stats_client(__name__)
 
+# Bounds and target duration for the LIMIT_SIZE of adaptive iterative statements. The JSON iterationsize is the
+# starting point and widens the bounds if it falls outside of them.
+ITERATION_MIN_SIZE = 10
+ITERATION_MAX_SIZE = 100000
+ITERATION_TARGET_SECONDS = 2.0
+
 
 class GraphStatementJSONEncoder(json.JSONEncoder):
     """
@@ -37,16 +49,23 @@ def get_job_shortname(file_path: Union[Path, str]) -> str:
 class GraphStatement:
     """
     A statement that will run against the cartography graph. Statements can query or update the graph.
+
+    Iterative statements are re-run with LIMIT_SIZE set to `iterationsize` until they stop updating the graph. If
+    `adaptive` is True (default), each iteration is timed and LIMIT_SIZE grows or shrinks towards
+    ITERATION_TARGET_SECONDS, and it is halved when an iteration fails with a transient or out-of-memory error. The
+    same goes for the batch size of iterative delete statements, see `run_batched_cleanup()`; if `adaptive` is False,
+    they delete `iterationsize` items per transaction.
     """
 
     def __init__(
         self, query: str, parameters: Dict = None, iterative: bool = False, iterationsize: int = 0,
-        parent_job_name: str = None, parent_job_sequence_num: int = None,
+        parent_job_name: str = None, parent_job_sequence_num: int = None, adaptive: bool = True,
     ):
         self.query = query
         self.parameters = parameters or {}
         self.iterative = iterative
         self.iterationsize = iterationsize
+        self.adaptive = adaptive
         self.parameters["LIMIT_SIZE"] = self.iterationsize
 
         self.parent_job_name = parent_job_name if parent_job_name else None
@@ -63,7 +82,21 @@ class GraphStatement:
     def run(self, session: neo4j.Session) -> None:
         """
         Run the statement. This will execute the query against the graph.
+
+        Iterative `... WITH x LIMIT {LIMIT_SIZE} [DETACH] DELETE x` statements are run by the batched cleanup engine in
+        cartography.graph.cleanup, which reads the stale item ids in large pages and deletes them by id, instead of
+        matching the stale items again for every LIMIT-sized iteration.
         """
+        cleanup_query = parse_cleanup_query(self.query) if self.iterative else None
+        if cleanup_query:
+            nodes_deleted, relationships_deleted = run_batched_cleanup(
+                session, cleanup_query, self.parameters, min_batch_size=self.iterationsize, adaptive=self.adaptive,
+            )
+            logger.info(
+                f"Completed {self.parent_job_name} statement #{self.parent_job_sequence_num}: "
+                f"deleted {nodes_deleted} nodes and {relationships_deleted} relationships",
+            )
+            return
         if self.iterative:
             self._run_iterative(session)
         else:
@@ -79,6 +112,7 @@ class GraphStatement:
             "parameters": self.parameters,
             "iterative": self.iterative,
             "iterationsize": self.iterationsize,
+            "adaptive": self.adaptive,
         }
 
     def _run_noniterative(self, tx: neo4j.Transaction) -> neo4j.Result:
@@ -110,9 +144,31 @@ class GraphStatement:
         Expects the query to return the total number of records updated.
         """
         self.parameters["LIMIT_SIZE"] = self.iterationsize
+        limit_size = None
+        if self.adaptive and self.iterationsize > 0:
+            limit_size = AdaptiveBatchSize(
+                self.iterationsize,
+                min(ITERATION_MIN_SIZE, self.iterationsize),
+                max(ITERATION_MAX_SIZE, self.iterationsize),
+                ITERATION_TARGET_SECONDS,
+            )
 
         while True:
-            result: neo4j.Result = session.write_transaction(self._run_noniterative)
+            if limit_size:
+                self.parameters["LIMIT_SIZE"] = limit_size.size
+            started_at = time.monotonic()
+            try:
+                result: neo4j.Result = session.write_transaction(self._run_noniterative)
+            except neo4j.exceptions.Neo4jError as e:
+                if limit_size and is_batch_size_error(e) and limit_size.back_off():
+                    logger.warning(
+                        f"{self.parent_job_name} statement #{self.parent_job_sequence_num} failed with {e.code}, "
+                        f"retrying with LIMIT_SIZE {limit_size.size}",
+                    )
+                    continue
+                raise
+            if limit_size:
+                limit_size.record(time.monotonic() - started_at)
 
             # Exit if we have finished processing all items
             if not result.consume().counters.contains_updates:
@@ -133,6 +189,7 @@ class GraphStatement:
             json_obj.get("iterationsize", 0),
             short_job_name,
             job_sequence_num,
+            adaptive=json_obj.get("adaptive", True),
         )
 
     @classmethod
@@ -2,20 +2,24 @@ import datetime
 import json
 import logging
 import traceback
-from typing import Any, Dict, Iterable, List
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional
 
 import boto3
 import botocore.exceptions
 import neo4j
 from cartography.config import Config
-from cartography.intel.aws.util.common import \
-    parse_and_validate_aws_requested_syncs
+from cartography.intel.aws.util.common import (
+    AWSSyncOptions, ThreadSafeBoto3Session, parse_and_validate_aws_requested_syncs)
 from cartography.stats import get_stats_client
-from cartography.util import (merge_module_sync_metadata, run_analysis_job,
-                              run_cleanup_job, timeit)
+from cartography.util import (get_neo4j_driver, merge_module_sync_metadata,
+                              run_analysis_job, run_cleanup_job,
+                              run_with_dependencies, timeit)
 
 from . import ec2, organizations
-from .resources import RESOURCE_FUNCTIONS
+from .resources import RESOURCE_DEPENDENCIES, RESOURCE_FUNCTIONS
 
 stat_handler = get_stats_client(__name__)
 logger = logging.getLogger(__name__)
@@ -23,7 +27,7 @@ logger = logging.getLogger(__name__)
 
 def _build_aws_sync_kwargs(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
-    sync_tag: int, common_job_parameters: Dict[str, Any],
+    sync_tag: int, common_job_parameters: Dict[str, Any], sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> Dict[str, Any]:
     return {
         'neo4j_session': neo4j_session,
@@ -32,9 +36,15 @@ def _build_aws_sync_kwargs(
         'current_aws_account_id': current_aws_account_id,
         'update_tag': sync_tag,
         'common_job_parameters': common_job_parameters,
+        'sync_options': sync_options,
     }
 
 
+def _sync_resource_in_new_session(neo4j_driver: neo4j.Driver, func_name: str, sync_args: Dict[str, Any]) -> None:
+    with neo4j_driver.session() as neo4j_session:
+        RESOURCE_FUNCTIONS[func_name](**{**sync_args, 'neo4j_session': neo4j_session})
+
+
 def _sync_one_account(
     neo4j_session: neo4j.Session,
     boto3_session: boto3.session.Session,
@@ -43,7 +53,14 @@ def _sync_one_account(
     common_job_parameters: Dict[str, Any],
     regions: List[str] = [],
     aws_requested_syncs: Iterable[str] = RESOURCE_FUNCTIONS.keys(),
+    neo4j_driver: Optional[neo4j.Driver] = None,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
+    """
+    Sync the requested resources of one AWS account. Resource syncs run in an order that respects
+    RESOURCE_DEPENDENCIES. If `neo4j_driver` is given and sync_options.resource_max_workers is greater than 1,
+    independent resource syncs run concurrently, each with its own Neo4j session from `neo4j_driver`.
+    """
     if not regions:
         regions = _autodiscover_account_regions(boto3_session, current_aws_account_id)
 
@@ -66,26 +83,31 @@ def _sync_one_account(
     logger.info('Syncing resources for regions: ', regions)
 
     sync_args = _build_aws_sync_kwargs(
-        neo4j_session, boto3_session, regions, current_aws_account_id, update_tag, common_job_parameters,
+        neo4j_session, boto3_session, regions, current_aws_account_id, update_tag, common_job_parameters, sync_options,
     )
 
     for func_name in aws_requested_syncs:
-        if func_name in RESOURCE_FUNCTIONS:
-            # Skip permission relationships and tags for now because they rely on data already being in the graph
-            if func_name not in ['permission_relationships', 'resourcegroupstaggingapi']:
-                RESOURCE_FUNCTIONS[func_name](**sync_args)
-            else:
-                continue
-        else:
+        if func_name not in RESOURCE_FUNCTIONS:
             raise ValueError(f'AWS sync function "{func_name}" was specified but does not exist. Did you misspell it?')
 
-    # MAP IAM permissions
-    if 'permission_relationships' in aws_requested_syncs:
-        RESOURCE_FUNCTIONS['permission_relationships'](**sync_args)
-
-    # AWS Tags - Must always be last.
-    if 'resourcegroupstaggingapi' in aws_requested_syncs:
-        RESOURCE_FUNCTIONS['resourcegroupstaggingapi'](**sync_args)
+    max_workers = sync_options.resource_max_workers
+    if neo4j_driver is not None and max_workers > 1:
+        logger.info("Running up to %d AWS resource syncs concurrently.", max_workers)
+        sync_args['boto3_session'] = ThreadSafeBoto3Session(boto3_session)
+        run_with_dependencies(
+            {
+                func_name: partial(_sync_resource_in_new_session, neo4j_driver, func_name, sync_args)
+                for func_name in aws_requested_syncs
+            },
+            RESOURCE_DEPENDENCIES,
+            max_workers=max_workers,
+            thread_name_prefix='cartography-aws-resources',
+        )
+    else:
+        run_with_dependencies(
+            {func_name: partial(RESOURCE_FUNCTIONS[func_name], **sync_args) for func_name in aws_requested_syncs},
+            RESOURCE_DEPENDENCIES,
+        )
 
     run_analysis_job(
         'aws_ec2_iaminstanceprofile.json',
@@ -151,6 +173,69 @@ def _autodiscover_accounts(
         logger.warning(f"The current account ({account_id}) doesn't have enough permissions to perform autodiscovery.")
 
 
+def _sync_account_for_profile(
+    neo4j_session: neo4j.Session,
+    profile_name: str,
+    account_id: str,
+    sync_tag: int,
+    common_job_parameters: Dict[str, Any],
+    aws_best_effort_mode: bool,
+    aws_requested_syncs: List[str],
+    neo4j_driver: Optional[neo4j.Driver] = None,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
+) -> Optional[str]:
+    """
+    Sync one AWS account using the given named profile.
+
+    :return: In best effort mode, a formatted traceback if syncing the account's resources failed, else None.
+    """
+    logger.info("Syncing AWS account with ID '%s' using configured profile '%s'.", account_id, profile_name)
+    common_job_parameters["AWS_ID"] = account_id
+    boto3_session = boto3.Session(profile_name=profile_name)
+
+    _autodiscover_accounts(neo4j_session, boto3_session, account_id, sync_tag, common_job_parameters)
+    logger.info("Adding account level public block access for '%s'", account_id)
+    organizations.load_accounts_public_access_block(neo4j_session, boto3_session, account_id, sync_tag)
+    try:
+        _sync_one_account(
+            neo4j_session,
+            boto3_session,
+            account_id,
+            sync_tag,
+            common_job_parameters,
+            aws_requested_syncs=aws_requested_syncs,  # Could be replaced later with per-account requested syncs
+            neo4j_driver=neo4j_driver,
+            sync_options=sync_options,
+        )
+    except Exception as e:
+        if aws_best_effort_mode:
+            timestamp = datetime.datetime.now()
+            exception_traceback = traceback.TracebackException.from_exception(e)
+            traceback_string = ''.join(exception_traceback.format())
+            return f'{timestamp} - Exception for account ID: {account_id}\n{traceback_string}'
+        else:
+            raise
+    return None
+
+
+def _sync_account_for_profile_in_new_session(
+    neo4j_driver: neo4j.Driver,
+    profile_name: str,
+    account_id: str,
+    sync_tag: int,
+    common_job_parameters: Dict[str, Any],
+    aws_best_effort_mode: bool,
+    aws_requested_syncs: List[str],
+    sync_options: AWSSyncOptions,
+) -> Optional[str]:
+    # Each worker gets its own copy of the job parameters because AWS_ID differs per account.
+    with neo4j_driver.session() as neo4j_session:
+        return _sync_account_for_profile(
+            neo4j_session, profile_name, account_id, sync_tag, dict(common_job_parameters), aws_best_effort_mode,
+            aws_requested_syncs, neo4j_driver=neo4j_driver, sync_options=sync_options,
+        )
+
+
 def _sync_multiple_accounts(
     neo4j_session: neo4j.Session,
     accounts: Dict[str, str],
@@ -158,46 +243,71 @@ def _sync_multiple_accounts(
     common_job_parameters: Dict[str, Any],
     aws_best_effort_mode: bool,
     aws_requested_syncs: List[str] = [],
+    neo4j_driver: Optional[neo4j.Driver] = None,
+    max_workers: int = 1,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> bool:
+    """
+    Sync the given AWS accounts. If `neo4j_driver` is given and `max_workers` is greater than 1, up to `max_workers`
+    accounts are synced concurrently, each with its own boto3 session and Neo4j session from `neo4j_driver`. The driver
+    is also used to run the resource syncs of each account concurrently; see `_sync_one_account`.
+    """
     logger.info("Syncing AWS accounts: %s", ', '.join(accounts.values()))
     organizations.sync(neo4j_session, accounts, sync_tag, common_job_parameters)
 
     failed_account_ids = []
     exception_tracebacks = []
 
-    for profile_name, account_id in accounts.items():
-        logger.info("Syncing AWS account with ID '%s' using configured profile '%s'.", account_id, profile_name)
-        common_job_parameters["AWS_ID"] = account_id
-        boto3_session = boto3.Session(profile_name=profile_name)
-
-        _autodiscover_accounts(neo4j_session, boto3_session, account_id, sync_tag, common_job_parameters)
-        logger.info("Adding account level public block access for '%s'", account_id)
-        organizations.load_accounts_public_access_block(neo4j_session, boto3_session, account_id, sync_tag)
-        try:
-            _sync_one_account(
+    if neo4j_driver is not None and max_workers > 1:
+        logger.info("Syncing up to %d AWS accounts concurrently.", max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cartography-aws') as executor:
+            futures: Dict[Future, str] = {
+                executor.submit(
+                    _sync_account_for_profile_in_new_session,
+                    neo4j_driver,
+                    profile_name,
+                    account_id,
+                    sync_tag,
+                    common_job_parameters,
+                    aws_best_effort_mode,
+                    aws_requested_syncs,
+                    sync_options,
+                ): account_id
+                for profile_name, account_id in accounts.items()
+            }
+            # Collect results in submission order so failures are reported the same way as a serial sync.
+            for future, account_id in futures.items():
+                try:
+                    exception_traceback = future.result()
+                except Exception:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                if exception_traceback:
+                    failed_account_ids.append(account_id)
+                    exception_tracebacks.append(exception_traceback)
+    else:
+        for profile_name, account_id in accounts.items():
+            exception_traceback = _sync_account_for_profile(
                 neo4j_session,
-                boto3_session,
+                profile_name,
                 account_id,
                 sync_tag,
                 common_job_parameters,
-                aws_requested_syncs=aws_requested_syncs,  # Could be replaced later with per-account requested syncs
+                aws_best_effort_mode,
+                aws_requested_syncs,
+                neo4j_driver=neo4j_driver,
+                sync_options=sync_options,
             )
-        except Exception as e:
-            if aws_best_effort_mode:
-                timestamp = datetime.datetime.now()
+            if exception_traceback:
                 failed_account_ids.append(account_id)
-                exception_traceback = traceback.TracebackException.from_exception(e)
-                traceback_string = ''.join(exception_traceback.format())
-                exception_tracebacks.append(f'{timestamp} - Exception for account ID: {account_id}\n{traceback_string}')
-                continue
-            else:
-                raise
+                exception_tracebacks.append(exception_traceback)
 
     if failed_account_ids:
         logger.error(f'AWS sync failed for accounts {failed_account_ids}')
         raise Exception('\n'.join(exception_tracebacks))
 
-    del common_job_parameters["AWS_ID"]
+    common_job_parameters.pop("AWS_ID", None)
 
     # There may be orphan Principals which point outside of known AWS accounts. This job cleans
     # up those nodes after all AWS accounts have been synced.
@@ -216,6 +326,14 @@ def start_aws_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
         "aws_resource_type": config.aws_resource_type,
         "aws_region": config.aws_region,
     }
+    sync_options = AWSSyncOptions(
+        region_max_workers=config.aws_region_max_workers or 1,
+        resource_max_workers=config.aws_resource_max_workers or 1,
+        permission_relationships_max_workers=config.aws_permission_relationships_max_workers or 1,
+        s3_max_workers=config.aws_s3_max_workers or 1,
+        iam_bulk_fetch=bool(config.aws_iam_bulk_fetch),
+        neo4j_write_queue_size=config.neo4j_write_queue_size or 0,
+    )
     try:
         boto3_session = boto3.Session()
     except (botocore.exceptions.BotoCoreError, botocore.exceptions.ClientError) as e:
@@ -253,14 +371,24 @@ def start_aws_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
     if config.aws_requested_syncs:
         requested_syncs = parse_and_validate_aws_requested_syncs(config.aws_requested_syncs)
 
-    sync_successful = _sync_multiple_accounts(
-        neo4j_session,
-        aws_accounts,
-        config.update_tag,
-        common_job_parameters,
-        config.aws_best_effort_mode,
-        requested_syncs,
-    )
+    max_workers = config.aws_account_max_workers or 1
+    use_worker_sessions = (max_workers > 1 and len(aws_accounts) > 1) or sync_options.resource_max_workers > 1
+    neo4j_driver = get_neo4j_driver(config) if use_worker_sessions else None
+    try:
+        sync_successful = _sync_multiple_accounts(
+            neo4j_session,
+            aws_accounts,
+            config.update_tag,
+            common_job_parameters,
+            config.aws_best_effort_mode,
+            requested_syncs,
+            neo4j_driver=neo4j_driver,
+            max_workers=max_workers,
+            sync_options=sync_options,
+        )
+    finally:
+        if neo4j_driver is not None:
+            neo4j_driver.close()
 
     if sync_successful:
         run_analysis_job(
@@ -1,11 +1,14 @@
 import logging
 from typing import Dict
 from typing import List
+from typing import Tuple
 
 import boto3
 import neo4j
 import uuid
 
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -179,17 +182,30 @@ def cleanup_config(neo4j_session: neo4j.Session, common_job_parameters: Dict) ->
     run_cleanup_job('aws_import_config_cleanup.json', neo4j_session, common_job_parameters)
 
 
+def get_config_data(boto3_session: boto3.session.Session, region: str) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """
+    Fetch the configuration recorders, delivery channels and rules of one region, so that `aws_fetch_regions()` runs a
+    single task per region.
+    """
+    return (
+        get_configuration_recorders(boto3_session, region),
+        get_delivery_channels(boto3_session, region),
+        get_config_rules(boto3_session, region),
+    )
+
+
 @timeit
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
+    max_workers = sync_options.region_max_workers
+    for region, (recorders, channels, rules) in aws_fetch_regions(
+        get_config_data, boto3_session, regions, max_workers=max_workers,
+    ):
         logger.info("Syncing AWS Config for region '%s' in account '%s'.", region, current_aws_account_id)
-        recorders = get_configuration_recorders(boto3_session, region)
         load_configuration_recorders(neo4j_session, recorders, region, current_aws_account_id, update_tag)
-        channels = get_delivery_channels(boto3_session, region)
         load_delivery_channels(neo4j_session, channels, region, current_aws_account_id, update_tag)
-        rules = get_config_rules(boto3_session, region)
         load_config_rules(neo4j_session, rules, region, current_aws_account_id, update_tag)
     cleanup_config(neo4j_session, common_job_parameters)
@@ -8,6 +8,7 @@ import neo4j
 import uuid
 
 import cartography.intel.aws.util.common as filterfn
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.stats import get_stats_client
 from cartography.util import aws_handle_regions
 from cartography.util import merge_module_sync_metadata
@@ -143,6 +144,7 @@ def sync_dynamodb_tables(
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
     sync_dynamodb_tables(
         neo4j_session, boto3_session, regions, current_aws_account_id, update_tag, common_job_parameters,
@@ -2,11 +2,15 @@ import logging
 import time
 from typing import Dict
 from typing import List
+from typing import Tuple
 
 import boto3
 import neo4j
 
 from .util import get_botocore_config
+from cartography.graph.pipeline import WritePipeline
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -229,16 +233,27 @@ def cleanup_ec2_launch_configurations(neo4j_session: neo4j.Session, common_job_p
     )
 
 
+def get_auto_scaling_data(boto3_session: boto3.session.Session, region: str) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Fetch the launch configurations and auto scaling groups of one region, so that `aws_fetch_regions()` runs a single
+    task per region.
+    """
+    return get_launch_configurations(boto3_session, region), get_ec2_auto_scaling_groups(boto3_session, region)
+
+
 @timeit
 def sync_ec2_auto_scaling_groups(
         neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str],
         current_aws_account_id: str, update_tag: int, common_job_parameters: Dict,
+        sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
-        logger.debug("Syncing auto scaling groups for region '%s' in account '%s'.", region, current_aws_account_id)
-        lc_data = get_launch_configurations(boto3_session, region)
-        load_launch_configurations(neo4j_session, lc_data, region, current_aws_account_id, update_tag)
-        data = get_ec2_auto_scaling_groups(boto3_session, region)
-        load_ec2_auto_scaling_groups(neo4j_session, data, region, current_aws_account_id, update_tag)
-    cleanup_ec2_auto_scaling_groups(neo4j_session, common_job_parameters)
-    cleanup_ec2_launch_configurations(neo4j_session, common_job_parameters)
+    max_workers = sync_options.region_max_workers
+    with WritePipeline(neo4j_session, sync_options.neo4j_write_queue_size) as pipeline:
+        for region, (lc_data, data) in aws_fetch_regions(
+            get_auto_scaling_data, boto3_session, regions, max_workers=max_workers,
+        ):
+            logger.debug("Syncing auto scaling groups for region '%s' in account '%s'.", region, current_aws_account_id)
+            pipeline.submit(load_launch_configurations, lc_data, region, current_aws_account_id, update_tag)
+            pipeline.submit(load_ec2_auto_scaling_groups, data, region, current_aws_account_id, update_tag)
+        pipeline.submit(cleanup_ec2_auto_scaling_groups, common_job_parameters)
+        pipeline.submit(cleanup_ec2_launch_configurations, common_job_parameters)
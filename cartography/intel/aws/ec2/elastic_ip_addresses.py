@@ -7,6 +7,9 @@ import neo4j
 from botocore.exceptions import ClientError
 
 from .util import get_botocore_config
+from cartography.graph.pipeline import WritePipeline
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -92,9 +95,13 @@ def cleanup_elastic_ip_addresses(neo4j_session: neo4j.Session, common_job_parame
 def sync_elastic_ip_addresses(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str],
     current_aws_account_id: str, update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
-        logger.info(f"Syncing Elastic IP Addresses for region {region} in account {current_aws_account_id}.")
-        addresses = get_elastic_ip_addresses(boto3_session, region)
-        load_elastic_ip_addresses(neo4j_session, addresses, region, current_aws_account_id, update_tag)
-    cleanup_elastic_ip_addresses(neo4j_session, common_job_parameters)
+    max_workers = sync_options.region_max_workers
+    with WritePipeline(neo4j_session, sync_options.neo4j_write_queue_size) as pipeline:
+        for region, addresses in aws_fetch_regions(
+            get_elastic_ip_addresses, boto3_session, regions, max_workers=max_workers,
+        ):
+            logger.info(f"Syncing Elastic IP Addresses for region {region} in account {current_aws_account_id}.")
+            pipeline.submit(load_elastic_ip_addresses, addresses, region, current_aws_account_id, update_tag)
+        pipeline.submit(cleanup_elastic_ip_addresses, common_job_parameters)
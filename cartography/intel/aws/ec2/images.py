@@ -7,6 +7,9 @@ import neo4j
 from botocore.exceptions import ClientError
 
 from .util import get_botocore_config
+from cartography.graph.pipeline import WritePipeline
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -112,10 +115,17 @@ def cleanup_images(neo4j_session: neo4j.Session, common_job_parameters: Dict) ->
 def sync_ec2_images(
         neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str],
         current_aws_account_id: str, update_tag: int, common_job_parameters: Dict,
+        sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
-        logger.info("Syncing images for region '%s' in account '%s'.", region, current_aws_account_id)
-        images_in_use = get_images_in_use(neo4j_session, region, current_aws_account_id)
-        data = get_images(boto3_session, region, images_in_use)
-        load_images(neo4j_session, data, region, current_aws_account_id, update_tag)
-    cleanup_images(neo4j_session, common_job_parameters)
+    # Read the graph up front: the Neo4j session must not be shared with the fetch workers.
+    images_in_use = {region: get_images_in_use(neo4j_session, region, current_aws_account_id) for region in regions}
+    with WritePipeline(neo4j_session, sync_options.neo4j_write_queue_size) as pipeline:
+        for region, data in aws_fetch_regions(
+            lambda session, region: get_images(session, region, images_in_use[region]),
+            boto3_session,
+            regions,
+            max_workers=sync_options.region_max_workers,
+        ):
+            logger.info("Syncing images for region '%s' in account '%s'.", region, current_aws_account_id)
+            pipeline.submit(load_images, data, region, current_aws_account_id, update_tag)
+        pipeline.submit(cleanup_images, common_job_parameters)
@@ -6,6 +6,9 @@ import boto3
 import neo4j
 from botocore.exceptions import ClientError
 
+from cartography.graph.pipeline import WritePipeline
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -135,12 +138,21 @@ def cleanup_snapshots(neo4j_session: neo4j.Session, common_job_parameters: Dict)
 def sync_ebs_snapshots(
         neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str],
         current_aws_account_id: str, update_tag: int, common_job_parameters: Dict,
+        sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
-        logger.debug("Syncing snapshots for region '%s' in account '%s'.", region, current_aws_account_id)
-        snapshots_in_use = get_snapshots_in_use(neo4j_session, region, current_aws_account_id)
-        data = get_snapshots(boto3_session, region, snapshots_in_use)
-        load_snapshots(neo4j_session, data, region, current_aws_account_id, update_tag)
-        snapshot_volumes = get_snapshot_volumes(data)
-        load_snapshot_volume_relations(neo4j_session, snapshot_volumes, current_aws_account_id, update_tag)
-    cleanup_snapshots(neo4j_session, common_job_parameters)
+    # Read the graph up front: the Neo4j session must not be shared with the fetch workers.
+    snapshots_in_use = {
+        region: get_snapshots_in_use(neo4j_session, region, current_aws_account_id) for region in regions
+    }
+    with WritePipeline(neo4j_session, sync_options.neo4j_write_queue_size) as pipeline:
+        for region, data in aws_fetch_regions(
+            lambda session, region: get_snapshots(session, region, snapshots_in_use[region]),
+            boto3_session,
+            regions,
+            max_workers=sync_options.region_max_workers,
+        ):
+            logger.debug("Syncing snapshots for region '%s' in account '%s'.", region, current_aws_account_id)
+            pipeline.submit(load_snapshots, data, region, current_aws_account_id, update_tag)
+            snapshot_volumes = get_snapshot_volumes(data)
+            pipeline.submit(load_snapshot_volume_relations, snapshot_volumes, current_aws_account_id, update_tag)
+        pipeline.submit(cleanup_snapshots, common_job_parameters)
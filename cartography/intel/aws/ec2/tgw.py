@@ -1,12 +1,16 @@
 import logging
 from typing import Dict
 from typing import List
+from typing import Tuple
 
 import boto3
 import botocore.exceptions
 import neo4j
 
 from .util import get_botocore_config
+from cartography.graph.pipeline import WritePipeline
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -237,23 +241,39 @@ def cleanup_transit_gateways(neo4j_session: neo4j.Session, common_job_parameters
     run_cleanup_job('aws_import_tgw_cleanup.json', neo4j_session, common_job_parameters)
 
 
+def get_transit_gateway_data(
+    boto3_session: boto3.session.Session, region: str,
+) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """
+    Fetch the transit gateways, attachments and VPC attachments of one region, so that `aws_fetch_regions()` runs a
+    single task per region.
+    """
+    return (
+        get_transit_gateways(boto3_session, region),
+        get_tgw_attachments(boto3_session, region),
+        get_tgw_vpc_attachments(boto3_session, region),
+    )
+
+
 def sync_transit_gateways(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
-        logger.info("Syncing AWS Transit Gateways for region '%s' in account '%s'.", region, current_aws_account_id)
-        tgws = get_transit_gateways(boto3_session, region)
-        load_transit_gateways(neo4j_session, tgws, region, current_aws_account_id, update_tag)
-
-        logger.debug(
-            "Syncing AWS Transit Gateway Attachments for region '%s' in account '%s'.",
-            region, current_aws_account_id,
-        )
-        tgw_attachments = get_tgw_attachments(boto3_session, region)
-        tgw_vpc_attachments = get_tgw_vpc_attachments(boto3_session, region)
-        load_tgw_attachments(
-            neo4j_session, tgw_attachments + tgw_vpc_attachments,
-            region, current_aws_account_id, update_tag,
-        )
-    cleanup_transit_gateways(neo4j_session, common_job_parameters)
+    max_workers = sync_options.region_max_workers
+    with WritePipeline(neo4j_session, sync_options.neo4j_write_queue_size) as pipeline:
+        for region, (tgws, tgw_attachments, tgw_vpc_attachments) in aws_fetch_regions(
+            get_transit_gateway_data, boto3_session, regions, max_workers=max_workers,
+        ):
+            logger.info("Syncing AWS Transit Gateways for region '%s' in account '%s'.", region, current_aws_account_id)
+            pipeline.submit(load_transit_gateways, tgws, region, current_aws_account_id, update_tag)
+
+            logger.debug(
+                "Syncing AWS Transit Gateway Attachments for region '%s' in account '%s'.",
+                region, current_aws_account_id,
+            )
+            pipeline.submit(
+                load_tgw_attachments, tgw_attachments + tgw_vpc_attachments,
+                region, current_aws_account_id, update_tag,
+            )
+        pipeline.submit(cleanup_transit_gateways, common_job_parameters)
@@ -6,6 +6,9 @@ from typing import List
 import boto3
 import neo4j
 
+from cartography.graph.pipeline import WritePipeline
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -109,11 +112,13 @@ def cleanup_volumes(neo4j_session: neo4j.Session, common_job_parameters: Dict) -
 def sync_ebs_volumes(
         neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str],
         current_aws_account_id: str, update_tag: int, common_job_parameters: Dict,
+        sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
-        logger.debug("Syncing volumes for region '%s' in account '%s'.", region, current_aws_account_id)
-        data = get_volumes(boto3_session, region)
-        transformed_data = transform_volumes(data, region, current_aws_account_id)
-        load_volumes(neo4j_session, transformed_data, region, current_aws_account_id, update_tag)
-        load_volume_relationships(neo4j_session, transformed_data, update_tag)
-    cleanup_volumes(neo4j_session, common_job_parameters)
+    max_workers = sync_options.region_max_workers
+    with WritePipeline(neo4j_session, sync_options.neo4j_write_queue_size) as pipeline:
+        for region, data in aws_fetch_regions(get_volumes, boto3_session, regions, max_workers=max_workers):
+            logger.debug("Syncing volumes for region '%s' in account '%s'.", region, current_aws_account_id)
+            transformed_data = transform_volumes(data, region, current_aws_account_id)
+            pipeline.submit(load_volumes, transformed_data, region, current_aws_account_id, update_tag)
+            pipeline.submit(load_volume_relationships, transformed_data, update_tag)
+        pipeline.submit(cleanup_volumes, common_job_parameters)
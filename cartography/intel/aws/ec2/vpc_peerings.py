@@ -6,6 +6,9 @@ import boto3
 import neo4j
 
 from .util import get_botocore_config
+from cartography.graph.pipeline import WritePipeline
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -157,11 +160,13 @@ def cleanup_vpc_peerings(neo4j_session: neo4j.Session, common_job_parameters: Di
 def sync_vpc_peerings(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str],
     current_aws_account_id: str, update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
-        logger.debug("Syncing EC2 VPC peering for region '%s' in account '%s'.", region, current_aws_account_id)
-        data = get_vpc_peerings_data(boto3_session, region)
-        load_vpc_peerings(neo4j_session, data, region, current_aws_account_id, update_tag)
-        load_accepter_cidrs(neo4j_session, data, region, current_aws_account_id, update_tag)
-        load_requester_cidrs(neo4j_session, data, region, current_aws_account_id, update_tag)
-    cleanup_vpc_peerings(neo4j_session, common_job_parameters)
+    max_workers = sync_options.region_max_workers
+    with WritePipeline(neo4j_session, sync_options.neo4j_write_queue_size) as pipeline:
+        for region, data in aws_fetch_regions(get_vpc_peerings_data, boto3_session, regions, max_workers=max_workers):
+            logger.debug("Syncing EC2 VPC peering for region '%s' in account '%s'.", region, current_aws_account_id)
+            pipeline.submit(load_vpc_peerings, data, region, current_aws_account_id, update_tag)
+            pipeline.submit(load_accepter_cidrs, data, region, current_aws_account_id, update_tag)
+            pipeline.submit(load_requester_cidrs, data, region, current_aws_account_id, update_tag)
+        pipeline.submit(cleanup_vpc_peerings, common_job_parameters)
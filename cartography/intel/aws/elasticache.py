@@ -7,6 +7,8 @@ import boto3
 import neo4j
 import uuid
 
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.stats import get_stats_client
 from cartography.util import aws_handle_regions
 from cartography.util import merge_module_sync_metadata
@@ -111,10 +113,13 @@ def cleanup(neo4j_session: neo4j.Session, current_aws_account_id: str, update_ta
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
+    max_workers = sync_options.region_max_workers
+    for region, clusters in aws_fetch_regions(
+        get_elasticache_clusters, boto3_session, regions, max_workers=max_workers,
+    ):
         logger.info(f"Syncing ElastiCache clusters for region '{region}' in account {current_aws_account_id}")
-        clusters = get_elasticache_clusters(boto3_session, region)
         load_elasticache_clusters(neo4j_session, clusters, region, current_aws_account_id, update_tag)
     cleanup(neo4j_session, current_aws_account_id, update_tag)
     merge_module_sync_metadata(
@@ -9,6 +9,7 @@ import neo4j
 from policyuniverse.policy import Policy
 import uuid
 
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.intel.dns import ingest_dns_record_by_fqdn
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
@@ -237,6 +238,7 @@ def cleanup(neo4j_session: neo4j.Session, update_tag: int, aws_account_id: int)
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
     for region in es_regions:
         logger.info("Syncing Elasticsearch Service for region '%s' in account '%s'.", region, current_aws_account_id)
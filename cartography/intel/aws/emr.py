@@ -9,6 +9,7 @@ import neo4j
 import uuid
 
 from cartography.intel.aws.ec2.util import get_botocore_config
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -109,6 +110,7 @@ def cleanup(neo4j_session: neo4j.Session, common_job_parameters: Dict) -> None:
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
     for region in regions:
         logger.info("Syncing EMR for region '%s' in account '%s'.", region, current_aws_account_id)
@@ -1,17 +1,23 @@
+import copy
 import enum
 import json
 import logging
+import urllib.parse
 from typing import Any
 from typing import Dict
 from typing import List
+from typing import Optional
 from typing import Tuple
 
 import boto3
 import neo4j
 import uuid
 
+from cartography.client.core.tx import load_graph_data
+from cartography.intel.aws.permission_relationships import calculate_permission_relationships
+from cartography.intel.aws.permission_relationships import compile_statement
 from cartography.intel.aws.permission_relationships import parse_statement_node
-from cartography.intel.aws.permission_relationships import principal_allowed_on_resource
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.stats import get_stats_client
 from cartography.util import merge_module_sync_metadata
 from cartography.util import run_cleanup_job
@@ -190,6 +196,81 @@ def get_role_list_data(boto3_session: boto3.session.Session) -> Dict:
     return {'Roles': roles}
 
 
+@timeit
+def get_account_authorization_details(boto3_session: boto3.session.Session) -> Dict:
+    """
+    Get the users, groups and roles of the account with their inline policies and attached managed policies, and the
+    documents of the managed policies, in one paginated sweep instead of several API calls per principal.
+    """
+    client = boto3_session.client('iam')
+    paginator = client.get_paginator('get_account_authorization_details')
+    details: Dict[str, List[Dict]] = {
+        'UserDetailList': [],
+        'GroupDetailList': [],
+        'RoleDetailList': [],
+        'Policies': [],
+    }
+    for page in paginator.paginate(Filter=['User', 'Group', 'Role', 'LocalManagedPolicy', 'AWSManagedPolicy']):
+        for key in details:
+            details[key].extend(page.get(key, []))
+    return details
+
+
+def _get_policy_document(document: Any) -> Dict:
+    # boto3 decodes policy documents, but fall back to the URL-encoded JSON that the IAM API returns.
+    if isinstance(document, str):
+        return json.loads(urllib.parse.unquote(document))
+    return document
+
+
+def transform_managed_policy_documents(policies: List[Dict]) -> Dict[str, Any]:
+    """
+    Return the statements of the default version of each managed policy in the `Policies` list of
+    get_account_authorization_details(), keyed by policy ARN. Every policy version is only decoded once, however many
+    principals it is attached to.
+    """
+    statements_by_arn: Dict[str, Any] = {}
+    for policy in policies:
+        if policy['Arn'] in statements_by_arn:
+            continue
+        for version in policy.get('PolicyVersionList', []):
+            if version.get('IsDefaultVersion') or version.get('VersionId') == policy.get('DefaultVersionId'):
+                statements_by_arn[policy['Arn']] = _get_policy_document(version['Document'])['Statement']
+                break
+    return statements_by_arn
+
+
+def transform_authorization_details_policies(
+    principal_details: List[Dict], inline_policy_key: str, managed_policy_statements: Dict[str, Any],
+) -> Tuple[Dict, Dict]:
+    """
+    Build the inline and managed policy maps of the given principals from get_account_authorization_details(), in the
+    `{principal_arn: {policy_name: statements}}` shape that get_role_policy_data() and
+    get_role_managed_policy_data() return.
+
+    :param principal_details: The UserDetailList, GroupDetailList or RoleDetailList
+    :param inline_policy_key: The key of the principals' inline policies, e.g. RolePolicyList
+    :param managed_policy_statements: The output of transform_managed_policy_documents()
+    :return: The inline policy map and the managed policy map
+    """
+    inline_policies: Dict[str, Dict] = {}
+    managed_policies: Dict[str, Dict] = {}
+    for principal in principal_details:
+        arn = principal['Arn']
+        inline_policies[arn] = {
+            p['PolicyName']: _get_policy_document(p['PolicyDocument'])['Statement']
+            for p in principal.get(inline_policy_key, [])
+        }
+        managed_policies[arn] = {}
+        for p in principal.get('AttachedManagedPolicies', []):
+            if p['PolicyArn'] not in managed_policy_statements:
+                logger.warning(f"Could not find the document of managed policy {p['PolicyArn']}; skipping.")
+                continue
+            # transform_policy_data() sets principal-specific statement ids, so every principal needs its own copy.
+            managed_policies[arn][p['PolicyName']] = copy.deepcopy(managed_policy_statements[p['PolicyArn']])
+    return inline_policies, managed_policies
+
+
 @timeit
 def get_account_access_key_data(boto3_session: boto3.session.Session, username: str) -> Dict:
     client = boto3_session.client('iam')
@@ -209,11 +290,12 @@ def load_users(
     neo4j_session: neo4j.Session, users: List[Dict], current_aws_account_id: str, aws_update_tag: int,
 ) -> None:
     ingest_user = """
-    MERGE (unode:AWSUser{arn: {ARN}})
-    ON CREATE SET unode:AWSPrincipal, unode.userid = {USERID}, unode.firstseen = timestamp(),
-    unode.createdate = {CREATE_DATE},
+    UNWIND {DictList} AS user
+    MERGE (unode:AWSUser{arn: user.ARN})
+    ON CREATE SET unode:AWSPrincipal, unode.userid = user.USERID, unode.firstseen = timestamp(),
+    unode.createdate = user.CREATE_DATE,
     unode.borneo_id = apoc.create.uuid()
-    SET unode.name = {USERNAME}, unode.path = {PATH}, unode.passwordlastused = {PASSWORD_LASTUSED},
+    SET unode.name = user.USERNAME, unode.path = user.PATH, unode.passwordlastused = user.PASSWORD_LASTUSED,
     unode.lastupdated = {aws_update_tag}
     WITH unode
     MATCH (aa:AWSAccount{id: {AWS_ACCOUNT_ID}})
@@ -222,18 +304,23 @@ def load_users(
     SET r.lastupdated = {aws_update_tag}
     """
     logger.info(f"Loading {len(users)} IAM users.")
-    for user in users:
-        neo4j_session.run(
-            ingest_user,
-            ARN=user["Arn"],
-            USERID=user["UserId"],
-            CREATE_DATE=str(user["CreateDate"]),
-            USERNAME=user["UserName"],
-            PATH=user["Path"],
-            PASSWORD_LASTUSED=str(user.get("PasswordLastUsed", "")),
-            AWS_ACCOUNT_ID=current_aws_account_id,
-            aws_update_tag=aws_update_tag
-        )
+    user_data = [
+        {
+            'ARN': user["Arn"],
+            'USERID': user["UserId"],
+            'CREATE_DATE': str(user["CreateDate"]),
+            'USERNAME': user["UserName"],
+            'PATH': user["Path"],
+            'PASSWORD_LASTUSED': str(user.get("PasswordLastUsed", "")),
+        } for user in users
+    ]
+    load_graph_data(
+        neo4j_session,
+        ingest_user,
+        user_data,
+        AWS_ACCOUNT_ID=current_aws_account_id,
+        aws_update_tag=aws_update_tag,
+    )
 
 
 @timeit
@@ -241,10 +328,11 @@ def load_groups(
     neo4j_session: neo4j.Session, groups: List[Dict], current_aws_account_id: str, aws_update_tag: int,
 ) -> None:
     ingest_group = """
-    MERGE (gnode:AWSGroup{arn: {ARN}})
-    ON CREATE SET gnode.groupid = {GROUP_ID}, gnode.firstseen = timestamp(), gnode.createdate = {CREATE_DATE},
+    UNWIND {DictList} AS grp
+    MERGE (gnode:AWSGroup{arn: grp.ARN})
+    ON CREATE SET gnode.groupid = grp.GROUP_ID, gnode.firstseen = timestamp(), gnode.createdate = grp.CREATE_DATE,
     gnode.borneo_id = apoc.create.uuid()
-    SET gnode:AWSPrincipal, gnode.name = {GROUP_NAME}, gnode.path = {PATH},gnode.lastupdated = {aws_update_tag}
+    SET gnode:AWSPrincipal, gnode.name = grp.GROUP_NAME, gnode.path = grp.PATH, gnode.lastupdated = {aws_update_tag}
     WITH gnode
     MATCH (aa:AWSAccount{id: {AWS_ACCOUNT_ID}})
     MERGE (aa)-[r:RESOURCE]->(gnode)
@@ -252,17 +340,22 @@ def load_groups(
     SET r.lastupdated = {aws_update_tag}
     """
     logger.info(f"Loading {len(groups)} IAM groups to the graph.")
-    for group in groups:
-        neo4j_session.run(
-            ingest_group,
-            ARN=group["Arn"],
-            GROUP_ID=group["GroupId"],
-            CREATE_DATE=str(group["CreateDate"]),
-            GROUP_NAME=group["GroupName"],
-            PATH=group["Path"],
-            AWS_ACCOUNT_ID=current_aws_account_id,
-            aws_update_tag=aws_update_tag
-        )
+    group_data = [
+        {
+            'ARN': group["Arn"],
+            'GROUP_ID': group["GroupId"],
+            'CREATE_DATE': str(group["CreateDate"]),
+            'GROUP_NAME': group["GroupName"],
+            'PATH': group["Path"],
+        } for group in groups
+    ]
+    load_graph_data(
+        neo4j_session,
+        ingest_group,
+        group_data,
+        AWS_ACCOUNT_ID=current_aws_account_id,
+        aws_update_tag=aws_update_tag,
+    )
 
 
 def _parse_principal_entries(principal: Dict) -> List[Tuple[Any, Any]]:
@@ -285,11 +378,12 @@ def load_roles(
     neo4j_session: neo4j.Session, roles: List[Dict], current_aws_account_id: str, aws_update_tag: int,
 ) -> None:
     ingest_role = """
-    MERGE (rnode:AWSRole{arn: {Arn}})
-    ON CREATE SET rnode:AWSPrincipal, rnode.roleid = {RoleId}, rnode.firstseen = timestamp(),
-    rnode.createdate = {CreateDate},
+    UNWIND {DictList} AS role
+    MERGE (rnode:AWSRole{arn: role.Arn})
+    ON CREATE SET rnode:AWSPrincipal, rnode.roleid = role.RoleId, rnode.firstseen = timestamp(),
+    rnode.createdate = role.CreateDate,
     rnode.borneo_id = apoc.create.uuid()
-    ON MATCH SET rnode.name = {RoleName}, rnode.path = {Path}
+    ON MATCH SET rnode.name = role.RoleName, rnode.path = role.Path
     SET rnode.lastupdated = {aws_update_tag}
     WITH rnode
     MATCH (aa:AWSAccount{id: {AWS_ACCOUNT_ID}})
@@ -299,11 +393,12 @@ def load_roles(
     """
 
     ingest_policy_statement = """
-    MERGE (spnnode:AWSPrincipal{arn: {SpnArn}})
+    UNWIND {DictList} AS statement
+    MERGE (spnnode:AWSPrincipal{arn: statement.SpnArn})
     ON CREATE SET spnnode.firstseen = timestamp()
-    SET spnnode.lastupdated = {aws_update_tag}, spnnode.type = {SpnType}
-    WITH spnnode
-    MATCH (role:AWSRole{arn: {RoleArn}})
+    SET spnnode.lastupdated = {aws_update_tag}, spnnode.type = statement.SpnType
+    WITH spnnode, statement
+    MATCH (role:AWSRole{arn: statement.RoleArn})
     MERGE (role)-[r:TRUSTS_AWS_PRINCIPAL]->(spnnode)
     ON CREATE SET r.firstseen = timestamp()
     SET r.lastupdated = {aws_update_tag}
@@ -311,28 +406,34 @@ def load_roles(
 
     # TODO support conditions
     logger.info(f"Loading {len(roles)} IAM roles to the graph.")
+    role_data = []
+    trust_data = []
     for role in roles:
-        neo4j_session.run(
-            ingest_role,
-            Arn=role["Arn"],
-            RoleId=role["RoleId"],
-            CreateDate=str(role["CreateDate"]),
-            RoleName=role["RoleName"],
-            Path=role["Path"],
-            AWS_ACCOUNT_ID=current_aws_account_id,
-            aws_update_tag=aws_update_tag
-        )
-
+        role_data.append({
+            'Arn': role["Arn"],
+            'RoleId': role["RoleId"],
+            'CreateDate': str(role["CreateDate"]),
+            'RoleName': role["RoleName"],
+            'Path': role["Path"],
+        })
         for statement in role["AssumeRolePolicyDocument"]["Statement"]:
             principal_entries = _parse_principal_entries(statement["Principal"])
             for principal_type, principal_value in principal_entries:
-                neo4j_session.run(
-                    ingest_policy_statement,
-                    SpnArn=principal_value,
-                    SpnType=principal_type,
-                    RoleArn=role['Arn'],
-                    aws_update_tag=aws_update_tag,
-                )
+                trust_data.append({
+                    'SpnArn': principal_value,
+                    'SpnType': principal_type,
+                    'RoleArn': role['Arn'],
+                })
+
+    load_graph_data(
+        neo4j_session,
+        ingest_role,
+        role_data,
+        AWS_ACCOUNT_ID=current_aws_account_id,
+        aws_update_tag=aws_update_tag,
+    )
+    # Every role node exists by now, so the trust relationships can be written in bulk afterwards.
+    load_graph_data(neo4j_session, ingest_policy_statement, trust_data, aws_update_tag=aws_update_tag)
 
 
 @timeit
@@ -380,6 +481,55 @@ def get_policies_for_principal(neo4j_session: neo4j.Session, principal_arn: str)
     return policies
 
 
+@timeit
+def get_policies_for_principals(neo4j_session: neo4j.Session, principal_arns: List[str]) -> Dict[str, Dict]:
+    """
+    Get the policies of all the given principals in one query, see get_policies_for_principal().
+
+    :return: The policies keyed by principal ARN, with compiled statements. Principals without policies are omitted.
+    """
+    get_policy_query = """
+    MATCH
+    (principal:AWSPrincipal)-[:POLICY]->
+    (policy:AWSPolicy)-[:STATEMENT]->
+    (statements:AWSPolicyStatement)
+    WHERE principal.arn IN {Arns}
+    RETURN
+    DISTINCT principal.arn AS principal_arn, policy.id AS policy_id,
+    COLLECT(DISTINCT statements) AS statements
+    """
+    results = neo4j_session.run(
+        get_policy_query,
+        Arns=principal_arns,
+    )
+    policies: Dict[str, Dict] = {}
+    for r in results:
+        policies.setdefault(r["principal_arn"], {})[r["policy_id"]] = compile_statement(
+            parse_statement_node(r["statements"]),
+        )
+    return policies
+
+
+def calculate_assumerole_relationships(
+    policies_by_source: Dict[str, Dict], targets_by_source: Dict[str, List[str]],
+) -> List[Dict]:
+    """
+    Return the (source principal, target role) pairs where the source's policies allow sts:AssumeRole on the target.
+
+    :param policies_by_source: The policies of each source principal, see get_policies_for_principals()
+    :param targets_by_source: The roles that trust each source principal
+    :return: The allowed pairs as dicts with SourceArn and TargetArn keys
+    """
+    allowed_mappings: List[Dict] = []
+    for source_arn, target_arns in targets_by_source.items():
+        policies = policies_by_source.get(source_arn)
+        if not policies:
+            continue
+        for mapping in calculate_permission_relationships({source_arn: policies}, target_arns, ["sts:AssumeRole"]):
+            allowed_mappings.append({'SourceArn': mapping['principal_arn'], 'TargetArn': mapping['resource_arn']})
+    return allowed_mappings
+
+
 @timeit
 def sync_assumerole_relationships(
     neo4j_session: neo4j.Session, current_aws_account_id: str, aws_update_tag: int,
@@ -398,9 +548,10 @@ def sync_assumerole_relationships(
     """
 
     ingest_policies_assume_role = """
-    MATCH (source:AWSPrincipal{arn: {SourceArn}})
-    WITH source
-    MATCH (role:AWSRole{arn: {TargetArn}})
+    UNWIND {DictList} AS mapping
+    MATCH (source:AWSPrincipal{arn: mapping.SourceArn})
+    WITH source, mapping
+    MATCH (role:AWSRole{arn: mapping.TargetArn})
     WITH role, source
     MERGE (source)-[r:STS_ASSUMEROLE_ALLOW]->(role)
     ON CREATE SET r.firstseen = timestamp()
@@ -411,16 +562,16 @@ def sync_assumerole_relationships(
         query_potential_matches,
         AccountId=current_aws_account_id,
     )
-    potential_matches = [(r["source_arn"], r["target_arn"]) for r in results]
-    for source_arn, target_arn in potential_matches:
-        policies = get_policies_for_principal(neo4j_session, source_arn)
-        if principal_allowed_on_resource(policies, target_arn, ["sts:AssumeRole"]):
-            neo4j_session.run(
-                ingest_policies_assume_role,
-                SourceArn=source_arn,
-                TargetArn=target_arn,
-                aws_update_tag=aws_update_tag,
-            )
+    # Group the candidate target roles by source principal, so that each principal's policies are fetched and
+    # compiled once however many roles trust it.
+    targets_by_source: Dict[str, List[str]] = {}
+    for r in results:
+        targets = targets_by_source.setdefault(r["source_arn"], [])
+        if r["target_arn"] not in targets:
+            targets.append(r["target_arn"])
+    policies_by_source = get_policies_for_principals(neo4j_session, list(targets_by_source))
+    allowed_mappings = calculate_assumerole_relationships(policies_by_source, targets_by_source)
+    load_graph_data(neo4j_session, ingest_policies_assume_role, allowed_mappings, aws_update_tag=aws_update_tag)
     run_cleanup_job(
         'aws_import_roles_policy_cleanup.json',
         neo4j_session,
@@ -572,26 +723,86 @@ def load_policy_statements(
 
 @timeit
 def load_policy_data(neo4j_session: neo4j.Session, policy_map: Dict, policy_type: str, aws_update_tag: int) -> None:
+    """
+    Load the policies of all principals in `policy_map` in two batched passes: first all AWSPolicy nodes with their
+    POLICY relationships, then all AWSPolicyStatement nodes with their STATEMENT relationships. The queries are the same
+    as in load_policy() and load_policy_statements().
+    """
+    ingest_policies = """
+    UNWIND {DictList} AS policy_data
+    MERGE (policy:AWSPolicy{id: policy_data.PolicyId})
+    ON CREATE SET
+        policy.firstseen = timestamp(),
+        policy.type = policy_data.PolicyType,
+        policy.name = policy_data.PolicyName,
+        policy.borneo_id = apoc.create.uuid()
+    SET policy.lastupdated = {aws_update_tag}
+    WITH policy, policy_data
+    MATCH (principal:AWSPrincipal{arn: policy_data.PrincipalArn})
+    MERGE (policy) <-[r:POLICY]-(principal)
+    SET r.lastupdated = {aws_update_tag}
+    """
+
+    ingest_policy_statements = """
+    UNWIND {DictList} AS statement_data
+    MATCH (policy:AWSPolicy{id: statement_data.PolicyId})
+    MERGE (statement:AWSPolicyStatement{id: statement_data.id})
+    ON CREATE SET
+    statement.borneo_id = apoc.create.uuid()
+    SET
+    statement.effect = statement_data.Effect,
+    statement.action = statement_data.Action,
+    statement.notaction = statement_data.NotAction,
+    statement.resource = statement_data.Resource,
+    statement.notresource = statement_data.NotResource,
+    statement.condition = statement_data.Condition,
+    statement.sid = statement_data.Sid,
+    statement.lastupdated = {aws_update_tag}
+    MERGE (policy)-[r:STATEMENT]->(statement)
+    ON CREATE SET r.firstseen = timestamp()
+    SET r.lastupdated = {aws_update_tag}
+    """
+
+    policy_data = []
+    statement_data = []
     for principal_arn, policy_list in policy_map.items():
-        logger.debug(f"Syncing IAM inline policies for principal {principal_arn}")
         for policy_name, statements in policy_list.items():
             policy_id = transform_policy_id(principal_arn, policy_type, policy_name)
-            load_policy(neo4j_session, policy_id, policy_name, policy_type, principal_arn, aws_update_tag)
-            load_policy_statements(neo4j_session, policy_id, policy_name, statements, aws_update_tag)
+            policy_data.append({
+                'PolicyId': policy_id,
+                'PolicyName': policy_name,
+                'PolicyType': policy_type,
+                'PrincipalArn': principal_arn,
+            })
+            for statement in ensure_list(statements):
+                statement_data.append({**statement, 'PolicyId': policy_id})
+
+    logger.debug(f"Loading {len(policy_data)} IAM {policy_type} policies with {len(statement_data)} statements.")
+    load_graph_data(neo4j_session, ingest_policies, policy_data, aws_update_tag=aws_update_tag)
+    # Every policy node exists by now, so the statements can be written in bulk afterwards.
+    load_graph_data(neo4j_session, ingest_policy_statements, statement_data, aws_update_tag=aws_update_tag)
 
 
 @timeit
 def sync_users(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, current_aws_account_id: str,
-    aws_update_tag: int, common_job_parameters: Dict,
+    aws_update_tag: int, common_job_parameters: Dict, authorization_details: Optional[Dict] = None,
+    managed_policy_statements: Optional[Dict[str, Any]] = None,
 ) -> None:
     logger.info("Syncing IAM users for account '%s'.", current_aws_account_id)
+    # list_users is still called in bulk mode because only it returns PasswordLastUsed.
     data = get_user_list_data(boto3_session)
     load_users(neo4j_session, data['Users'], current_aws_account_id, aws_update_tag)
 
-    sync_user_inline_policies(boto3_session, data, neo4j_session, aws_update_tag)
+    if authorization_details is None:
+        sync_user_inline_policies(boto3_session, data, neo4j_session, aws_update_tag)
 
-    sync_user_managed_policies(boto3_session, data, neo4j_session, aws_update_tag)
+        sync_user_managed_policies(boto3_session, data, neo4j_session, aws_update_tag)
+    else:
+        sync_authorization_details_policies(
+            neo4j_session, authorization_details['UserDetailList'], 'UserPolicyList', managed_policy_statements,
+            aws_update_tag,
+        )
 
     run_cleanup_job('aws_import_users_cleanup.json', neo4j_session, common_job_parameters)
 
@@ -619,15 +830,25 @@ def sync_user_inline_policies(
 @timeit
 def sync_groups(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, current_aws_account_id: str,
-    aws_update_tag: int, common_job_parameters: Dict,
+    aws_update_tag: int, common_job_parameters: Dict, authorization_details: Optional[Dict] = None,
+    managed_policy_statements: Optional[Dict[str, Any]] = None,
 ) -> None:
     logger.info("Syncing IAM groups for account '%s'.", current_aws_account_id)
-    data = get_group_list_data(boto3_session)
+    if authorization_details is None:
+        data = get_group_list_data(boto3_session)
+    else:
+        data = {'Groups': authorization_details['GroupDetailList']}
     load_groups(neo4j_session, data['Groups'], current_aws_account_id, aws_update_tag)
 
-    sync_groups_inline_policies(boto3_session, data, neo4j_session, aws_update_tag)
+    if authorization_details is None:
+        sync_groups_inline_policies(boto3_session, data, neo4j_session, aws_update_tag)
 
-    sync_group_managed_policies(boto3_session, data, neo4j_session, aws_update_tag)
+        sync_group_managed_policies(boto3_session, data, neo4j_session, aws_update_tag)
+    else:
+        sync_authorization_details_policies(
+            neo4j_session, authorization_details['GroupDetailList'], 'GroupPolicyList', managed_policy_statements,
+            aws_update_tag,
+        )
 
     run_cleanup_job('aws_import_groups_cleanup.json', neo4j_session, common_job_parameters)
 
@@ -653,15 +874,25 @@ def sync_groups_inline_policies(
 @timeit
 def sync_roles(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, current_aws_account_id: str,
-    aws_update_tag: int, common_job_parameters: Dict,
+    aws_update_tag: int, common_job_parameters: Dict, authorization_details: Optional[Dict] = None,
+    managed_policy_statements: Optional[Dict[str, Any]] = None,
 ) -> None:
     logger.info("Syncing IAM roles for account '%s'.", current_aws_account_id)
-    data = get_role_list_data(boto3_session)
+    if authorization_details is None:
+        data = get_role_list_data(boto3_session)
+    else:
+        data = {'Roles': authorization_details['RoleDetailList']}
     load_roles(neo4j_session, data['Roles'], current_aws_account_id, aws_update_tag)
 
-    sync_role_inline_policies(current_aws_account_id, boto3_session, data, neo4j_session, aws_update_tag)
+    if authorization_details is None:
+        sync_role_inline_policies(current_aws_account_id, boto3_session, data, neo4j_session, aws_update_tag)
 
-    sync_role_managed_policies(current_aws_account_id, boto3_session, data, neo4j_session, aws_update_tag)
+        sync_role_managed_policies(current_aws_account_id, boto3_session, data, neo4j_session, aws_update_tag)
+    else:
+        sync_authorization_details_policies(
+            neo4j_session, authorization_details['RoleDetailList'], 'RolePolicyList', managed_policy_statements,
+            aws_update_tag,
+        )
 
     run_cleanup_job('aws_import_roles_cleanup.json', neo4j_session, common_job_parameters)
 
@@ -686,6 +917,28 @@ def sync_role_inline_policies(
     load_policy_data(neo4j_session, inline_policy_data, PolicyType.inline.value, aws_update_tag)
 
 
+def sync_authorization_details_policies(
+    neo4j_session: neo4j.Session, principal_details: List[Dict], inline_policy_key: str,
+    managed_policy_statements: Dict[str, Any], aws_update_tag: int,
+) -> None:
+    """
+    Load the inline and managed policies of one kind of principal from the output of
+    get_account_authorization_details().
+
+    :param principal_details: The UserDetailList, GroupDetailList or RoleDetailList of the authorization details
+    :param inline_policy_key: The key of the principals' inline policies, e.g. RolePolicyList
+    :param managed_policy_statements: The output of transform_managed_policy_documents() for the authorization
+    details' Policies
+    """
+    inline_policy_data, managed_policy_data = transform_authorization_details_policies(
+        principal_details, inline_policy_key, managed_policy_statements,
+    )
+    transform_policy_data(inline_policy_data, PolicyType.inline.value)
+    load_policy_data(neo4j_session, inline_policy_data, PolicyType.inline.value, aws_update_tag)
+    transform_policy_data(managed_policy_data, PolicyType.managed.value)
+    load_policy_data(neo4j_session, managed_policy_data, PolicyType.managed.value, aws_update_tag)
+
+
 @timeit
 def sync_group_memberships(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session,
@@ -729,13 +982,29 @@ def sync_user_access_keys(
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
     logger.info("Syncing IAM for account '%s'.", current_aws_account_id)
     # This module only syncs IAM information that is in use.
     # As such only policies that are attached to a user, role or group are synced
-    sync_users(neo4j_session, boto3_session, current_aws_account_id, update_tag, common_job_parameters)
-    sync_groups(neo4j_session, boto3_session, current_aws_account_id, update_tag, common_job_parameters)
-    sync_roles(neo4j_session, boto3_session, current_aws_account_id, update_tag, common_job_parameters)
+    authorization_details = None
+    managed_policy_statements = None
+    if sync_options.iam_bulk_fetch:
+        authorization_details = get_account_authorization_details(boto3_session)
+        # Users, groups and roles share the account's managed policies, so their documents are transformed once.
+        managed_policy_statements = transform_managed_policy_documents(authorization_details['Policies'])
+    sync_users(
+        neo4j_session, boto3_session, current_aws_account_id, update_tag, common_job_parameters, authorization_details,
+        managed_policy_statements,
+    )
+    sync_groups(
+        neo4j_session, boto3_session, current_aws_account_id, update_tag, common_job_parameters, authorization_details,
+        managed_policy_statements,
+    )
+    sync_roles(
+        neo4j_session, boto3_session, current_aws_account_id, update_tag, common_job_parameters, authorization_details,
+        managed_policy_statements,
+    )
     sync_group_memberships(neo4j_session, boto3_session, current_aws_account_id, update_tag, common_job_parameters)
     sync_assumerole_relationships(neo4j_session, current_aws_account_id, update_tag, common_job_parameters)
     sync_user_access_keys(neo4j_session, boto3_session, current_aws_account_id, update_tag, common_job_parameters)
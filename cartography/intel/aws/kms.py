@@ -14,6 +14,7 @@ from botocore.exceptions import ClientError
 from policyuniverse.policy import Policy
 import uuid
 
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -361,6 +362,7 @@ def sync_kms_keys(
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
     for region in regions:
         logger.info("Syncing KMS for region %s in account '%s'.", region, current_aws_account_id)
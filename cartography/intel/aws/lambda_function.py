@@ -9,6 +9,8 @@ import botocore
 import neo4j
 import uuid
 
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -245,10 +247,11 @@ def cleanup_lambda(neo4j_session: neo4j.Session, common_job_parameters: Dict) ->
 def sync_lambda_functions(
         neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str],
         current_aws_account_id: str, aws_update_tag: int, common_job_parameters: Dict,
+        sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
+    max_workers = sync_options.region_max_workers
+    for region, data in aws_fetch_regions(get_lambda_data, boto3_session, regions, max_workers=max_workers):
         logger.info("Syncing Lambda for region in '%s' in account '%s'.", region, current_aws_account_id)
-        data = get_lambda_data(boto3_session, region)
         load_lambda_functions(neo4j_session, data, region, current_aws_account_id, aws_update_tag)
         lambda_function_details = get_lambda_function_details(boto3_session, data, region)
         load_lambda_function_details(neo4j_session, lambda_function_details, aws_update_tag)
@@ -260,7 +263,8 @@ def sync_lambda_functions(
 def sync(
         neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str],
         current_aws_account_id: str, update_tag: int, common_job_parameters: Dict,
+        sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
     sync_lambda_functions(
-        neo4j_session, boto3_session, regions, current_aws_account_id, update_tag, common_job_parameters,
+        neo4j_session, boto3_session, regions, current_aws_account_id, update_tag, common_job_parameters, sync_options,
     )
@@ -1,11 +1,21 @@
+import bisect
 import logging
+import math
+import multiprocessing
 import os
 import re
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from string import Template
 from typing import Any
 from typing import Dict
+from typing import FrozenSet
+from typing import Iterator
 from typing import List
+from typing import Optional
 from typing import Pattern
+from typing import Set
 from typing import Tuple
 
 import boto3
@@ -13,6 +23,8 @@ import neo4j
 import yaml
 
 from cartography.graph.statement import GraphStatement
+from cartography.intel.aws.util.common import AWSSyncOptions
+from cartography.util import batch
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
@@ -156,6 +168,213 @@ def principal_allowed_on_resource(policies: Dict, resource_arn: str, permissions
     return granted
 
 
+_REGEX_SPECIAL_CHARACTERS = frozenset('\\.^$*+?{}[]|()')
+
+
+def _is_ascii(value: str) -> bool:
+    try:
+        value.encode('ascii')
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+def _clause_shape(pattern: Pattern) -> Optional[Tuple[str, str]]:
+    """ Classify a compiled clause so that it can be matched against ARNs without running the regex.
+
+    Only clauses built by compile_regex() from plain ASCII text qualify: their regex is a literal with escaped periods
+    and `.*` / `.?` wildcards.
+
+    Arguments:
+        pattern {re.Pattern} -- The compiled clause
+
+    Returns:
+        [(str, str)] -- (lowercase literal prefix, kind) where kind is
+        'exact' - the clause is the literal itself
+        'prefix' - the clause is the literal followed by a single variable length wildcard
+        'regex' - the clause starts with the literal, and the rest must be checked with the regex
+        None if the clause cannot be classified and must always be checked with the regex
+    """
+    if not pattern.flags & re.IGNORECASE or not _is_ascii(pattern.pattern):
+        return None
+    text = pattern.pattern
+    literal: List[str] = []
+    prefix: Optional[str] = None
+    rest = ''
+    i = 0
+    while i < len(text):
+        if text.startswith('\\.', i):
+            literal.append('.')
+            i += 2
+        elif text.startswith('.*', i) or text.startswith('.?', i):
+            if prefix is None:
+                prefix, rest = ''.join(literal), text[i:]
+            i += 2
+        elif text[i] in _REGEX_SPECIAL_CHARACTERS:
+            return None
+        else:
+            literal.append(text[i])
+            i += 1
+    if prefix is None:
+        return ''.join(literal).lower(), 'exact'
+    return prefix.lower(), 'prefix' if rest == '.*' else 'regex'
+
+
+class ResourceArnIndex:
+    """ An index over the resource ARNs being evaluated, used to find the resources that a resource or notresource
+    clause matches without running the clause regex against every ARN.
+
+    The ARNs are kept sorted by their lowercase form, so the ARNs that start with the literal prefix of a clause
+    (the text before its first wildcard) are found with a binary search. Only these candidates are checked further, and
+    clauses such as `arn:aws:s3:::bucket/*` or exact ARNs need no regex at all. ARNs that the fast path cannot handle
+    exactly (non-ASCII characters or newlines) are always checked with the regex. Results are cached per clause, so a
+    clause shared by many policies, like `*`, is evaluated once.
+    """
+
+    def __init__(self, resource_arns: List[str]):
+        self.resource_arns = resource_arns
+        sorted_entries = sorted(
+            (arn.lower(), i) for i, arn in enumerate(resource_arns) if _is_ascii(arn) and '\n' not in arn
+        )
+        self._sorted_arns = [arn for arn, _ in sorted_entries]
+        self._sorted_indices = [i for _, i in sorted_entries]
+        self._irregular_indices = [
+            i for i, arn in enumerate(resource_arns) if not _is_ascii(arn) or '\n' in arn
+        ]
+        self._clause_cache: Dict[Tuple[str, int], FrozenSet[int]] = {}
+        self.all_indices = frozenset(range(len(resource_arns)))
+
+    def match_clause(self, clause: Any) -> FrozenSet[int]:
+        """ Return the indices of the resource ARNs that the clause matches, see evaluate_clause() """
+        pattern = compile_regex(clause)
+        key = (pattern.pattern, pattern.flags)
+        if key not in self._clause_cache:
+            self._clause_cache[key] = frozenset(self._match_clause(pattern))
+        return self._clause_cache[key]
+
+    def match_clauses(self, clauses: List[Any]) -> FrozenSet[int]:
+        """ Return the indices of the resource ARNs that any of the clauses match """
+        matched: FrozenSet[int] = frozenset()
+        for clause in clauses:
+            matched = matched | self.match_clause(clause)
+        return matched
+
+    def _match_clause(self, pattern: Pattern) -> Iterator[int]:
+        shape = _clause_shape(pattern)
+        if shape is None:
+            yield from (i for i, arn in enumerate(self.resource_arns) if pattern.fullmatch(arn))
+            return
+        prefix, kind = shape
+        position = bisect.bisect_left(self._sorted_arns, prefix)
+        while position < len(self._sorted_arns) and self._sorted_arns[position].startswith(prefix):
+            index = self._sorted_indices[position]
+            if kind == 'prefix':
+                yield index
+            elif kind == 'exact':
+                if self._sorted_arns[position] != prefix:
+                    break
+                yield index
+            elif pattern.fullmatch(self.resource_arns[index]):
+                yield index
+            position += 1
+        yield from (i for i in self._irregular_indices if pattern.fullmatch(self.resource_arns[i]))
+
+
+def _statement_key(statement: Dict) -> Tuple:
+    def clauses_key(name: str) -> Optional[Tuple]:
+        if name not in statement:
+            return None
+        return tuple((p.pattern, p.flags) for p in map(compile_regex, statement[name]))
+    return (
+        statement["effect"], clauses_key('action'), clauses_key('notaction'), clauses_key('resource'),
+        clauses_key('notresource'),
+    )
+
+
+class PermissionEvaluator:
+    """ Evaluates which principals are allowed the given permissions on a list of resources.
+
+    This gives the same results as calling principal_allowed_on_resource() for every principal and resource, but
+    works a policy at a time on sets of resources instead of a resource at a time:
+    - Whether a statement's action/notaction clauses cover a permission does not depend on the resource, so it is
+      computed once per statement and permission. Statements and policies that cannot apply to any of the permissions
+      are dropped before any resource is looked at, which prunes most principals.
+    - The resources each remaining statement applies to are found through a ResourceArnIndex.
+    - Policies with the same statements, such as managed policies attached to many principals, are evaluated once.
+    """
+
+    def __init__(self, resource_arns: List[str], permissions: List[str]):
+        self.index = ResourceArnIndex(resource_arns)
+        self.permissions = permissions
+        self._policy_cache: Dict[Tuple, Tuple[FrozenSet[int], FrozenSet[int]]] = {}
+        self._statement_resource_cache: Dict[Tuple, FrozenSet[int]] = {}
+
+    def _statement_resources(self, statement: Dict, key: Tuple) -> FrozenSet[int]:
+        """ The indices of the resources that the statement's resource and notresource clauses select """
+        resource_key = key[3:]
+        if resource_key not in self._statement_resource_cache:
+            resources = self.index.match_clauses(statement.get('resource', []))
+            if resources and 'notresource' in statement:
+                resources = resources - self.index.match_clauses(statement['notresource'])
+            self._statement_resource_cache[resource_key] = resources
+        return self._statement_resource_cache[resource_key]
+
+    def evaluate_policy(self, statements: List[Dict]) -> Tuple[FrozenSet[int], FrozenSet[int]]:
+        """ Evaluate a policy against all resources, see evaluate_policy_for_permissions()
+
+        Arguments:
+            statements {[dict]} -- The list of statements for the policy
+
+        Returns:
+            [(frozenset, frozenset)] -- The indices of the resources that the policy allows and explicitly denies
+        """
+        keys = [_statement_key(statement) for statement in statements]
+        policy_key = tuple(keys)
+        if policy_key in self._policy_cache:
+            return self._policy_cache[policy_key]
+
+        allowed: Set[int] = set()
+        denied: Set[int] = set()
+        undecided = set(self.index.all_indices)
+        for permission in self.permissions:
+            if not undecided:
+                break
+            matched: Dict[str, Set[int]] = {"Allow": set(), "Deny": set()}
+            for statement, key in zip(statements, keys):
+                effect = statement["effect"]
+                if effect not in matched:
+                    continue
+                if evaluate_notaction_for_permission(statement, permission):
+                    continue
+                if not evaluate_action_for_permission(statement, permission):
+                    continue
+                matched[effect] |= self._statement_resources(statement, key)
+            # As in evaluate_policy_for_permissions(), the first permission that is denied or allowed on a resource
+            # decides the policy's result for it.
+            newly_denied = matched["Deny"] & undecided
+            newly_allowed = (matched["Allow"] & undecided) - newly_denied
+            denied |= newly_denied
+            allowed |= newly_allowed
+            undecided -= newly_denied
+            undecided -= newly_allowed
+
+        result = frozenset(allowed), frozenset(denied)
+        self._policy_cache[policy_key] = result
+        return result
+
+    def allowed_resources(self, policies: Dict) -> Set[int]:
+        """ Return the indices of the resources that the principal's policies allow, see
+        principal_allowed_on_resource()
+        """
+        granted: Set[int] = set()
+        denied: Set[int] = set()
+        for statements in policies.values():
+            policy_allowed, policy_denied = self.evaluate_policy(statements)
+            granted |= policy_allowed
+            denied |= policy_denied
+        return granted - denied
+
+
 def calculate_permission_relationships(
     principals: Dict, resource_arns: List[str], permissions: List[str],
 ) -> List[Dict]:
@@ -168,6 +387,9 @@ def calculate_permission_relationships(
     AWS Policy evaluation reference
     https://docs.aws.amazon.com/IAM/latest/UserGuide/reference_policies_evaluation-logic.html
 
+    The evaluation is done by a PermissionEvaluator and gives the same result, in the same order, as calling
+    principal_allowed_on_resource() for each resource and principal.
+
     Arguments:
         principals {[dict]} -- The principals to check permission for
         resource_arns {[str]} -- The resources to test the permission against
@@ -176,11 +398,53 @@ def calculate_permission_relationships(
     Returns:
         [dict] -- The allowed mappings
     """
+    if not resource_arns or not principals:
+        return []
+    if not isinstance(permissions, list):
+        raise ValueError("permissions is not a list")
+    evaluator = PermissionEvaluator(resource_arns, permissions)
+    principals_by_resource: Dict[int, List[str]] = {}
+    for principal_arn, policies in principals.items():
+        for resource_index in evaluator.allowed_resources(policies):
+            principals_by_resource.setdefault(resource_index, []).append(principal_arn)
+
     allowed_mappings: List[Dict] = []
-    for resource_arn in resource_arns:
-        for principal_arn, policies in principals.items():
-            if principal_allowed_on_resource(policies, resource_arn, permissions):
-                allowed_mappings.append({"principal_arn": principal_arn, "resource_arn": resource_arn})
+    for resource_index in sorted(principals_by_resource):
+        for principal_arn in principals_by_resource[resource_index]:
+            allowed_mappings.append({"principal_arn": principal_arn, "resource_arn": resource_arns[resource_index]})
+    return allowed_mappings
+
+
+def calculate_permission_relationships_in_parallel(
+    executor: Executor, shard_count: int, principals: Dict, resource_arns: List[str], permissions: List[str],
+) -> List[Dict]:
+    """ Evaluate principals permissions to resources like calculate_permission_relationships(), with the resources
+    split into `shard_count` contiguous shards that are evaluated on the given executor, usually a
+    ProcessPoolExecutor.
+
+    The principals are sent to the workers with their compiled statements; re.Pattern objects are pickled as their
+    pattern and flags. The shard results are concatenated in shard order, so the mappings are the same, in the same
+    order, as the ones calculate_permission_relationships() returns.
+
+    Arguments:
+        executor {Executor} -- The executor to evaluate the shards on
+        shard_count {int} -- The number of shards to split the resources into
+        principals {[dict]} -- The principals to check permission for
+        resource_arns {[str]} -- The resources to test the permission against
+        permissions {[str]} -- The permissions to evaluate
+
+    Returns:
+        [dict] -- The allowed mappings
+    """
+    if shard_count <= 1 or len(resource_arns) < 2 or not principals:
+        return calculate_permission_relationships(principals, resource_arns, permissions)
+    shards = batch(resource_arns, size=math.ceil(len(resource_arns) / shard_count))
+    allowed_mappings: List[Dict] = []
+    # Executor.map() yields the results in the order of the shards, whichever worker finishes first.
+    for shard_mappings in executor.map(
+        calculate_permission_relationships, repeat(principals), shards, repeat(permissions),
+    ):
+        allowed_mappings.extend(shard_mappings)
     return allowed_mappings
 
 
@@ -357,6 +621,7 @@ def is_valid_rpr(rpr: Dict) -> bool:
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
     logger.info("Syncing Permission Relationships for account '%s'.", current_aws_account_id)
     principals = get_principals_for_account(neo4j_session, current_aws_account_id)
@@ -368,20 +633,36 @@ def sync(
         )
         return
     relationship_mapping = parse_permission_relationships_file(pr_file)
-    for rpr in relationship_mapping:
-        if not is_valid_rpr(rpr):
-            raise ValueError("""
+    max_workers = sync_options.permission_relationships_max_workers
+    executor: Optional[Executor] = None
+    if max_workers > 1 and relationship_mapping:
+        logger.info("Calculating permission relationships in up to %d processes.", max_workers)
+        # By now this process runs other threads, e.g. the Neo4j driver's and the sync worker pools. A forked worker
+        # could inherit a lock that one of them held and deadlock, so the workers are spawned instead.
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'))
+    try:
+        for rpr in relationship_mapping:
+            if not is_valid_rpr(rpr):
+                raise ValueError("""
         Resource permission relationship is missing fields.
         Required fields: permissions, relationship_name, target_label"
         """)
-        permissions = rpr["permissions"]
-        relationship_name = rpr["relationship_name"]
-        target_label = rpr["target_label"]
-        resource_arns = get_resource_arns(neo4j_session, current_aws_account_id, target_label)
-        logger.info("Syncing relationship '%s' for node label '%s'", relationship_name, target_label)
-        allowed_mappings = calculate_permission_relationships(principals, resource_arns, permissions)
-        load_principal_mappings(
-            neo4j_session, allowed_mappings,
-            target_label, relationship_name, update_tag,
-        )
-        cleanup_rpr(neo4j_session, target_label, relationship_name, update_tag, current_aws_account_id)
+            permissions = rpr["permissions"]
+            relationship_name = rpr["relationship_name"]
+            target_label = rpr["target_label"]
+            resource_arns = get_resource_arns(neo4j_session, current_aws_account_id, target_label)
+            logger.info("Syncing relationship '%s' for node label '%s'", relationship_name, target_label)
+            if executor is not None:
+                allowed_mappings = calculate_permission_relationships_in_parallel(
+                    executor, max_workers, principals, resource_arns, permissions,
+                )
+            else:
+                allowed_mappings = calculate_permission_relationships(principals, resource_arns, permissions)
+            load_principal_mappings(
+                neo4j_session, allowed_mappings,
+                target_label, relationship_name, update_tag,
+            )
+            cleanup_rpr(neo4j_session, target_label, relationship_name, update_tag, current_aws_account_id)
+    finally:
+        if executor is not None:
+            executor.shutdown()
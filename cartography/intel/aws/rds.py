@@ -6,6 +6,7 @@ import boto3
 import neo4j
 from botocore.exceptions import ClientError
 import cartography.intel.aws.util.common as filterfn
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.stats import get_stats_client
 from cartography.util import (aws_handle_regions, dict_value_to_str,
                               merge_module_sync_metadata, run_cleanup_job,
@@ -484,6 +485,7 @@ def sync_rds_instances(
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
     logger.info(common_job_parameters)
     sync_rds_clusters(
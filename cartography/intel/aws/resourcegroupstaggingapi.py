@@ -5,6 +5,7 @@ from typing import Dict, List
 
 import boto3
 import neo4j
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions, batch, run_cleanup_job, timeit
 
 logger = logging.getLogger(__name__)
@@ -229,6 +230,7 @@ def sync(
     current_aws_account_id: str,
     update_tag: int,
     common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
     tag_resource_type_mappings: Dict = TAG_RESOURCE_TYPE_MAPPINGS,
 ) -> None:
     tagsToSync = tag_resource_type_mappings.keys()
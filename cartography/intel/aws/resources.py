@@ -1,4 +1,5 @@
 from typing import Dict
+from typing import List
 
 from cartography.intel.aws import s3_list_only
 
@@ -33,8 +34,6 @@ RESOURCE_FUNCTIONS: Dict = {
     'dynamodb': dynamodb.sync,
     'ec2:launch_templates': sync_ec2_launch_templates,
     'ec2:autoscalinggroup': sync_ec2_auto_scaling_groups,
-    # `ec2:instance` must be included before `ssm` and `ec2:images`,
-    # they rely on EC2Instance data provided by this module.
     'ec2:instance': sync_ec2_instances,
     'ec2:images': sync_ec2_images,
     'ec2:keypair': sync_ec2_key_pairs,
@@ -72,6 +71,52 @@ RESOURCE_FUNCTIONS: Dict = {
     'config': config.sync,
 }
 
+# Syncs that read or MATCH on data written by other syncs, or that MERGE the same nodes as other syncs. There are no
+# uniqueness constraints on these node keys, so two syncs that MERGE the same key at the same time could create
+# duplicate nodes. A sync only starts after every sync it depends on that was also requested has finished; see
+# `_sync_one_account`. Dependencies are not transitive across syncs that were not requested, so every pair of syncs
+# that MERGE the same key needs its own entry.
+RESOURCE_DEPENDENCIES: Dict[str, List[str]] = {
+    'ec2:autoscalinggroup': ['ec2:launch_templates', 'ec2:instance', 'ec2:subnet'],
+    'ec2:images': ['ec2:instance', 'ec2:autoscalinggroup', 'ec2:launch_templates'],
+    'ec2:instance': ['ec2:subnet', 'ec2:security_group', 'ec2:keypair'],
+    'ec2:load_balancer': ['ec2:instance', 'ec2:subnet'],
+    'ec2:load_balancer_v2': ['ec2:instance', 'ec2:subnet', 'ec2:autoscalinggroup', 'ec2:load_balancer'],
+    'ec2:network_interface': [
+        'ec2:instance', 'ec2:load_balancer', 'ec2:load_balancer_v2', 'ec2:subnet', 'ec2:security_group',
+        'ec2:autoscalinggroup', 'ec2:tgw', 'ec2:vpc_peering',
+    ],
+    'ec2:security_group': ['ec2:vpc'],
+    'ec2:subnet': ['ec2:vpc'],
+    'ec2:tgw': [
+        'ec2:vpc', 'ec2:subnet', 'ec2:instance', 'ec2:autoscalinggroup', 'ec2:load_balancer_v2', 'ec2:vpc_peering',
+    ],
+    'ec2:vpc_peering': ['ec2:vpc'],
+    'ec2:internet_gateway': ['ec2:vpc'],
+    'ec2:volumes': ['ec2:instance'],
+    'ec2:snapshots': ['ec2:volumes', 'ec2:instance'],
+    'elastic_ip_addresses': ['ec2:instance', 'ec2:network_interface'],
+    'elasticsearch': ['ec2:security_group', 'ec2:subnet'],
+    'lambda_function': ['iam'],
+    'rds': [
+        'ec2:security_group', 'ec2:subnet', 'ec2:instance', 'ec2:network_interface', 'ec2:autoscalinggroup',
+        'ec2:load_balancer_v2', 'ec2:tgw',
+    ],
+    'redshift': [
+        'ec2:security_group', 'ec2:vpc', 'iam', 'ec2:instance', 'ec2:network_interface', 'ec2:tgw',
+        'ec2:vpc_peering', 'rds',
+    ],
+    'route53': ['ec2:instance', 'ec2:load_balancer', 'ec2:load_balancer_v2'],
+    's3_list_only': ['s3'],
+    'ssm': ['ec2:instance'],
+    # Permission relationships rely on principals and resources already being in the graph.
+    'permission_relationships': [
+        name for name in RESOURCE_FUNCTIONS if name not in ('permission_relationships', 'resourcegroupstaggingapi')
+    ],
+    # AWS Tags - Must always be last.
+    'resourcegroupstaggingapi': [name for name in RESOURCE_FUNCTIONS if name != 'resourcegroupstaggingapi'],
+}
+
 RESOURCE_IDENTIFIERS: Dict = {
   'rds_cluster': 'DBClusterIdentifier',
   'rds_instance': 'DBInstanceIdentifier',
@@ -9,6 +9,7 @@ import botocore
 import neo4j
 import uuid
 
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
 
@@ -425,6 +426,7 @@ def cleanup_route53(neo4j_session: neo4j.Session, current_aws_id: str, update_ta
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
     logger.info("Syncing Route53 for account '%s'.", current_aws_account_id)
     client = boto3_session.client('route53')
@@ -1,6 +1,7 @@
 import hashlib
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 from typing import Dict
 from typing import Generator
@@ -18,6 +19,7 @@ from botocore.exceptions import ClientError
 from botocore.exceptions import EndpointConnectionError
 from policyuniverse.policy import Policy
 
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.stats import get_stats_client
 from cartography.util import merge_module_sync_metadata
 from cartography.util import run_analysis_job
@@ -29,25 +31,38 @@ stat_handler = get_stats_client(__name__)
 
 
 @timeit
-def get_s3_bucket_list(boto3_session: boto3.session.Session) -> List[Dict]:
+def get_s3_bucket_list(boto3_session: boto3.session.Session, max_workers: int = 1) -> List[Dict]:
+    """
+    List the S3 buckets and look up the region of each one. If `max_workers` is greater than 1, up to `max_workers`
+    bucket locations are looked up concurrently.
+    """
     client = boto3_session.client('s3')
     # NOTE no paginator available for this operation
     buckets = client.list_buckets()
-    for bucket in buckets['Buckets']:
-        try:
-            bucket['Region'] = client.get_bucket_location(Bucket=bucket['Name'])['LocationConstraint']
-            if not bucket['Region']:
-                bucket['Region'] = 'us-east-1'
-        except ClientError as e:
-            if _is_common_exception(e, bucket):
-                bucket['Region'] = None
-                logger.warning("skipping bucket='{}' due to exception.".format(bucket['Name']))
-                continue
-            else:
-                raise
+    if max_workers <= 1 or len(buckets['Buckets']) <= 1:
+        for bucket in buckets['Buckets']:
+            _set_bucket_region(bucket, client)
+    else:
+        # boto3 clients are thread safe, so the workers share this one.
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cartography-s3') as executor:
+            for _ in executor.map(_set_bucket_region, buckets['Buckets'], [client] * len(buckets['Buckets'])):
+                pass
     return buckets
 
 
+def _set_bucket_region(bucket: Dict, client: botocore.client.BaseClient) -> None:
+    try:
+        bucket['Region'] = client.get_bucket_location(Bucket=bucket['Name'])['LocationConstraint']
+        if not bucket['Region']:
+            bucket['Region'] = 'us-east-1'
+    except ClientError as e:
+        if _is_common_exception(e, bucket):
+            bucket['Region'] = None
+            logger.warning("skipping bucket='{}' due to exception.".format(bucket['Name']))
+        else:
+            raise
+
+
 @timeit
 def get_single_s3_bucket(boto3_session: boto3.session.Session, bucketName, bucketData, region):
     bucket = {}
@@ -62,15 +77,19 @@ def get_single_s3_bucket(boto3_session: boto3.session.Session, bucketName, bucke
 def get_s3_bucket_details(
         boto3_session: boto3.session.Session,
         bucket_data: Dict,
+        max_workers: int = 1,
 ) -> Generator[Tuple[str, Dict, Dict, Dict, Dict, Dict, Dict], None, None]:
     """
     Iterates over all S3 buckets. Yields bucket name (string), S3 bucket policies (JSON), ACLs (JSON),
     default encryption policy (JSON), Versioning (JSON), and Public Access Block (JSON)
+
+    If `max_workers` is greater than 1, the details of up to `max_workers` buckets are fetched concurrently. The
+    results are still yielded in the order of bucket_data['Buckets'].
     """
     # a local store for s3 clients so that we may re-use clients for an AWS region
     s3_regional_clients: Dict[Any, Any] = {}
 
-    for bucket in bucket_data['Buckets']:
+    def get_client(bucket: Dict) -> botocore.client.BaseClient:
         # Note: bucket['Region'] is sometimes None because
         # client.get_bucket_location() does not return a location constraint for buckets
         # in us-east-1 region
@@ -78,13 +97,37 @@ def get_s3_bucket_details(
         if not client:
             client = boto3_session.client('s3', bucket['Region'])
             s3_regional_clients[bucket['Region']] = client
-        acl = get_acl(bucket, client)
-        policy = get_policy(bucket, client)
-        encryption = get_encryption(bucket, client)
-        versioning = get_versioning(bucket, client)
-        public_access_block = get_public_access_block(bucket, client)
-        bucket_ownership_control = get_bucket_ownership_control(bucket, client)
-        yield bucket['Name'], acl, policy, encryption, versioning, public_access_block, bucket_ownership_control
+        return client
+
+    buckets = bucket_data['Buckets']
+    if max_workers <= 1 or len(buckets) <= 1:
+        for bucket in buckets:
+            yield _get_s3_bucket_detail(bucket, get_client(bucket))
+        return
+
+    # The clients are created on this thread because boto3 sessions are not thread safe. The clients themselves are,
+    # so the workers share one per region.
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cartography-s3') as executor:
+        futures = [executor.submit(_get_s3_bucket_detail, bucket, get_client(bucket)) for bucket in buckets]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # Don't keep fetching buckets the caller will never consume.
+            for future in futures:
+                future.cancel()
+
+
+def _get_s3_bucket_detail(
+    bucket: Dict, client: botocore.client.BaseClient,
+) -> Tuple[str, Dict, Dict, Dict, Dict, Dict, Dict]:
+    acl = get_acl(bucket, client)
+    policy = get_policy(bucket, client)
+    encryption = get_encryption(bucket, client)
+    versioning = get_versioning(bucket, client)
+    public_access_block = get_public_access_block(bucket, client)
+    bucket_ownership_control = get_bucket_ownership_control(bucket, client)
+    return bucket['Name'], acl, policy, encryption, versioning, public_access_block, bucket_ownership_control
 
 
 @timeit
@@ -764,6 +807,7 @@ def cleanup_s3_bucket_acl_and_policy(neo4j_session: neo4j.Session, common_job_pa
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
     resourceFound = False
     bucket_data = {
@@ -777,12 +821,14 @@ def sync(
         resourceFound = True
     else:
         logger.info("Syncing S3 for account '%s'.", current_aws_account_id)
-        bucket_data = get_s3_bucket_list(boto3_session)
+        bucket_data = get_s3_bucket_list(boto3_session, sync_options.s3_max_workers)
     load_s3_buckets(neo4j_session, bucket_data, current_aws_account_id, update_tag)
     if (not resourceFound):
         cleanup_s3_buckets(neo4j_session, common_job_parameters)
 
-    acl_and_policy_data_iter = get_s3_bucket_details(boto3_session, bucket_data)
+    acl_and_policy_data_iter = get_s3_bucket_details(
+        boto3_session, bucket_data, sync_options.s3_max_workers,
+    )
     load_s3_details(neo4j_session, acl_and_policy_data_iter, current_aws_account_id, update_tag)
     if (not resourceFound):
         cleanup_s3_bucket_acl_and_policy(neo4j_session, common_job_parameters)
@@ -6,6 +6,8 @@ import boto3
 import neo4j
 import uuid
 
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import dict_date_to_epoch
 from cartography.util import run_cleanup_job
@@ -77,9 +79,10 @@ def cleanup_secrets(neo4j_session: neo4j.Session, common_job_parameters: Dict) -
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
+    max_workers = sync_options.region_max_workers
+    for region, secrets in aws_fetch_regions(get_secret_list, boto3_session, regions, max_workers=max_workers):
         logger.info("Syncing Secrets Manager for region '%s' in account '%s'.", region, current_aws_account_id)
-        secrets = get_secret_list(boto3_session, region)
         load_secrets(neo4j_session, secrets, region, current_aws_account_id, update_tag)
     cleanup_secrets(neo4j_session, common_job_parameters)
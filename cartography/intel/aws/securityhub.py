@@ -7,6 +7,7 @@ import boto3
 import neo4j
 import uuid
 
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
 
@@ -69,6 +70,7 @@ def cleanup_securityhub(neo4j_session: neo4j.Session, common_job_parameters: Dic
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
     logger.info("Syncing Security Hub in account '%s'.", current_aws_account_id)
     hub = get_hub(boto3_session)
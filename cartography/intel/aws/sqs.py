@@ -11,6 +11,8 @@ import uuid
 
 from botocore.exceptions import ClientError
 
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
@@ -152,10 +154,11 @@ def cleanup_sqs_queues(neo4j_session: neo4j.Session, common_job_parameters: Dict
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
+    max_workers = sync_options.region_max_workers
+    for region, queue_urls in aws_fetch_regions(get_sqs_queue_list, boto3_session, regions, max_workers=max_workers):
         logger.info("Syncing SQS for region '%s' in account '%s'.", region, current_aws_account_id)
-        queue_urls = get_sqs_queue_list(boto3_session, region)
         if len(queue_urls) == 0:
             continue
         queue_attributes = get_sqs_queue_attributes(boto3_session, queue_urls)
@@ -7,6 +7,8 @@ import boto3
 import neo4j
 import uuid
 
+from cartography.intel.aws.util.common import aws_fetch_regions
+from cartography.intel.aws.util.common import AWSSyncOptions
 from cartography.util import aws_handle_regions
 from cartography.util import dict_date_to_epoch
 from cartography.util import run_cleanup_job
@@ -185,12 +187,21 @@ def cleanup_ssm(neo4j_session: neo4j.Session, common_job_parameters: Dict) -> No
 def sync(
     neo4j_session: neo4j.Session, boto3_session: boto3.session.Session, regions: List[str], current_aws_account_id: str,
     update_tag: int, common_job_parameters: Dict,
+    sync_options: AWSSyncOptions = AWSSyncOptions(),
 ) -> None:
-    for region in regions:
+    # Read the graph up front: the Neo4j session must not be shared with the fetch workers.
+    instance_ids = {region: get_instance_ids(neo4j_session, region, current_aws_account_id) for region in regions}
+    max_workers = sync_options.region_max_workers
+    for region, (information, patches) in aws_fetch_regions(
+        lambda session, region: (
+            get_instance_information(session, region, instance_ids[region]),
+            get_instance_patches(session, region, instance_ids[region]),
+        ),
+        boto3_session,
+        regions,
+        max_workers=max_workers,
+    ):
         logger.info("Syncing SSM for region '%s' in account '%s'.", region, current_aws_account_id)
-        instance_ids = get_instance_ids(neo4j_session, region, current_aws_account_id)
-        data = get_instance_information(boto3_session, region, instance_ids)
-        load_instance_information(neo4j_session, data, region, current_aws_account_id, update_tag)
-        data = get_instance_patches(boto3_session, region, instance_ids)
-        load_instance_patches(neo4j_session, data, region, current_aws_account_id, update_tag)
+        load_instance_information(neo4j_session, information, region, current_aws_account_id, update_tag)
+        load_instance_patches(neo4j_session, patches, region, current_aws_account_id, update_tag)
     cleanup_ssm(neo4j_session, common_job_parameters)
@@ -1,9 +1,13 @@
-from typing import Any, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterator, List, NamedTuple, Tuple, TypeVar, cast
 
-from cartography.intel.aws.resources import RESOURCE_FUNCTIONS, RESOURCE_IDENTIFIERS
+import boto3
 
 
 def parse_and_validate_aws_requested_syncs(aws_requested_syncs: str) -> List[str]:
+    # Imported here because the sync modules listed in resources import the helpers below.
+    from cartography.intel.aws.resources import RESOURCE_FUNCTIONS
     validated_resources: List[str] = []
     for resource in aws_requested_syncs.split(','):
         resource = resource.strip()
@@ -21,6 +25,7 @@ def parse_and_validate_aws_requested_syncs(aws_requested_syncs: str) -> List[str
     return validated_resources
 
 def _get_resource_identifier(aws_resource_type: str) -> str: 
+  from cartography.intel.aws.resources import RESOURCE_IDENTIFIERS
   return RESOURCE_IDENTIFIERS[aws_resource_type]
 
 def filter_resources(data: List[Any], aws_resource_name: str, aws_resource_type: str) -> List[Any]:
@@ -44,4 +49,78 @@ def filter_resources(data: List[Any], aws_resource_name: str, aws_resource_type:
               filtered.append(resource)
               break
     
-    return filtered
\ No newline at end of file
+    return filtered
+
+
+class AWSSyncOptions(NamedTuple):
+    """
+    Tuning options of an AWS sync, see the `aws_*` and `neo4j_write_queue_size` options of cartography.config.Config.
+    Unlike common_job_parameters, these are not passed to Neo4j as query parameters.
+    """
+    region_max_workers: int = 1
+    resource_max_workers: int = 1
+    permission_relationships_max_workers: int = 1
+    s3_max_workers: int = 1
+    iam_bulk_fetch: bool = False
+    neo4j_write_queue_size: int = 0
+
+
+class ThreadSafeBoto3Session:
+    """
+    boto3 sessions are not thread-safe, but the clients and resources created from them are. This proxy serializes the
+    creation of clients and resources so that one session can be shared by concurrent workers.
+    """
+
+    def __init__(self, boto3_session: boto3.session.Session):
+        self._boto3_session = boto3_session
+        self._lock = threading.Lock()
+
+    def client(self, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            return self._boto3_session.client(*args, **kwargs)
+
+    def resource(self, *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            return self._boto3_session.resource(*args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._boto3_session, name)
+
+
+R = TypeVar('R')
+
+
+def aws_fetch_regions(
+    get_func: Callable[..., R],
+    boto3_session: boto3.session.Session,
+    regions: List[str],
+    *args: Any,
+    max_workers: int = 1,
+) -> Iterator[Tuple[str, R]]:
+    """
+    Call `get_func(boto3_session, region, *args)` for every region and yield `(region, result)` pairs in the order of
+    `regions`.
+
+    If `max_workers` is greater than 1 the calls run concurrently on a thread pool. Results are still yielded in region
+    order on the calling thread, so callers keep loading them into Neo4j one region at a time and the graph writes stay
+    deterministic.
+
+    Use:
+    for region, data in aws_fetch_regions(get_volumes, boto3_session, regions, max_workers=4):
+        load_volumes(neo4j_session, data, region, ...)
+    """
+    if max_workers <= 1 or len(regions) <= 1:
+        for region in regions:
+            yield region, get_func(boto3_session, region, *args)
+        return
+
+    shared_session = cast(boto3.session.Session, ThreadSafeBoto3Session(boto3_session))
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(regions))) as executor:
+        futures = [executor.submit(get_func, shared_session, region, *args) for region in regions]
+        try:
+            for region, future in zip(regions, futures):
+                yield region, future.result()
+        finally:
+            # Don't start fetching regions the caller will never consume.
+            for future in futures:
+                future.cancel()
@@ -7,6 +7,7 @@ from azure.core.exceptions import HttpResponseError
 from azure.mgmt.compute import ComputeManagementClient
 
 from .util.credentials import Credentials
+from cartography.graph.pipeline import WritePipeline
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
 
@@ -190,39 +191,41 @@ def cleanup_snapshot(neo4j_session: neo4j.Session, common_job_parameters: Dict)
 
 
 def sync_virtual_machine(
-    neo4j_session: neo4j.Session, credentials: Credentials, subscription_id: str, update_tag: int,
+    pipeline: WritePipeline, credentials: Credentials, subscription_id: str, update_tag: int,
     common_job_parameters: Dict,
 ) -> None:
     vm_list = get_vm_list(credentials, subscription_id)
-    load_vms(neo4j_session, subscription_id, vm_list, update_tag)
-    cleanup_virtual_machine(neo4j_session, common_job_parameters)
+    pipeline.submit(load_vms, subscription_id, vm_list, update_tag)
+    pipeline.submit(cleanup_virtual_machine, common_job_parameters)
 
 
 def sync_disk(
-    neo4j_session: neo4j.Session, credentials: Credentials, subscription_id: str, update_tag: int,
+    pipeline: WritePipeline, credentials: Credentials, subscription_id: str, update_tag: int,
     common_job_parameters: Dict,
 ) -> None:
     disk_list = get_disks(credentials, subscription_id)
-    load_disks(neo4j_session, subscription_id, disk_list, update_tag)
-    cleanup_disks(neo4j_session, common_job_parameters)
+    pipeline.submit(load_disks, subscription_id, disk_list, update_tag)
+    pipeline.submit(cleanup_disks, common_job_parameters)
 
 
 def sync_snapshot(
-    neo4j_session: neo4j.Session, credentials: Credentials, subscription_id: str, update_tag: int,
+    pipeline: WritePipeline, credentials: Credentials, subscription_id: str, update_tag: int,
     common_job_parameters: Dict,
 ) -> None:
     snapshots = get_snapshots_list(credentials, subscription_id)
-    load_snapshots(neo4j_session, subscription_id, snapshots, update_tag)
-    cleanup_snapshot(neo4j_session, common_job_parameters)
+    pipeline.submit(load_snapshots, subscription_id, snapshots, update_tag)
+    pipeline.submit(cleanup_snapshot, common_job_parameters)
 
 
 @timeit
 def sync(
     neo4j_session: neo4j.Session, credentials: Credentials, subscription_id: str, update_tag: int,
-    common_job_parameters: Dict,
+    common_job_parameters: Dict, neo4j_write_queue_size: int = 0,
 ) -> None:
     logger.info("Syncing VM for subscription '%s'.", subscription_id)
 
-    sync_virtual_machine(neo4j_session, credentials, subscription_id, update_tag, common_job_parameters)
-    sync_disk(neo4j_session, credentials, subscription_id, update_tag, common_job_parameters)
-    sync_snapshot(neo4j_session, credentials, subscription_id, update_tag, common_job_parameters)
+    # VMs, disks and snapshots are independent, so each one's writes can overlap with fetching the next.
+    with WritePipeline(neo4j_session, neo4j_write_queue_size) as pipeline:
+        sync_virtual_machine(pipeline, credentials, subscription_id, update_tag, common_job_parameters)
+        sync_disk(pipeline, credentials, subscription_id, update_tag, common_job_parameters)
+        sync_snapshot(pipeline, credentials, subscription_id, update_tag, common_job_parameters)
@@ -2,11 +2,20 @@ import logging
 from typing import List
 
 import neo4j
+import neo4j.exceptions
 
 from cartography.config import Config
 from cartography.util import load_resource_binary
 logger = logging.getLogger(__name__)
 
+# Node keys that syncs running at the same time MERGE concurrently, e.g. the principals and accounts trusted by several
+# AWS accounts synced with --aws-account-max-workers. MERGE only guarantees one node per key when a uniqueness
+# constraint backs it, so these keys get uniqueness constraints, which also index them, instead of plain indexes.
+UNIQUE_NODE_KEYS = [
+    ('AWSAccount', 'id'),
+    ('AWSPrincipal', 'arn'),
+]
+
 
 def get_index_statements() -> List[str]:
     statements = []
@@ -18,8 +27,42 @@ def get_index_statements() -> List[str]:
     return statements
 
 
+def _run_schema_statement(neo4j_session: neo4j.Session, statement: str) -> bool:
+    logger.debug("Executing statement: %s", statement)
+    try:
+        neo4j_session.run(statement).consume()
+    except neo4j.exceptions.Neo4jError as e:
+        logger.debug("Statement failed: %s", e)
+        return False
+    return True
+
+
+def create_unique_constraint(neo4j_session: neo4j.Session, label: str, prop: str) -> bool:
+    """
+    Create a uniqueness constraint on the `prop` of `label` nodes, replacing the plain index that earlier versions
+    created on it. If the graph already has duplicate nodes for the key, the plain index is kept and False is returned;
+    concurrent syncs may then create more duplicates of these nodes until the existing ones are merged.
+    """
+    constraint = f"CREATE CONSTRAINT ON (n:{label}) ASSERT n.{prop} IS UNIQUE"
+    if _run_schema_statement(neo4j_session, constraint):
+        return True
+    # A constraint cannot be created while a plain index on the same key exists.
+    _run_schema_statement(neo4j_session, f"DROP INDEX ON :{label}({prop})")
+    if _run_schema_statement(neo4j_session, constraint):
+        return True
+    _run_schema_statement(neo4j_session, f"CREATE INDEX ON :{label}({prop})")
+    logger.warning(
+        "Could not create a uniqueness constraint on %s.%s, likely because the graph has duplicate %s nodes. "
+        "Syncs that run concurrently may create more duplicates of these nodes.",
+        label, prop, label,
+    )
+    return False
+
+
 def run(neo4j_session: neo4j.Session, config: Config) -> None:
     logger.info("Creating indexes for cartography node types.")
     for statement in get_index_statements():
         logger.debug("Executing statement: %s", statement)
         neo4j_session.run(statement)
+    for label, prop in UNIQUE_NODE_KEYS:
+        create_unique_constraint(neo4j_session, label, prop)
@@ -33,8 +33,9 @@ def start_cve_ingestion(
         if year in existing_years:
             continue
         logger.info(f"Syncing CVE data for year {year}")
-        cves = feed.get_cves(config.nist_cve_url, str(year))
-        feed.load_cves(neo4j_session, cves, config.update_tag)
+        feed.sync_cve_feed(
+            neo4j_session, config.nist_cve_url, str(year), config.update_tag, config.cve_cache_dir,
+        )
         merge_module_sync_metadata(
             neo4j_session,
             group_type='CVE',
@@ -46,8 +47,9 @@ def start_cve_ingestion(
 
     # sync modified data
     logger.info("Syncing CVE data for modified data")
-    cves = feed.get_cves(config.nist_cve_url, 'modified')
-    feed.load_cves(neo4j_session, cves, config.update_tag)
+    feed.sync_cve_feed(
+        neo4j_session, config.nist_cve_url, 'modified', config.update_tag, config.cve_cache_dir,
+    )
     merge_module_sync_metadata(
         neo4j_session,
         group_type='CVE',
@@ -59,8 +61,9 @@ def start_cve_ingestion(
 
     # sync recent data
     logger.info("Syncing CVE data for recent data")
-    cves = feed.get_cves(config.nist_cve_url, 'recent')
-    feed.load_cves(neo4j_session, cves, config.update_tag)
+    feed.sync_cve_feed(
+        neo4j_session, config.nist_cve_url, 'recent', config.update_tag, config.cve_cache_dir,
+    )
     merge_module_sync_metadata(
         neo4j_session,
         group_type='CVE',
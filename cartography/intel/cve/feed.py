@@ -1,17 +1,35 @@
+import glob
 import gzip
+import hashlib
+import io
 import json
 import logging
+import os
+import tempfile
+import zlib
+from itertools import islice
 from typing import Any
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import TextIO
+from typing import Tuple
 
 import neo4j
 import requests
 
+from cartography.client.core.tx import load_graph_data
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
 
+# Number of CVEs written per transaction by load_cve_items().
+CVE_BATCH_SIZE = 1000
+# Number of characters of decompressed feed read at a time by iter_json_array().
+_READ_SIZE = 1024 * 1024
+
 
 @timeit
 def get_cve_sync_metadata(neo4j_session: neo4j.Session) -> List[int]:
@@ -35,10 +53,261 @@ def get_cves(nist_cve_url: str, cve_type: str) -> Dict[Any, Any]:
     return json.loads(extracted)
 
 
+def iter_cves(nist_cve_url: str, cve_type: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the CVE_Items of an NVD feed one at a time, decompressing and parsing the download as it arrives, so that
+    memory use does not depend on the size of the feed. Use this instead of get_cves() for large feeds.
+    """
+    url = f"{nist_cve_url}/nvdcve-1.1-{cve_type}.json.gz"
+    with requests.get(url, stream=True) as res:
+        res.raise_for_status()
+        with gzip.GzipFile(fileobj=res.raw) as archive:
+            yield from iter_json_array(io.TextIOWrapper(archive, encoding='utf-8'), 'CVE_Items')
+
+
+def iter_cves_from_file(path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the CVE_Items of a downloaded NVD feed archive, see iter_cves().
+    """
+    with gzip.open(path, 'rt', encoding='utf-8') as archive:
+        yield from iter_json_array(archive, 'CVE_Items')
+
+
+def iter_json_array(stream: TextIO, key: str) -> Iterator[Any]:
+    """
+    Incrementally parse the JSON document in `stream` and yield the elements of the array stored under `key`, e.g. the
+    CVE_Items of an NVD feed, one at a time. Only the current element and one read buffer are held in memory. The
+    array must come after any other occurrence of `"key"` in the document, which is the case for the NVD feeds.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    eof = False
+
+    def read_more() -> bool:
+        nonlocal buffer, eof
+        chunk = stream.read(_READ_SIZE)
+        if not chunk:
+            eof = True
+        buffer += chunk
+        return bool(chunk)
+
+    # Skip to the opening bracket of the array.
+    marker = json.dumps(key)
+    while True:
+        start = buffer.find(marker)
+        if start != -1:
+            bracket = buffer.find('[', start + len(marker))
+            if bracket != -1:
+                buffer = buffer[bracket + 1:]
+                break
+        elif len(buffer) > len(marker):
+            # Keep enough of the tail to find a marker that spans two reads.
+            buffer = buffer[-len(marker):]
+        if not read_more():
+            raise ValueError(f"No {marker} array found in the JSON document.")
+
+    position = 0
+    while True:
+        while position < len(buffer) and buffer[position] in ' \t\r\n,':
+            position += 1
+        if position == len(buffer):
+            buffer, position = '', 0
+            if not read_more():
+                raise ValueError(f"The {marker} array is not terminated.")
+            continue
+        if buffer[position] == ']':
+            return
+        try:
+            item, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # The element continues in the next read, unless the document has ended.
+            buffer, position = buffer[position:], 0
+            if eof or not read_more():
+                raise
+            continue
+        yield item
+        position = end
+
+
+def get_cve_feed_meta(nist_cve_url: str, cve_type: str) -> Dict[str, str]:
+    """
+    Get the .meta file that NVD publishes next to each feed, e.g.
+        lastModifiedDate:2022-02-23T03:00:01-05:00
+        size:1234
+        gzSize:123
+        sha256:ABCD...
+    The sha256 is the hash of the uncompressed feed.
+    """
+    url = f"{nist_cve_url}/nvdcve-1.1-{cve_type}.meta"
+    res = requests.get(url, timeout=60)
+    res.raise_for_status()
+    meta = {}
+    for line in res.text.splitlines():
+        key, sep, value = line.partition(':')
+        if sep:
+            meta[key.strip()] = value.strip()
+    return meta
+
+
+def _cached_feed_path(cache_dir: str, cve_type: str, sha256: str) -> str:
+    return os.path.join(cache_dir, f"nvdcve-1.1-{cve_type}.{sha256.upper()}.json.gz")
+
+
+def _get_cached_feeds(cache_dir: str, cve_type: str) -> List[Tuple[str, str]]:
+    """
+    Return (sha256, path) of the cached archives of the given feed, newest first.
+    """
+    prefix = f"nvdcve-1.1-{cve_type}."
+    paths = sorted(
+        glob.glob(os.path.join(glob.escape(cache_dir), f"{glob.escape(prefix)}*.json.gz")),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    return [(os.path.basename(path)[len(prefix):-len('.json.gz')], path) for path in paths]
+
+
+def download_cve_feed(nist_cve_url: str, cve_type: str, cache_dir: str) -> Tuple[str, str]:
+    """
+    Download a feed archive into the cache directory, named after the sha256 of its uncompressed content.
+
+    :return: The sha256 and the path of the archive
+    """
+    url = f"{nist_cve_url}/nvdcve-1.1-{cve_type}.json.gz"
+    os.makedirs(cache_dir, exist_ok=True)
+    digest = hashlib.sha256()
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    handle, temp_path = tempfile.mkstemp(prefix=f"nvdcve-1.1-{cve_type}.", suffix='.tmp', dir=cache_dir)
+    try:
+        with os.fdopen(handle, 'wb') as f, requests.get(url, stream=True) as res:
+            res.raise_for_status()
+            for chunk in res.raw.stream(_READ_SIZE, decode_content=False):
+                f.write(chunk)
+                digest.update(decompressor.decompress(chunk))
+            digest.update(decompressor.flush())
+        sha256 = digest.hexdigest().upper()
+        path = _cached_feed_path(cache_dir, cve_type, sha256)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return sha256, path
+
+
+@timeit
+def get_cve_feed_hashes(neo4j_session: neo4j.Session) -> Dict[str, str]:
+    """
+    Return the sha256 of the feed content last loaded into the graph, by feed name.
+    """
+    query = """
+    MATCH (s:SyncMetadata)
+    WHERE s.grouptype = "CVE" AND s.syncedtype = "feed"
+    RETURN s.groupid AS feed, s.sha256 AS sha256
+    """
+    return {r['feed']: r['sha256'] for r in neo4j_session.run(query)}
+
+
+@timeit
+def set_cve_feed_hash(neo4j_session: neo4j.Session, cve_type: str, sha256: str, update_tag: int) -> None:
+    query = """
+    MERGE (s:SyncMetadata:ModuleSyncMetadata{id: 'CVE_' + {Feed} + '_feed'})
+    ON CREATE SET s.firstseen = timestamp()
+    SET s.grouptype = 'CVE',
+        s.groupid = {Feed},
+        s.syncedtype = 'feed',
+        s.sha256 = {Sha256},
+        s.lastupdated = {UPDATE_TAG}
+    """
+    neo4j_session.run(query, Feed=cve_type, Sha256=sha256, UPDATE_TAG=update_tag)
+
+
+@timeit
+def sync_cve_feed(
+    neo4j_session: neo4j.Session, nist_cve_url: str, cve_type: str, update_tag: int,
+    cache_dir: Optional[str] = None,
+) -> None:
+    """
+    Load a CVE feed into the graph.
+
+    Without `cache_dir` the feed is streamed from NVD every time. With `cache_dir`, the feed's .meta file is fetched
+    first: if the graph was last loaded from content with the same sha256 the feed is skipped, and otherwise it is
+    loaded from the cached archive with that hash, downloading it only if it is not cached yet. If the .meta file cannot
+    be fetched, e.g. in an air-gapped environment, the newest cached archive of the feed is used instead.
+    """
+    if not cache_dir:
+        load_cve_items(neo4j_session, iter_cves(nist_cve_url, cve_type), update_tag)
+        return
+
+    path: Optional[str] = None
+    try:
+        sha256 = get_cve_feed_meta(nist_cve_url, cve_type)['sha256'].upper()
+        if os.path.exists(_cached_feed_path(cache_dir, cve_type, sha256)):
+            path = _cached_feed_path(cache_dir, cve_type, sha256)
+    except (requests.exceptions.RequestException, KeyError):
+        cached_feeds = _get_cached_feeds(cache_dir, cve_type)
+        if not cached_feeds:
+            raise
+        sha256, path = cached_feeds[0]
+        logger.warning(f"Could not get the metadata of CVE feed {cve_type}, using the cached archive {path}.")
+
+    if get_cve_feed_hashes(neo4j_session).get(cve_type) == sha256:
+        logger.info(f"CVE feed {cve_type} is unchanged since it was last loaded, skipping.")
+        return
+
+    if path is None:
+        downloaded_sha256, path = download_cve_feed(nist_cve_url, cve_type, cache_dir)
+        if downloaded_sha256 != sha256:
+            # NVD may have published a new feed since the .meta file was fetched.
+            logger.warning(f"CVE feed {cve_type} has sha256 {downloaded_sha256}, its .meta file said {sha256}.")
+            sha256 = downloaded_sha256
+
+    count = load_cve_items(neo4j_session, iter_cves_from_file(path), update_tag)
+    logger.info(f"Loaded {count} CVEs from feed {cve_type}.")
+    set_cve_feed_hash(neo4j_session, cve_type, sha256, update_tag)
+    for old_sha256, old_path in _get_cached_feeds(cache_dir, cve_type):
+        if old_sha256 != sha256:
+            os.remove(old_path)
+
+
+def transform_cve(cve: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add the parsed_desc, parsed_reference_urls and parsed_problem_types fields that load_cve_items() writes to a CVE
+    item, in place.
+    """
+    parsed_desc = {}
+    for desc in cve['cve']['description'].get('description_data', []):
+        parsed_desc[desc["lang"]] = (desc['value'])
+    cve["cve"]["parsed_desc"] = parsed_desc
+
+    parsed_reference_urls = []
+    for reference in cve['cve']['references'].get('reference_data', []):
+        parsed_reference_urls.append(reference['url'])
+    cve["cve"]["parsed_reference_urls"] = parsed_reference_urls
+
+    parsed_problem_types = []
+    for problemtype_data in cve['cve']['problemtype']['problemtype_data']:
+        for problemtype in problemtype_data["description"]:
+            parsed_problem_types.append(problemtype['value'])
+    cve["cve"]["parsed_problem_types"] = parsed_problem_types
+    return cve
+
+
 def load_cves(neo4j_session: neo4j.Session, data: Dict[str, Any], update_tag: int) -> None:
     """
     Transform and load cve information
     """
+    load_cve_items(neo4j_session, data["CVE_Items"], update_tag)
+
+
+@timeit
+def load_cve_items(
+    neo4j_session: neo4j.Session, cves: Iterable[Dict[str, Any]], update_tag: int, batch_size: int = CVE_BATCH_SIZE,
+) -> int:
+    """
+    Transform and load CVE items, e.g. from iter_cves(), in transactions of `batch_size` CVEs. The items are consumed
+    lazily, so at most one batch is held in memory.
+
+    :return: The number of CVEs loaded
+    """
     ingestion_cypher_query = """
     UNWIND {cves} AS cve
         MERGE (c:CVE{id: cve.cve.CVE_data_meta.ID})
@@ -70,25 +339,14 @@ def load_cves(neo4j_session: neo4j.Session, data: Dict[str, Any], update_tag: in
         ON CREATE SET hc.firstseen = timestamp()
         SET hc.lastupdated = {update_tag}
     """
-    for cve in data["CVE_Items"]:
-        parsed_desc = {}
-        for desc in cve['cve']['description'].get('description_data', []):
-            parsed_desc[desc["lang"]] = (desc['value'])
-        cve["cve"]["parsed_desc"] = parsed_desc
-
-        parsed_reference_urls = []
-        for reference in cve['cve']['references'].get('reference_data', []):
-            parsed_reference_urls.append(reference['url'])
-        cve["cve"]["parsed_reference_urls"] = parsed_reference_urls
-
-        parsed_problem_types = []
-        for problemtype_data in cve['cve']['problemtype']['problemtype_data']:
-            for problemtype in problemtype_data["description"]:
-                parsed_problem_types.append(problemtype['value'])
-        cve["cve"]["parsed_problem_types"] = parsed_problem_types
-
-    neo4j_session.run(
-        ingestion_cypher_query,
-        cves=data["CVE_Items"],
-        update_tag=update_tag,
-    )
+    count = 0
+    cve_iter = iter(cves)
+    while True:
+        cve_batch = [transform_cve(cve) for cve in islice(cve_iter, batch_size)]
+        if not cve_batch:
+            break
+        load_graph_data(
+            neo4j_session, ingestion_cypher_query, cve_batch, list_param_name='cves', update_tag=update_tag,
+        )
+        count += len(cve_batch)
+    return count
@@ -1,11 +1,17 @@
 import json
 import logging
+import threading
 from collections import namedtuple
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 from typing import List
+from typing import Optional
 from typing import Set
+from typing import Tuple
 
 import googleapiclient.discovery
+import googleapiclient.discovery_cache
 import neo4j
 from googleapiclient.discovery import Resource
 from google.auth import default as google_default_auth
@@ -18,6 +24,7 @@ from cartography.intel.gcp import crm
 from cartography.intel.gcp import dns
 from cartography.intel.gcp import gke
 from cartography.intel.gcp import storage
+from cartography.util import get_neo4j_driver
 from cartography.util import run_analysis_job
 from cartography.util import timeit
 
@@ -34,6 +41,43 @@ service_names = Services(
     dns='dns.googleapis.com',
 )
 
+# Parsed discovery documents of the Google APIs by (service name, version), see `_get_discovery_document()`.
+_discovery_documents: Dict[Tuple[str, str], Optional[Dict]] = {}
+_discovery_documents_lock = threading.Lock()
+
+
+def _get_discovery_document(service_name: str, version: str) -> Optional[Dict]:
+    """
+    Return the discovery document that googleapiclient ships for the given Google API, or None if it ships none. The
+    document is parsed once and then shared, so that workers can cheaply build their own resource objects, which are
+    not thread-safe.
+    :param service_name: The name of the API, e.g. 'compute'
+    :param version: The version of the API, e.g. 'v1'
+    :return: The parsed discovery document, or None
+    """
+    with _discovery_documents_lock:
+        if (service_name, version) not in _discovery_documents:
+            document = googleapiclient.discovery_cache.get_static_doc(service_name, version)
+            _discovery_documents[(service_name, version)] = json.loads(document) if document else None
+        return _discovery_documents[(service_name, version)]
+
+
+def _build_resource(service_name: str, version: str, credentials: Credentials) -> Resource:
+    """
+    Instantiates a resource object for the given Google API from its shipped discovery document, see
+    `_get_discovery_document()`.
+    :param service_name: The name of the API, e.g. 'compute'
+    :param version: The version of the API, e.g. 'v1'
+    :param credentials: The Credentials object
+    :return: A resource object
+    """
+    document = _get_discovery_document(service_name, version)
+    if document is not None:
+        return googleapiclient.discovery.build_from_document(document, credentials=credentials)
+    # cache_discovery=False to suppress extra warnings.
+    # See https://github.com/googleapis/google-api-python-client/issues/299#issuecomment-268915510 and related issues
+    return googleapiclient.discovery.build(service_name, version, credentials=credentials, cache_discovery=False)
+
 
 def _get_crm_resource_v1(credentials: Credentials) -> Resource:
     """
@@ -42,9 +86,7 @@ def _get_crm_resource_v1(credentials: Credentials) -> Resource:
     :param credentials: The Credentials object
     :return: A CRM v1 resource object
     """
-    # cache_discovery=False to suppress extra warnings.
-    # See https://github.com/googleapis/google-api-python-client/issues/299#issuecomment-268915510 and related issues
-    return googleapiclient.discovery.build('cloudresourcemanager', 'v1', credentials=credentials, cache_discovery=False)
+    return _build_resource('cloudresourcemanager', 'v1', credentials)
 
 
 def _get_crm_resource_v2(credentials: Credentials) -> Resource:
@@ -54,7 +96,7 @@ def _get_crm_resource_v2(credentials: Credentials) -> Resource:
     :param credentials: The Credentials object
     :return: A CRM v2 resource object
     """
-    return googleapiclient.discovery.build('cloudresourcemanager', 'v2', credentials=credentials, cache_discovery=False)
+    return _build_resource('cloudresourcemanager', 'v2', credentials)
 
 
 def _get_compute_resource(credentials: Credentials) -> Resource:
@@ -64,7 +106,7 @@ def _get_compute_resource(credentials: Credentials) -> Resource:
     :param credentials: The Credentials object
     :return: A Compute resource object
     """
-    return googleapiclient.discovery.build('compute', 'v1', credentials=credentials, cache_discovery=False)
+    return _build_resource('compute', 'v1', credentials)
 
 
 def _get_storage_resource(credentials: Credentials) -> Resource:
@@ -76,7 +118,7 @@ def _get_storage_resource(credentials: Credentials) -> Resource:
     :param credentials: The Credentials object
     :return: A Storage resource object
     """
-    return googleapiclient.discovery.build('storage', 'v1', credentials=credentials, cache_discovery=False)
+    return _build_resource('storage', 'v1', credentials)
 
 
 def _get_container_resource(credentials: Credentials) -> Resource:
@@ -87,7 +129,7 @@ def _get_container_resource(credentials: Credentials) -> Resource:
     :param credentials: The Credentials object
     :return: A Container resource object
     """
-    return googleapiclient.discovery.build('container', 'v1', credentials=credentials, cache_discovery=False)
+    return _build_resource('container', 'v1', credentials)
 
 
 def _get_dns_resource(credentials: Credentials) -> Resource:
@@ -98,7 +140,7 @@ def _get_dns_resource(credentials: Credentials) -> Resource:
     :param credentials: The Credentials object
     :return: A DNS resource object
     """
-    return googleapiclient.discovery.build('dns', 'v1', credentials=credentials, cache_discovery=False)
+    return _build_resource('dns', 'v1', credentials)
 
 
 def _get_serviceusage_resource(credentials: Credentials) -> Resource:
@@ -109,7 +151,7 @@ def _get_serviceusage_resource(credentials: Credentials) -> Resource:
     :param credentials: The Credentials object
     :return: A serviceusage resource object
     """
-    return googleapiclient.discovery.build('serviceusage', 'v1', credentials=credentials, cache_discovery=False)
+    return _build_resource('serviceusage', 'v1', credentials)
 
 
 def _initialize_resources(credentials: Credentials) -> Resource:
@@ -160,7 +202,7 @@ def _services_enabled_on_project(serviceusage: Resource, project_id: str) -> Set
 
 def _sync_single_project(
     neo4j_session: neo4j.Session, resources: Resource, project_id: str, gcp_update_tag: int,
-    common_job_parameters: Dict,
+    common_job_parameters: Dict, neo4j_write_queue_size: int = 0,
 ) -> None:
     """
     Handles graph sync for a single GCP project.
@@ -170,12 +212,16 @@ def _sync_single_project(
     https://cloud.google.com/resource-manager/reference/rest/v1/projects
     :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
     :param common_job_parameters: Other parameters sent to Neo4j
+    :param neo4j_write_queue_size: The maximum number of fetched batches waiting to be written, see WritePipeline
     :return: Nothing
     """
     # Determine the resources available on the project.
     enabled_services = _services_enabled_on_project(resources.serviceusage, project_id)
     if service_names.compute in enabled_services:
-        compute.sync(neo4j_session, resources.compute, project_id, gcp_update_tag, common_job_parameters)
+        compute.sync(
+            neo4j_session, resources.compute, project_id, gcp_update_tag, common_job_parameters,
+            neo4j_write_queue_size=neo4j_write_queue_size,
+        )
     if service_names.storage in enabled_services:
         storage.sync_gcp_buckets(neo4j_session, resources.storage, project_id, gcp_update_tag, common_job_parameters)
     if service_names.gke in enabled_services:
@@ -184,9 +230,25 @@ def _sync_single_project(
         dns.sync(neo4j_session, resources.dns, project_id, gcp_update_tag, common_job_parameters)
 
 
+def _sync_single_project_in_new_session(
+    neo4j_driver: neo4j.Driver, credentials: Credentials, worker_resources: threading.local, project_id: str,
+    gcp_update_tag: int, common_job_parameters: Dict, neo4j_write_queue_size: int,
+) -> None:
+    # Resource objects are not thread-safe, so every worker thread builds its own the first time it syncs a project.
+    if not hasattr(worker_resources, 'resources'):
+        worker_resources.resources = _initialize_resources(credentials)
+    logger.info("Syncing GCP project %s.", project_id)
+    with neo4j_driver.session() as neo4j_session:
+        _sync_single_project(
+            neo4j_session, worker_resources.resources, project_id, gcp_update_tag, common_job_parameters,
+            neo4j_write_queue_size=neo4j_write_queue_size,
+        )
+
+
 def _sync_multiple_projects(
     neo4j_session: neo4j.Session, resources: Resource, projects: List[Dict],
-    gcp_update_tag: int, common_job_parameters: Dict,
+    gcp_update_tag: int, common_job_parameters: Dict, neo4j_driver: Optional[neo4j.Driver] = None,
+    credentials: Optional[Credentials] = None, max_workers: int = 1, neo4j_write_queue_size: int = 0,
 ) -> None:
     """
     Handles graph sync for multiple GCP projects.
@@ -198,15 +260,67 @@ def _sync_multiple_projects(
     See https://cloud.google.com/resource-manager/reference/rest/v1/projects.
     :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
     :param common_job_parameters: Other parameters sent to Neo4j
+    :param neo4j_driver: If given with `credentials` and a `max_workers` greater than 1, up to `max_workers` projects
+    are synced concurrently, each worker with its own resource objects and Neo4j sessions from this driver. Shared VPC
+    host projects are synced before the others, see `compute.is_shared_vpc_host_project()`.
+    :param credentials: The Credentials object that the workers build their resource objects with
+    :param max_workers: The maximum number of projects to sync concurrently
+    :param neo4j_write_queue_size: The maximum number of fetched batches waiting to be written, see WritePipeline
     :return: Nothing
     """
     logger.info("Syncing %d GCP projects.", len(projects))
     crm.sync_gcp_projects(neo4j_session, projects, gcp_update_tag, common_job_parameters)
 
+    if neo4j_driver is not None and credentials is not None and max_workers > 1:
+        # Service projects of a Shared VPC MERGE the VPCs and subnets of their host project. Sync the host projects
+        # first, one at a time, so that those nodes already exist and concurrent service projects do not create
+        # duplicates of them.
+        host_project_ids = {
+            project['projectId'] for project in projects
+            if compute.is_shared_vpc_host_project(project['projectId'], resources.compute)
+        }
+        for project in projects:
+            if project['projectId'] in host_project_ids:
+                logger.info("Syncing Shared VPC host project %s.", project['projectId'])
+                _sync_single_project(
+                    neo4j_session, resources, project['projectId'], gcp_update_tag, common_job_parameters,
+                    neo4j_write_queue_size=neo4j_write_queue_size,
+                )
+        projects = [project for project in projects if project['projectId'] not in host_project_ids]
+
+        logger.info("Syncing up to %d GCP projects concurrently.", max_workers)
+        worker_resources = threading.local()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cartography-gcp') as executor:
+            futures: List[Future] = [
+                executor.submit(
+                    _sync_single_project_in_new_session,
+                    neo4j_driver,
+                    credentials,
+                    worker_resources,
+                    project['projectId'],
+                    gcp_update_tag,
+                    common_job_parameters,
+                    neo4j_write_queue_size,
+                )
+                for project in projects
+            ]
+            # Wait in submission order so that the first failing project is raised, as in a serial sync.
+            for future in futures:
+                try:
+                    future.result()
+                except Exception:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+        return
+
     for project in projects:
         project_id = project['projectId']
         logger.info("Syncing GCP project %s.", project_id)
-        _sync_single_project(neo4j_session, resources, project_id, gcp_update_tag, common_job_parameters)
+        _sync_single_project(
+            neo4j_session, resources, project_id, gcp_update_tag, common_job_parameters,
+            neo4j_write_queue_size=neo4j_write_queue_size,
+        )
 
 
 @timeit
@@ -246,7 +360,17 @@ def start_gcp_ingestion(neo4j_session: neo4j.Session, config: Config) -> None:
 
     projects = crm.get_gcp_projects(resources.crm_v1)
 
-    _sync_multiple_projects(neo4j_session, resources, projects, config.update_tag, common_job_parameters)
+    max_workers = config.gcp_project_max_workers or 1
+    neo4j_driver = get_neo4j_driver(config) if max_workers > 1 and len(projects) > 1 else None
+    try:
+        _sync_multiple_projects(
+            neo4j_session, resources, projects, config.update_tag, common_job_parameters,
+            neo4j_driver=neo4j_driver, credentials=credentials, max_workers=max_workers,
+            neo4j_write_queue_size=config.neo4j_write_queue_size or 0,
+        )
+    finally:
+        if neo4j_driver is not None:
+            neo4j_driver.close()
 
     run_analysis_job(
         'gcp_compute_asset_inet_exposure.json',
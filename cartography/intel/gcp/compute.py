@@ -13,7 +13,10 @@ from typing import Set
 import neo4j
 from googleapiclient.discovery import HttpError
 from googleapiclient.discovery import Resource
+from googleapiclient.http import HttpRequest
 
+from cartography.client.core.tx import load_graph_data
+from cartography.graph.pipeline import WritePipeline
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
 
@@ -97,6 +100,150 @@ def get_zones_in_project(project_id: str, compute: Resource, max_results: Option
             raise
 
 
+@timeit
+def is_shared_vpc_host_project(project_id: str, compute: Resource) -> bool:
+    """
+    Return True if the given project is a Shared VPC host project, whose VPCs and subnets are used by other projects.
+    See https://cloud.google.com/compute/docs/reference/rest/v1/projects/get. Projects whose Compute API details cannot
+    be read are treated as not being hosts.
+    :param project_id: The project ID
+    :param compute: The compute resource object created by googleapiclient.discovery.build()
+    :return: Whether the project is a Shared VPC host project
+    """
+    try:
+        res = compute.projects().get(project=project_id, fields='xpnProjectStatus').execute()
+    except HttpError as e:
+        logger.debug("Could not get the Shared VPC status of project %s: %s", project_id, e)
+        return False
+    return res.get('xpnProjectStatus') == 'HOST'
+
+
+# The Compute API accepts at most 1000 calls in one batch request.
+# See https://cloud.google.com/compute/docs/api/how-tos/batch.
+BATCH_REQUEST_LIMIT = 1000
+
+
+def _execute_batch(compute: Resource, requests: List[HttpRequest]) -> List[Dict]:
+    """
+    Execute the given requests as batch requests, which the Compute API serves concurrently, and return their responses
+    in the order of the requests. If any of the requests failed, its error is raised after the batch has completed.
+    :param compute: The compute resource object created by googleapiclient.discovery.build()
+    :param requests: The requests to execute
+    :return: The response of each request
+    """
+    responses: List[Dict] = [{} for _ in requests]
+    errors: List[Exception] = []
+
+    def callback(request_id: str, response: Dict, exception: Optional[Exception]) -> None:
+        if exception is not None:
+            errors.append(exception)
+        else:
+            responses[int(request_id)] = response
+
+    for start in range(0, len(requests), BATCH_REQUEST_LIMIT):
+        batch = compute.new_batch_http_request(callback=callback)
+        for index in range(start, min(start + BATCH_REQUEST_LIMIT, len(requests))):
+            batch.add(requests[index], request_id=str(index))
+        batch.execute()
+        if errors:
+            raise errors[0]
+    return responses
+
+
+def _list_per_location(
+    compute: Resource, collection: Resource, project_id: str, location_param: str, locations: List[str],
+) -> List[Dict]:
+    """
+    Call `collection.list()` for each of the given zones or regions and return one response object per location, in
+    the order of `locations`. The calls of all locations are batched together, and so are the calls for their next
+    pages.
+    :param compute: The compute resource object created by googleapiclient.discovery.build()
+    :param collection: The collection to list, e.g. `compute.instances()`
+    :param project_id: The project ID
+    :param location_param: The name of the location parameter of `list()`, i.e. 'zone' or 'region'
+    :param locations: The zone or region names
+    :return: A list of response objects of the form {id: str, items: []}
+    """
+    responses: List[Dict] = [{} for _ in locations]
+    pending = [
+        (index, collection.list(project=project_id, **{location_param: location}))
+        for index, location in enumerate(locations)
+    ]
+    while pending:
+        page_responses = _execute_batch(compute, [request for _, request in pending])
+        next_pending = []
+        for (index, request), page in zip(pending, page_responses):
+            if responses[index]:
+                responses[index]['items'] = responses[index].get('items', []) + page.get('items', [])
+            else:
+                responses[index] = page
+            next_request = collection.list_next(request, page)
+            if next_request is not None:
+                next_pending.append((index, next_request))
+        pending = next_pending
+    for response in responses:
+        response.pop('nextPageToken', None)
+    return responses
+
+
+def _list_aggregated(
+    collection: Resource, project_id: str, location_type: str, locations: List[str], resource_type: str,
+) -> List[Dict]:
+    """
+    Call `collection.aggregatedList()` once, following its pages, and split the results into one response object per
+    zone or region, in the shape and order that `_list_per_location()` returns. Results from scopes that are not in
+    `locations` are left out.
+    See https://cloud.google.com/compute/docs/reference/rest/v1/instances/aggregatedList.
+    :param collection: The collection to list, e.g. `compute.instances()`
+    :param project_id: The project ID
+    :param location_type: 'zones' or 'regions'
+    :param locations: The zone or region names
+    :param resource_type: The collection name used in the response, e.g. 'instances'
+    :return: A list of response objects of the form {id: str, items: []}
+    """
+    items_by_location: Dict[str, List[Dict]] = {location: [] for location in locations}
+    request = collection.aggregatedList(project=project_id)
+    while request is not None:
+        response = request.execute()
+        # Each scope is keyed like `zones/us-east1-b`, and holds either the resources or a warning that it has none.
+        for scope, scoped_list in response.get('items', {}).items():
+            scope_type, _, location = scope.partition('/')
+            if scope_type == location_type and location in items_by_location:
+                items_by_location[location].extend(scoped_list.get(resource_type, []))
+        request = collection.aggregatedList_next(request, response)
+    return [
+        {
+            'id': f'projects/{project_id}/{location_type}/{location}/{resource_type}',
+            'items': items_by_location[location],
+        }
+        for location in locations
+    ]
+
+
+def _get_location_responses(
+    compute: Resource, collection: Resource, project_id: str, location_type: str, locations: List[str],
+    resource_type: str,
+) -> List[Dict]:
+    """
+    List the resources of a zonal or regional collection in the given locations with a single aggregated list. If the
+    aggregated list is denied, fall back to listing each location, see `_list_per_location()`.
+    :return: A list of response objects of the form {id: str, items: []}, one per location
+    """
+    if not locations:
+        return []
+    try:
+        return _list_aggregated(collection, project_id, location_type, locations, resource_type)
+    except HttpError as e:
+        if _get_error_reason(e) != 'forbidden':
+            raise
+        logger.info(
+            "Aggregated list of %s is not permitted for project %s; listing each of %d %s instead. Full details: %s",
+            resource_type, project_id, len(locations), location_type, e,
+        )
+    location_param = 'zone' if location_type == 'zones' else 'region'
+    return _list_per_location(compute, collection, project_id, location_param, locations)
+
+
 @timeit
 def get_gcp_instance_responses(project_id: str, zones: Optional[List[Dict]], compute: Resource) -> List[Resource]:
     """
@@ -109,12 +256,9 @@ def get_gcp_instance_responses(project_id: str, zones: Optional[List[Dict]], com
     if not zones:
         # If the Compute Engine API is not enabled for a project, there are no zones and therefore no instances.
         return []
-    response_objects: List[Resource] = []
-    for zone in zones:
-        req = compute.instances().list(project=project_id, zone=zone['name'])
-        res = req.execute()
-        response_objects.append(res)
-    return response_objects
+    return _get_location_responses(
+        compute, compute.instances(), project_id, 'zones', [zone['name'] for zone in zones], 'instances',
+    )
 
 
 @timeit
@@ -130,6 +274,18 @@ def get_gcp_subnets(projectid: str, region: str, compute: Resource) -> Resource:
     return req.execute()
 
 
+@timeit
+def get_gcp_subnet_responses(project_id: str, regions: List[str], compute: Resource) -> List[Dict]:
+    """
+    Return list of subnet response objects for the given project_id and regions, see `get_gcp_subnets()`
+    :param project_id: The project ID
+    :param regions: The regions to pull subnets from
+    :param compute: The compute resource object created by googleapiclient.discovery.build()
+    :return: A list of response objects of the form {id: str, items: []}, one per region
+    """
+    return _get_location_responses(compute, compute.subnetworks(), project_id, 'regions', regions, 'subnetworks')
+
+
 @timeit
 def get_gcp_vpcs(projectid: str, compute: Resource) -> Resource:
     """
@@ -155,6 +311,21 @@ def get_gcp_regional_forwarding_rules(project_id: str, region: str, compute: Res
     return req.execute()
 
 
+@timeit
+def get_gcp_regional_forwarding_rule_responses(project_id: str, regions: List[str], compute: Resource) -> List[Dict]:
+    """
+    Return list of forwarding rule response objects for the given project_id and regions, see
+    `get_gcp_regional_forwarding_rules()`
+    :param project_id: The project ID
+    :param regions: The regions to pull forwarding rules from
+    :param compute: The compute resource object created by googleapiclient.discovery.build()
+    :return: A list of response objects of the form {id: str, items: []}, one per region
+    """
+    return _get_location_responses(
+        compute, compute.forwardingRules(), project_id, 'regions', regions, 'forwardingRules',
+    )
+
+
 @timeit
 def get_gcp_global_forwarding_rules(project_id: str, compute: Resource) -> Resource:
     """
@@ -507,19 +678,20 @@ def load_gcp_instances(neo4j_session: neo4j.Session, data: List[Dict], gcp_updat
     :return: Nothing
     """
     query = """
-    MERGE (p:GCPProject{id:{ProjectId}})
+    UNWIND {DictList} AS instance
+    MERGE (p:GCPProject{id:instance.ProjectId})
     ON CREATE SET p.firstseen = timestamp()
     SET p.lastupdated = {gcp_update_tag}
 
-    MERGE (i:Instance:GCPInstance{id:{PartialUri}})
+    MERGE (i:Instance:GCPInstance{id:instance.PartialUri})
     ON CREATE SET i.firstseen = timestamp(),
-    i.partial_uri = {PartialUri}
-    SET i.self_link = {SelfLink},
-    i.instancename = {InstanceName},
-    i.hostname = {Hostname},
-    i.zone_name = {ZoneName},
-    i.project_id = {ProjectId},
-    i.status = {Status},
+    i.partial_uri = instance.PartialUri
+    SET i.self_link = instance.SelfLink,
+    i.instancename = instance.InstanceName,
+    i.hostname = instance.Hostname,
+    i.zone_name = instance.ZoneName,
+    i.project_id = instance.ProjectId,
+    i.status = instance.Status,
     i.lastupdated = {gcp_update_tag}
     WITH i, p
 
@@ -527,18 +699,19 @@ def load_gcp_instances(neo4j_session: neo4j.Session, data: List[Dict], gcp_updat
     ON CREATE SET r.firstseen = timestamp()
     SET r.lastupdated = {gcp_update_tag}
     """
+    instance_rows = [
+        {
+            'ProjectId': instance['project_id'],
+            'PartialUri': instance['partial_uri'],
+            'SelfLink': instance['selfLink'],
+            'InstanceName': instance['name'],
+            'ZoneName': instance['zone_name'],
+            'Hostname': instance.get('hostname', None),
+            'Status': instance['status'],
+        } for instance in data
+    ]
+    load_graph_data(neo4j_session, query, instance_rows, gcp_update_tag=gcp_update_tag)
     for instance in data:
-        neo4j_session.run(
-            query,
-            ProjectId=instance['project_id'],
-            PartialUri=instance['partial_uri'],
-            SelfLink=instance['selfLink'],
-            InstanceName=instance['name'],
-            ZoneName=instance['zone_name'],
-            Hostname=instance.get('hostname', None),
-            Status=instance['status'],
-            gcp_update_tag=gcp_update_tag,
-        )
         _attach_instance_tags(neo4j_session, instance, gcp_update_tag)
         _attach_gcp_nics(neo4j_session, instance, gcp_update_tag)
         _attach_gcp_vpc(neo4j_session, instance['partial_uri'], gcp_update_tag)
@@ -554,37 +727,27 @@ def load_gcp_vpcs(neo4j_session: neo4j.Session, vpcs: List[Dict], gcp_update_tag
     :return: Nothing
     """
     query = """
-    MERGE(p:GCPProject{id:{ProjectId}})
+    UNWIND {DictList} AS v
+    MERGE(p:GCPProject{id:v.project_id})
     ON CREATE SET p.firstseen = timestamp()
     SET p.lastupdated = {gcp_update_tag}
 
-    MERGE(vpc:GCPVpc{id:{PartialUri}})
+    MERGE(vpc:GCPVpc{id:v.partial_uri})
     ON CREATE SET vpc.firstseen = timestamp(),
-    vpc.partial_uri = {PartialUri}
-    SET vpc.self_link = {SelfLink},
-    vpc.name = {VpcName},
-    vpc.project_id = {ProjectId},
-    vpc.auto_create_subnetworks = {AutoCreateSubnetworks},
-    vpc.routing_config_routing_mode = {RoutingMode},
-    vpc.description = {Description},
+    vpc.partial_uri = v.partial_uri
+    SET vpc.self_link = v.self_link,
+    vpc.name = v.name,
+    vpc.project_id = v.project_id,
+    vpc.auto_create_subnetworks = v.auto_create_subnetworks,
+    vpc.routing_config_routing_mode = v.routing_config_routing_mode,
+    vpc.description = v.description,
     vpc.lastupdated = {gcp_update_tag}
 
     MERGE (p)-[r:RESOURCE]->(vpc)
     ON CREATE SET r.firstseen = timestamp()
     SET r.lastupdated = {gcp_update_tag}
     """
-    for vpc in vpcs:
-        neo4j_session.run(
-            query,
-            ProjectId=vpc['project_id'],
-            PartialUri=vpc['partial_uri'],
-            SelfLink=vpc['self_link'],
-            VpcName=vpc['name'],
-            AutoCreateSubnetworks=vpc['auto_create_subnetworks'],
-            RoutingMode=vpc['routing_config_routing_mode'],
-            Description=vpc['description'],
-            gcp_update_tag=gcp_update_tag,
-        )
+    load_graph_data(neo4j_session, query, vpcs, gcp_update_tag=gcp_update_tag)
 
 
 @timeit
@@ -597,42 +760,29 @@ def load_gcp_subnets(neo4j_session: neo4j.Session, subnets: List[Dict], gcp_upda
     :return: Nothing
     """
     query = """
-    MERGE(vpc:GCPVpc{id:{VpcPartialUri}})
+    UNWIND {DictList} AS s
+    MERGE(vpc:GCPVpc{id:s.vpc_partial_uri})
     ON CREATE SET vpc.firstseen = timestamp(),
-    vpc.partial_uri = {VpcPartialUri}
+    vpc.partial_uri = s.vpc_partial_uri
 
-    MERGE(subnet:GCPSubnet{id:{PartialUri}})
+    MERGE(subnet:GCPSubnet{id:s.partial_uri})
     ON CREATE SET subnet.firstseen = timestamp(),
-    subnet.partial_uri = {PartialUri}
-    SET subnet.self_link = {SubnetSelfLink},
-    subnet.project_id = {ProjectId},
-    subnet.name = {SubnetName},
-    subnet.region = {Region},
-    subnet.gateway_address = {GatewayAddress},
-    subnet.ip_cidr_range = {IpCidrRange},
-    subnet.private_ip_google_access = {PrivateIpGoogleAccess},
-    subnet.vpc_partial_uri = {VpcPartialUri},
+    subnet.partial_uri = s.partial_uri
+    SET subnet.self_link = s.self_link,
+    subnet.project_id = s.project_id,
+    subnet.name = s.name,
+    subnet.region = s.region,
+    subnet.gateway_address = s.gateway_address,
+    subnet.ip_cidr_range = s.ip_cidr_range,
+    subnet.private_ip_google_access = s.private_ip_google_access,
+    subnet.vpc_partial_uri = s.vpc_partial_uri,
     subnet.lastupdated = {gcp_update_tag}
 
     MERGE (vpc)-[r:RESOURCE]->(subnet)
     ON CREATE SET r.firstseen = timestamp()
     SET r.lastupdated = {gcp_update_tag}
     """
-    for s in subnets:
-        neo4j_session.run(
-            query,
-            VpcPartialUri=s['vpc_partial_uri'],
-            VpcSelfLink=s['vpc_self_link'],
-            PartialUri=s['partial_uri'],
-            SubnetSelfLink=s['self_link'],
-            ProjectId=s['project_id'],
-            SubnetName=s['name'],
-            Region=s['region'],
-            GatewayAddress=s['gateway_address'],
-            IpCidrRange=s['ip_cidr_range'],
-            PrivateIpGoogleAccess=s['private_ip_google_access'],
-            gcp_update_tag=gcp_update_tag,
-        )
+    load_graph_data(neo4j_session, query, subnets, gcp_update_tag=gcp_update_tag)
 
 
 @timeit
@@ -1089,7 +1239,7 @@ def cleanup_gcp_firewall_rules(neo4j_session: neo4j.Session, common_job_paramete
 @timeit
 def sync_gcp_instances(
     neo4j_session: neo4j.Session, compute: Resource, project_id: str, zones: Optional[List[Dict]],
-    gcp_update_tag: int, common_job_parameters: Dict,
+    gcp_update_tag: int, common_job_parameters: Dict, neo4j_write_queue_size: int = 0,
 ) -> None:
     """
     Get GCP instances using the Compute resource object, ingest to Neo4j, and clean up old data.
@@ -1101,13 +1251,15 @@ def sync_gcp_instances(
     `get_zones_in_project()`
     :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
     :param common_job_parameters: dict of other job parameters to pass to Neo4j
+    :param neo4j_write_queue_size: The maximum number of fetched batches waiting to be written, see WritePipeline
     :return: Nothing
     """
-    instance_responses = get_gcp_instance_responses(project_id, zones, compute)
-    instance_list = transform_gcp_instances(instance_responses)
-    load_gcp_instances(neo4j_session, instance_list, gcp_update_tag)
-    # TODO scope the cleanup to the current project - https://github.com/lyft/cartography/issues/381
-    cleanup_gcp_instances(neo4j_session, common_job_parameters)
+    with WritePipeline(neo4j_session, neo4j_write_queue_size) as pipeline:
+        instance_responses = get_gcp_instance_responses(project_id, zones, compute)
+        instance_list = transform_gcp_instances(instance_responses)
+        pipeline.submit(load_gcp_instances, instance_list, gcp_update_tag)
+        # TODO scope the cleanup to the current project - https://github.com/lyft/cartography/issues/381
+        pipeline.submit(cleanup_gcp_instances, common_job_parameters)
 
 
 @timeit
@@ -1134,21 +1286,21 @@ def sync_gcp_vpcs(
 @timeit
 def sync_gcp_subnets(
     neo4j_session: neo4j.Session, compute: Resource, project_id: str, regions: List[str], gcp_update_tag: int,
-    common_job_parameters: Dict,
+    common_job_parameters: Dict, neo4j_write_queue_size: int = 0,
 ) -> None:
-    for r in regions:
-        subnet_res = get_gcp_subnets(project_id, r, compute)
-        subnets = transform_gcp_subnets(subnet_res)
-        load_gcp_subnets(neo4j_session, subnets, gcp_update_tag)
-        # TODO scope the cleanup to the current project - https://github.com/lyft/cartography/issues/381
-        cleanup_gcp_subnets(neo4j_session, common_job_parameters)
+    with WritePipeline(neo4j_session, neo4j_write_queue_size) as pipeline:
+        for subnet_res in get_gcp_subnet_responses(project_id, regions, compute):
+            subnets = transform_gcp_subnets(subnet_res)
+            pipeline.submit(load_gcp_subnets, subnets, gcp_update_tag)
+            # TODO scope the cleanup to the current project - https://github.com/lyft/cartography/issues/381
+            pipeline.submit(cleanup_gcp_subnets, common_job_parameters)
 
 
 @timeit
 def sync_gcp_forwarding_rules(
     neo4j_session: neo4j.Session, compute: Resource, project_id: str, regions: List[str], gcp_update_tag: int,
 
-    common_job_parameters: Dict,
+    common_job_parameters: Dict, neo4j_write_queue_size: int = 0,
 ) -> None:
     """
     Sync GCP Both Global and Regional Forwarding Rules, ingest to Neo4j, and clean up old data.
@@ -1158,20 +1310,21 @@ def sync_gcp_forwarding_rules(
     :param regions: List of regions.
     :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
     :param common_job_parameters: dict of other job parameters to pass to Neo4j
+    :param neo4j_write_queue_size: The maximum number of fetched batches waiting to be written, see WritePipeline
     :return: Nothing
     """
-    global_fwd_response = get_gcp_global_forwarding_rules(project_id, compute)
-    forwarding_rules = transform_gcp_forwarding_rules(global_fwd_response)
-    load_gcp_forwarding_rules(neo4j_session, forwarding_rules, gcp_update_tag)
-    # TODO scope the cleanup to the current project - https://github.com/lyft/cartography/issues/381
-    cleanup_gcp_forwarding_rules(neo4j_session, common_job_parameters)
-
-    for r in regions:
-        fwd_response = get_gcp_regional_forwarding_rules(project_id, r, compute)
-        forwarding_rules = transform_gcp_forwarding_rules(fwd_response)
-        load_gcp_forwarding_rules(neo4j_session, forwarding_rules, gcp_update_tag)
+    with WritePipeline(neo4j_session, neo4j_write_queue_size) as pipeline:
+        global_fwd_response = get_gcp_global_forwarding_rules(project_id, compute)
+        forwarding_rules = transform_gcp_forwarding_rules(global_fwd_response)
+        pipeline.submit(load_gcp_forwarding_rules, forwarding_rules, gcp_update_tag)
         # TODO scope the cleanup to the current project - https://github.com/lyft/cartography/issues/381
-        cleanup_gcp_forwarding_rules(neo4j_session, common_job_parameters)
+        pipeline.submit(cleanup_gcp_forwarding_rules, common_job_parameters)
+
+        for fwd_response in get_gcp_regional_forwarding_rule_responses(project_id, regions, compute):
+            forwarding_rules = transform_gcp_forwarding_rules(fwd_response)
+            pipeline.submit(load_gcp_forwarding_rules, forwarding_rules, gcp_update_tag)
+            # TODO scope the cleanup to the current project - https://github.com/lyft/cartography/issues/381
+            pipeline.submit(cleanup_gcp_forwarding_rules, common_job_parameters)
 
 
 @timeit
@@ -1210,7 +1363,7 @@ def _zones_to_regions(zones: List[str]) -> List[Set]:
 
 def sync(
     neo4j_session: neo4j.Session, compute: Resource, project_id: str, gcp_update_tag: int,
-    common_job_parameters: dict,
+    common_job_parameters: dict, neo4j_write_queue_size: int = 0,
 ) -> None:
     """
     Sync all objects that we need the GCP Compute resource object for.
@@ -1221,6 +1374,7 @@ def sync(
     https://cloud.google.com/resource-manager/reference/rest/v1/projects
     :param gcp_update_tag: The timestamp value to set our new Neo4j nodes with
     :param common_job_parameters: dict of other job parameters to pass to Neo4j
+    :param neo4j_write_queue_size: The maximum number of fetched batches waiting to be written, see WritePipeline
     :return: Nothing
     """
     logger.info("Syncing Compute objects for project %s.", project_id)
@@ -1232,6 +1386,15 @@ def sync(
         regions = _zones_to_regions(zones)
         sync_gcp_vpcs(neo4j_session, compute, project_id, gcp_update_tag, common_job_parameters)
         sync_gcp_firewall_rules(neo4j_session, compute, project_id, gcp_update_tag, common_job_parameters)
-        sync_gcp_subnets(neo4j_session, compute, project_id, regions, gcp_update_tag, common_job_parameters)
-        sync_gcp_instances(neo4j_session, compute, project_id, zones, gcp_update_tag, common_job_parameters)
-        sync_gcp_forwarding_rules(neo4j_session, compute, project_id, regions, gcp_update_tag, common_job_parameters)
+        sync_gcp_subnets(
+            neo4j_session, compute, project_id, regions, gcp_update_tag, common_job_parameters,
+            neo4j_write_queue_size=neo4j_write_queue_size,
+        )
+        sync_gcp_instances(
+            neo4j_session, compute, project_id, zones, gcp_update_tag, common_job_parameters,
+            neo4j_write_queue_size=neo4j_write_queue_size,
+        )
+        sync_gcp_forwarding_rules(
+            neo4j_session, compute, project_id, regions, gcp_update_tag, common_job_parameters,
+            neo4j_write_queue_size=neo4j_write_queue_size,
+        )
@@ -5,6 +5,7 @@ from typing import List
 import neo4j
 from googleapiclient.discovery import Resource
 
+from cartography.client.core.tx import load_graph_data
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
 
@@ -196,9 +197,11 @@ def load_gsuite_members(neo4j_session: neo4j.Session, group: Dict, members: List
         ON MATCH SET
         r.lastupdated = {UpdateTag}
     """
-    neo4j_session.run(
+    load_graph_data(
+        neo4j_session,
         ingestion_qry,
-        MemberData=members,
+        members,
+        list_param_name='MemberData',
         GroupID=group.get("id"),
         UpdateTag=gsuite_update_tag,
     )
@@ -211,7 +214,14 @@ def load_gsuite_members(neo4j_session: neo4j.Session, group: Dict, members: List
         ON MATCH SET
         r.lastupdated = {UpdateTag}
     """
-    neo4j_session.run(membership_qry, MemberData=members, GroupID=group.get("id"), UpdateTag=gsuite_update_tag)
+    load_graph_data(
+        neo4j_session,
+        membership_qry,
+        members,
+        list_param_name='MemberData',
+        GroupID=group.get("id"),
+        UpdateTag=gsuite_update_tag,
+    )
 
 
 @timeit
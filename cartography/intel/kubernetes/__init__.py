@@ -1,5 +1,11 @@
 import logging
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from typing import List
+from typing import Optional
 
+import neo4j
 from neo4j import Session
 
 from cartography.config import Config
@@ -7,12 +13,77 @@ from cartography.intel.kubernetes.namespaces import sync_namespaces
 from cartography.intel.kubernetes.pods import sync_pods
 from cartography.intel.kubernetes.services import sync_services
 from cartography.intel.kubernetes.util import get_k8s_clients
+from cartography.intel.kubernetes.util import K8sClient
+from cartography.util import get_neo4j_driver
 from cartography.util import run_cleanup_job
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
 
 
+def _sync_cluster(session: Session, client: K8sClient, update_tag: int, page_size: Optional[int]) -> bool:
+    """
+    Sync one cluster. Returns False, after logging the error, if the sync failed.
+    """
+    logger.info(f"Syncing data for k8s cluster {client.name}...")
+    try:
+        cluster = sync_namespaces(session, client, update_tag)
+        pods = sync_pods(session, client, update_tag, cluster, page_size)
+        sync_services(session, client, update_tag, cluster, pods, page_size)
+    except Exception:
+        logger.exception(f"Failed to sync data for k8s cluster {client.name}...")
+        return False
+    return True
+
+
+def _sync_contexts_in_new_session(
+    neo4j_driver: neo4j.Driver, clients: List[K8sClient], update_tag: int, page_size: Optional[int],
+) -> List[str]:
+    """
+    Sync the given contexts one after another and return the names of the ones that failed.
+    """
+    with neo4j_driver.session() as session:
+        return [client.name for client in clients if not _sync_cluster(session, client, update_tag, page_size)]
+
+
+def _group_by_server(clients: List[K8sClient]) -> List[List[K8sClient]]:
+    """
+    Group the given contexts by the API server they point to, keeping the kubeconfig order.
+    """
+    groups: Dict[str, List[K8sClient]] = {}
+    for client in clients:
+        groups.setdefault(client.server, []).append(client)
+    return list(groups.values())
+
+
+def _sync_clusters(
+    session: Session,
+    clients: List[K8sClient],
+    update_tag: int,
+    page_size: Optional[int] = None,
+    neo4j_driver: Optional[neo4j.Driver] = None,
+    max_workers: int = 1,
+) -> List[str]:
+    """
+    Sync the given clusters and return the names of the ones that failed. A failed cluster does not stop the others. If
+    `neo4j_driver` is given and `max_workers` is greater than 1, up to `max_workers` clusters are synced concurrently,
+    each with its own Neo4j session from `neo4j_driver`. Contexts that point to the same API server write the same
+    cluster, namespace and pod nodes, so they are synced one after another by the same worker.
+    """
+    if neo4j_driver is not None and max_workers > 1:
+        logger.info("Syncing up to %d k8s clusters concurrently.", max_workers)
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='cartography-k8s') as executor:
+            futures: List[Future] = [
+                executor.submit(_sync_contexts_in_new_session, neo4j_driver, group, update_tag, page_size)
+                for group in _group_by_server(clients)
+            ]
+            failed = {name for future in futures for name in future.result()}
+            # Report failures in kubeconfig order, the same way as a serial sync.
+            return [client.name for client in clients if client.name in failed]
+
+    return [client.name for client in clients if not _sync_cluster(session, client, update_tag, page_size)]
+
+
 @timeit
 def start_k8s_ingestion(session: Session, config: Config) -> None:
 
@@ -21,15 +92,21 @@ def start_k8s_ingestion(session: Session, config: Config) -> None:
         logger.error("kubeconfig not found.")
         return
 
-    for client in get_k8s_clients(config.k8s_kubeconfig):
-        logger.info(f"Syncing data for k8s cluster {client.name}...")
-        try:
-            cluster = sync_namespaces(session, client, config.update_tag)
-            pods = sync_pods(session, client, config.update_tag, cluster)
-            sync_services(session, client, config.update_tag, cluster, pods)
-        except Exception:
-            logger.exception(f"Failed to sync data for k8s cluster {client.name}...")
-            raise
+    clients = get_k8s_clients(config.k8s_kubeconfig)
+    max_workers = config.k8s_cluster_max_workers or 1
+    neo4j_driver = get_neo4j_driver(config) if max_workers > 1 and len(clients) > 1 else None
+    try:
+        failed_clusters = _sync_clusters(
+            session, clients, config.update_tag, config.k8s_page_size, neo4j_driver=neo4j_driver,
+            max_workers=max_workers,
+        )
+    finally:
+        if neo4j_driver is not None:
+            neo4j_driver.close()
+
+    # The cleanup job is not scoped to a cluster, so it would delete the data of the clusters that failed to sync.
+    if failed_clusters:
+        raise Exception(f"Failed to sync data for k8s clusters {', '.join(failed_clusters)}.")
 
     run_cleanup_job(
         "kubernetes_import_cleanup.json",
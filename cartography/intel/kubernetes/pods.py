@@ -1,11 +1,15 @@
 import logging
+from typing import Any
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Optional
 
 from neo4j import Session
 
 from cartography.intel.kubernetes.util import get_epoch
 from cartography.intel.kubernetes.util import K8sClient
+from cartography.intel.kubernetes.util import list_in_pages
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
@@ -13,58 +17,76 @@ logger = logging.getLogger(__name__)
 
 @timeit
 def sync_pods(
-    session: Session, client: K8sClient, update_tag: int, cluster: Dict,
+    session: Session, client: K8sClient, update_tag: int, cluster: Dict, page_size: Optional[int] = None,
 ) -> List[Dict]:
-    pods = get_pods(client, cluster)
-    load_pods(session, pods, update_tag)
-    return pods
+    """
+    Sync the pods of a cluster and return them for matching against service selectors. With a `page_size`, pods are
+    listed and loaded one page at a time, and only the uid, name, namespace and labels of each pod are returned. Pods
+    that are listed again after an expired listing restarted, see `list_in_pages()`, are returned once.
+    """
+    if not page_size:
+        pods = get_pods(client, cluster)
+        load_pods(session, pods, update_tag)
+        return pods
+
+    selectable_pods = dict()
+    for pods in get_pod_pages(client, cluster, page_size):
+        load_pods(session, pods, update_tag)
+        selectable_pods.update(
+            (pod["uid"], {key: pod[key] for key in ("uid", "name", "namespace", "labels")}) for pod in pods
+        )
+    return list(selectable_pods.values())
 
 
 @timeit
 def get_pods(client: K8sClient, cluster: Dict) -> List[Dict]:
-    pods = list()
-    for pod in client.core.list_pod_for_all_namespaces().items:
-        containers = {}
-        for container in pod.spec.containers:
-            containers[container.name] = {
-                "name": container.name,
-                "image": container.image,
-                "uid": f"{pod.metadata.uid}-{container.name}",
-            }
-        if pod.status and pod.status.container_statuses:
-            for status in pod.status.container_statuses:
-                if status.name in containers:
-                    _state = 'waiting'
-                    if status.state.running:
-                        _state = 'running'
-                    elif status.state.terminated:
-                        _state = 'terminated'
-                    try:
-                        image_sha = status.image_id.split("@")[1]
-                    except IndexError:
-                        image_sha = None
-                    containers[status.name]["status"] = {
-                        "image_id": status.image_id,
-                        "image_sha": image_sha,
-                        "ready": status.ready,
-                        "started": status.started,
-                        "state": _state,
-                    }
-        pods.append(
-            {
-                "uid": pod.metadata.uid,
-                "name": pod.metadata.name,
-                "status_phase": pod.status.phase,
-                "creation_timestamp": get_epoch(pod.metadata.creation_timestamp),
-                "deletion_timestamp": get_epoch(pod.metadata.deletion_timestamp),
-                "namespace": pod.metadata.namespace,
-                "node": pod.spec.node_name,
-                "cluster_uid": cluster["uid"],
-                "labels": pod.metadata.labels,
-                "containers": list(containers.values()),
-            },
-        )
-    return pods
+    return [transform_pod(pod, cluster) for pod in client.core.list_pod_for_all_namespaces().items]
+
+
+def get_pod_pages(client: K8sClient, cluster: Dict, page_size: int) -> Iterator[List[Dict]]:
+    for page in list_in_pages(client.core.list_pod_for_all_namespaces, page_size):
+        yield [transform_pod(pod, cluster) for pod in page]
+
+
+def transform_pod(pod: Any, cluster: Dict) -> Dict:
+    containers = {}
+    for container in pod.spec.containers:
+        containers[container.name] = {
+            "name": container.name,
+            "image": container.image,
+            "uid": f"{pod.metadata.uid}-{container.name}",
+        }
+    if pod.status and pod.status.container_statuses:
+        for status in pod.status.container_statuses:
+            if status.name in containers:
+                _state = 'waiting'
+                if status.state.running:
+                    _state = 'running'
+                elif status.state.terminated:
+                    _state = 'terminated'
+                try:
+                    image_sha = status.image_id.split("@")[1]
+                except IndexError:
+                    image_sha = None
+                containers[status.name]["status"] = {
+                    "image_id": status.image_id,
+                    "image_sha": image_sha,
+                    "ready": status.ready,
+                    "started": status.started,
+                    "state": _state,
+                }
+    return {
+        "uid": pod.metadata.uid,
+        "name": pod.metadata.name,
+        "status_phase": pod.status.phase,
+        "creation_timestamp": get_epoch(pod.metadata.creation_timestamp),
+        "deletion_timestamp": get_epoch(pod.metadata.deletion_timestamp),
+        "namespace": pod.metadata.namespace,
+        "node": pod.spec.node_name,
+        "cluster_uid": cluster["uid"],
+        "labels": pod.metadata.labels,
+        "containers": list(containers.values()),
+    }
 
 
 def load_pods(session: Session, data: List[Dict], update_tag: int) -> None:
@@ -1,11 +1,17 @@
 import logging
+from typing import Any
 from typing import Dict
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Set
+from typing import Tuple
 
 from neo4j import Session
 
 from cartography.intel.kubernetes.util import get_epoch
 from cartography.intel.kubernetes.util import K8sClient
+from cartography.intel.kubernetes.util import list_in_pages
 from cartography.util import timeit
 
 logger = logging.getLogger(__name__)
@@ -14,47 +20,81 @@ logger = logging.getLogger(__name__)
 @timeit
 def sync_services(
     session: Session, client: K8sClient, update_tag: int, cluster: Dict, pods: List[Dict],
+    page_size: Optional[int] = None,
 ) -> None:
-    services = get_services(client, cluster, pods)
-    load_services(session, services, update_tag)
+    """
+    Sync the services of a cluster. With a `page_size`, services are listed and loaded one page at a time.
+    """
+    if not page_size:
+        services = get_services(client, cluster, pods)
+        load_services(session, services, update_tag)
+        return
+
+    for services in get_service_pages(client, cluster, pods, page_size):
+        load_services(session, services, update_tag)
+
+
+def build_pod_label_index(pods: List[Dict]) -> Dict[Tuple[str, str], Set[int]]:
+    """
+    Map every (label key, label value) pair to the positions in `pods` of the pods that have that label.
+    """
+    index: Dict[Tuple[str, str], Set[int]] = {}
+    for position, pod in enumerate(pods):
+        for label in (pod.get("labels") or dict()).items():
+            index.setdefault(label, set()).add(position)
+    return index
+
+
+def get_selected_pods(
+    pods: List[Dict], label_index: Dict[Tuple[str, str], Set[int]], selector: Optional[Dict[str, str]],
+) -> List[Dict]:
+    """
+    Return the pods that have every label of the given service selector, in the order of `pods`. A service without a
+    selector selects no pods.
+    """
+    if not selector:
+        return list()
+    matches = sorted((label_index.get(label, set()) for label in selector.items()), key=len)
+    positions = set(matches[0]).intersection(*matches[1:])
+    return [pods[position] for position in sorted(positions)]
 
 
 @timeit
 def get_services(client: K8sClient, cluster: Dict, pods: List[Dict]) -> List[Dict]:
-    services = list()
-    for service in client.core.list_service_for_all_namespaces().items:
-        item = {
-            "uid": service.metadata.uid,
-            "name": service.metadata.name,
-            "creation_timestamp": get_epoch(service.metadata.creation_timestamp),
-            "deletion_timestamp": get_epoch(service.metadata.deletion_timestamp),
-            "namespace": service.metadata.namespace,
-            "cluster_uid": cluster["uid"],
-            "type": service.spec.type,
-            "selector": service.spec.selector,
-            "load_balancer_ip": service.spec.load_balancer_ip,
-        }
-
-        ingresses = service.status.load_balancer.ingress
-        for ingress in ingresses or list():
-            item.update({"ingress_host": ingress.hostname, "ingress_ip": ingress.ip})
-
-        service_pods = list()
-        for pod in pods:
-            is_service_pod = True if service.spec.selector else False
-            for selector in service.spec.selector or dict():
-                if (
-                    not pod.get("labels") or
-                    selector not in pod["labels"] or
-                    service.spec.selector[selector] != pod["labels"][selector]
-                ):
-                    is_service_pod = False
-                    break
-            if is_service_pod:
-                service_pods.append(pod)
-        item["pods"] = service_pods
-        services.append(item)
-    return services
+    label_index = build_pod_label_index(pods)
+    return [
+        transform_service(service, cluster, pods, label_index)
+        for service in client.core.list_service_for_all_namespaces().items
+    ]
+
+
+def get_service_pages(client: K8sClient, cluster: Dict, pods: List[Dict], page_size: int) -> Iterator[List[Dict]]:
+    label_index = build_pod_label_index(pods)
+    for page in list_in_pages(client.core.list_service_for_all_namespaces, page_size):
+        yield [transform_service(service, cluster, pods, label_index) for service in page]
+
+
+def transform_service(
+    service: Any, cluster: Dict, pods: List[Dict], label_index: Dict[Tuple[str, str], Set[int]],
+) -> Dict:
+    item = {
+        "uid": service.metadata.uid,
+        "name": service.metadata.name,
+        "creation_timestamp": get_epoch(service.metadata.creation_timestamp),
+        "deletion_timestamp": get_epoch(service.metadata.deletion_timestamp),
+        "namespace": service.metadata.namespace,
+        "cluster_uid": cluster["uid"],
+        "type": service.spec.type,
+        "selector": service.spec.selector,
+        "load_balancer_ip": service.spec.load_balancer_ip,
+    }
+
+    ingresses = service.status.load_balancer.ingress
+    for ingress in ingresses or list():
+        item.update({"ingress_host": ingress.hostname, "ingress_ip": ingress.ip})
+
+    item["pods"] = get_selected_pods(pods, label_index, service.spec.selector)
+    return item
 
 
 def load_services(session: Session, data: List[Dict], update_tag: int) -> None:
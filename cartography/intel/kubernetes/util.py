@@ -1,4 +1,8 @@
+import logging
 from datetime import datetime
+from typing import Any
+from typing import Callable
+from typing import Iterator
 from typing import List
 from typing import Union
 
@@ -6,6 +10,12 @@ from kubernetes import config
 from kubernetes.client import ApiClient
 from kubernetes.client import CoreV1Api
 from kubernetes.client import NetworkingV1beta1Api
+from kubernetes.client.rest import ApiException
+
+logger = logging.getLogger(__name__)
+
+# How many times `list_in_pages()` starts a listing over after its continue token expired.
+LIST_RESTART_LIMIT = 3
 
 
 class KubernetesContextNotFound(Exception):
@@ -33,6 +43,8 @@ class K8sClient:
         self.name = name
         self.core = K8CoreApiClient(self.name)
         self.networking = K8NetworkingApiClient(self.name)
+        # The API server URL of the context. Several contexts, e.g. with different users, can point to one cluster.
+        self.server = self.core.api_client.configuration.host
 
 
 def get_k8s_clients(kubeconfig: str) -> List[K8sClient]:
@@ -49,3 +61,33 @@ def get_epoch(date: datetime) -> Union[int, None]:
     if date:
         return int(date.strftime("%s"))
     return None
+
+
+def list_in_pages(list_func: Callable, page_size: int, **kwargs: Any) -> Iterator[List[Any]]:
+    """
+    Yield the items returned by a Kubernetes list call, e.g. `client.core.list_pod_for_all_namespaces`, one page of at
+    most `page_size` items at a time, following the `continue` token of each page.
+
+    The API server expires continue tokens after a few minutes (410 Gone), which happens when the caller takes that
+    long to process the pages. The listing then starts over from the first page, up to LIST_RESTART_LIMIT times, so
+    callers may receive some items more than once.
+    """
+    continue_token = None
+    restarts = 0
+    while True:
+        try:
+            response = list_func(limit=page_size, _continue=continue_token, **kwargs)
+        except ApiException as e:
+            if e.status != 410 or continue_token is None or restarts >= LIST_RESTART_LIMIT:
+                raise
+            restarts += 1
+            logger.warning(
+                "Continue token of a paged Kubernetes list expired, listing again from the first page (%d/%d).",
+                restarts, LIST_RESTART_LIMIT,
+            )
+            continue_token = None
+            continue
+        yield response.items
+        continue_token = response.metadata._continue
+        if not continue_token:
+            return
@@ -70,6 +70,19 @@ class ScopedStatsClient:
             return self._root._client.timer(stat, rate)
         return None
 
+    def timing(self, stat: str, delta: float, rate: float = 1.0) -> None:
+        """
+        This method uses statsd to send a timing stat.
+        :param stat: the name of the timer metric stat (string) to report
+        :param delta: the time (float) to report, in milliseconds
+        :param rate: a sample rate, a float between 0 and 1. Will only send data this percentage of the time.
+                             The statsd server will take the sample rate into account for counters
+        """
+        if self.is_enabled():
+            if self._scope_prefix:
+                stat = f"{self._scope_prefix}.{stat}"
+            self._root._client.timing(stat, delta, rate)
+
     def set_stats_client(self, stats_client: StatsClient) -> None:
         self._root._client = stats_client
 
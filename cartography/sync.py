@@ -2,13 +2,16 @@ import argparse
 import logging
 import time
 from collections import OrderedDict
+from functools import partial
 from typing import Callable
+from typing import Dict
+from typing import Iterable
 from typing import List
-from typing import Tuple
+from typing import Optional
+from typing import Sequence
 from typing import Union
 
 import neo4j.exceptions
-from neo4j import GraphDatabase
 from statsd import StatsClient
 
 import cartography.intel.analysis
@@ -26,7 +29,10 @@ import cartography.intel.kubernetes
 import cartography.intel.oci
 import cartography.intel.okta
 from cartography.config import Config
+from cartography.graph.instrumentation import get_query_recorder
 from cartography.stats import set_stats_client
+from cartography.util import get_neo4j_driver
+from cartography.util import run_with_dependencies
 from cartography.util import STATUS_FAILURE
 from cartography.util import STATUS_SUCCESS
 
@@ -41,13 +47,26 @@ class Sync:
     a sequence of sync "stages" which are responsible for retrieving data from various sources (APIs, files, etc.),
     pushing that data to Neo4j, and removing now-invalid nodes and relationships from the graph. An instance of this
     class can be configured to run any number of stages in a specific order.
+
+    Stages may declare the names of the stages they depend on. When the sync is run with more than one worker (see
+    `sync_max_workers` on cartography.config.Config), stages whose dependencies have all finished are run concurrently,
+    each with its own Neo4j session. With a single worker, stages are run one after another in the order they were
+    added, except where a stage depends on one added after it.
     """
 
     def __init__(self):
         # NOTE we may need meta-stages at some point to allow hooking into pre-sync, sync, and post-sync
         self._stages = OrderedDict()
+        self._dependencies: Dict[str, List[str]] = {}
+
+    @property
+    def stage_names(self) -> List[str]:
+        """
+        The names of the stages added to this sync task, in the order they were added.
+        """
+        return list(self._stages)
 
-    def add_stage(self, name: str, func: Callable) -> None:
+    def add_stage(self, name: str, func: Callable, depends_on: Optional[Iterable[str]] = None) -> None:
         """
         Add one stage to the sync task.
 
@@ -55,22 +74,49 @@ class Sync:
         :param name: The name of the stage.
         :type func: Callable
         :param func: The object to call when the stage is executed.
+        :type depends_on: Iterable[string]
+        :param depends_on: Names of stages that must finish before this stage starts. Dependencies on stages that are
+            not part of this sync task are ignored, so the same declaration can be reused across partial syncs.
         """
         self._stages[name] = func
+        self._dependencies[name] = list(depends_on) if depends_on else []
 
-    def add_stages(self, stages: List[Tuple[str, Callable]]) -> None:
+    def add_stages(self, stages: Sequence[Sequence]) -> None:
         """
         Add multiple stages to the sync task.
 
-        :type stages: List[Tuple[string, Callable]]
-        :param stages: A list of stage names and stage callable pairs.
+        :type stages: List[Tuple[string, Callable]] or List[Tuple[string, Callable, List[string]]]
+        :param stages: A list of stage names and stage callable pairs, optionally followed by the names of the stages
+            each one depends on.
         """
-        for name, func in stages:
-            self.add_stage(name, func)
+        for stage in stages:
+            self.add_stage(*stage)
+
+    @staticmethod
+    def _run_stage(
+        neo4j_session: neo4j.Session, stage_name: str, stage_func: Callable,
+        config: Union[Config, argparse.Namespace],
+    ) -> None:
+        logger.info("Starting sync stage '%s'", stage_name)
+        try:
+            stage_func(neo4j_session, config)
+        except (KeyboardInterrupt, SystemExit):
+            logger.warning("Sync interrupted during stage '%s'.", stage_name)
+            raise
+        except Exception:
+            logger.exception("Unhandled exception during sync stage '%s'", stage_name)
+            raise  # TODO this should be configurable
+        logger.info("Finishing sync stage '%s'", stage_name)
+
+    def _run_stage_in_new_session(
+        self, neo4j_driver: neo4j.Driver, stage_name: str, config: Union[Config, argparse.Namespace],
+    ) -> None:
+        with neo4j_driver.session() as neo4j_session:
+            self._run_stage(neo4j_session, stage_name, self._stages[stage_name], config)
 
     def run(self, neo4j_driver: neo4j.Driver, config: Union[Config, argparse.Namespace]) -> int:
         """
-        Execute all stages in the sync task in sequence.
+        Execute all stages in the sync task.
 
         :type neo4j_driver: neo4j.Driver
         :param neo4j_driver: Neo4j driver object.
@@ -78,18 +124,27 @@ class Sync:
         :param config: Configuration for the sync run.
         """
         logger.info("Starting sync with update tag '%d'", config.update_tag)
-        with neo4j_driver.session() as neo4j_session:
-            for stage_name, stage_func in self._stages.items():
-                logger.info("Starting sync stage '%s'", stage_name)
-                try:
-                    stage_func(neo4j_session, config)
-                except (KeyboardInterrupt, SystemExit):
-                    logger.warning("Sync interrupted during stage '%s'.", stage_name)
-                    raise
-                except Exception:
-                    logger.exception("Unhandled exception during sync stage '%s'", stage_name)
-                    raise  # TODO this should be configurable
-                logger.info("Finishing sync stage '%s'", stage_name)
+        max_workers = config.sync_max_workers or 1
+        if max_workers > 1:
+            logger.info("Running sync stages concurrently with up to %d workers.", max_workers)
+            run_with_dependencies(
+                {
+                    stage_name: partial(self._run_stage_in_new_session, neo4j_driver, stage_name, config)
+                    for stage_name in self._stages
+                },
+                self._dependencies,
+                max_workers=max_workers,
+                thread_name_prefix='cartography-sync',
+            )
+        else:
+            with neo4j_driver.session() as neo4j_session:
+                run_with_dependencies(
+                    {
+                        stage_name: partial(self._run_stage, neo4j_session, stage_name, stage_func, config)
+                        for stage_name, stage_func in self._stages.items()
+                    },
+                    self._dependencies,
+                )
         logger.info("Finishing sync with update tag '%d'", config.update_tag)
         return STATUS_SUCCESS
 
@@ -120,11 +175,7 @@ def run_with_config(sync: Sync, config: Union[Config, argparse.Namespace]) -> in
     if config.neo4j_user or config.neo4j_password:
         neo4j_auth = (config.neo4j_user, config.neo4j_password)
     try:
-        neo4j_driver = GraphDatabase.driver(
-            config.neo4j_uri,
-            auth=neo4j_auth,
-            max_connection_lifetime=config.neo4j_max_connection_lifetime,
-        )
+        neo4j_driver = get_neo4j_driver(config)
     except neo4j.exceptions.ServiceUnavailable as e:
         logger.debug("Error occurred during Neo4j connect.", exc_info=True)
         logger.error(
@@ -160,7 +211,11 @@ def run_with_config(sync: Sync, config: Union[Config, argparse.Namespace]) -> in
     default_update_tag = int(time.time())
     if not config.update_tag:
         config.update_tag = default_update_tag
-    return sync.run(neo4j_driver, config)
+    try:
+        return sync.run(neo4j_driver, config)
+    finally:
+        if config.neo4j_query_report_file:
+            get_query_recorder().write_report(config.neo4j_query_report_file)
 
 
 def build_default_sync() -> Sync:
@@ -173,20 +228,22 @@ def build_default_sync() -> Sync:
     sync = Sync()
     sync.add_stages([
         ('create-indexes', cartography.intel.create_indexes.run),
-        ('aws', cartography.intel.aws.start_aws_ingestion),
-        ('azure', cartography.intel.azure.start_azure_ingestion),
-        ('crowdstrike', cartography.intel.crowdstrike.start_crowdstrike_ingestion),
-        ('gcp', cartography.intel.gcp.start_gcp_ingestion),
-        ('gsuite', cartography.intel.gsuite.start_gsuite_ingestion),
-        ('crxcavator', cartography.intel.crxcavator.start_extension_ingestion),
-        ('cve', cartography.intel.cve.start_cve_ingestion),
-        ('oci', cartography.intel.oci.start_oci_ingestion),
-        ('okta', cartography.intel.okta.start_okta_ingestion),
-        ('github', cartography.intel.github.start_github_ingestion),
-        ('digitalocean', cartography.intel.digitalocean.start_digitalocean_ingestion),
-        ('kubernetes', cartography.intel.kubernetes.start_k8s_ingestion),
-        ('analysis', cartography.intel.analysis.run),
+        ('aws', cartography.intel.aws.start_aws_ingestion, ['create-indexes']),
+        ('azure', cartography.intel.azure.start_azure_ingestion, ['create-indexes']),
+        ('crowdstrike', cartography.intel.crowdstrike.start_crowdstrike_ingestion, ['create-indexes']),
+        ('gcp', cartography.intel.gcp.start_gcp_ingestion, ['create-indexes']),
+        ('gsuite', cartography.intel.gsuite.start_gsuite_ingestion, ['create-indexes']),
+        ('crxcavator', cartography.intel.crxcavator.start_extension_ingestion, ['create-indexes']),
+        # CVEs are attached to the SpotlightVulnerability nodes created by the crowdstrike stage.
+        ('cve', cartography.intel.cve.start_cve_ingestion, ['create-indexes', 'crowdstrike']),
+        ('oci', cartography.intel.oci.start_oci_ingestion, ['create-indexes']),
+        # Okta SAML groups are mapped onto the AWSRole nodes created by the aws stage.
+        ('okta', cartography.intel.okta.start_okta_ingestion, ['create-indexes', 'aws']),
+        ('github', cartography.intel.github.start_github_ingestion, ['create-indexes']),
+        ('digitalocean', cartography.intel.digitalocean.start_digitalocean_ingestion, ['create-indexes']),
+        ('kubernetes', cartography.intel.kubernetes.start_k8s_ingestion, ['create-indexes']),
     ])
+    sync.add_stage('analysis', cartography.intel.analysis.run, depends_on=sync.stage_names)
     return sync
 
 def build_default_borneo_sync(skipIndex: bool) -> Sync:
@@ -194,8 +251,8 @@ def build_default_borneo_sync(skipIndex: bool) -> Sync:
     if skipIndex != True:
         sync.add_stages([('create-indexes', cartography.intel.create_indexes.run)])
     sync.add_stages([
-        ('aws', cartography.intel.aws.start_aws_ingestion),
-        ('analysis', cartography.intel.analysis.run)
+        ('aws', cartography.intel.aws.start_aws_ingestion, ['create-indexes']),
+        ('analysis', cartography.intel.analysis.run, ['aws']),
     ])
     return sync
 
@@ -204,8 +261,8 @@ def build_borneo_gcp_sync(skipIndex: bool) -> Sync:
     if skipIndex != True:
         sync.add_stages([('create-indexes', cartography.intel.create_indexes.run)])
     sync.add_stages([
-        ('gcp', cartography.intel.gcp.start_gcp_ingestion),
-        ('analysis', cartography.intel.analysis.run)
+        ('gcp', cartography.intel.gcp.start_gcp_ingestion, ['create-indexes']),
+        ('analysis', cartography.intel.analysis.run, ['gcp']),
     ])
     return sync
 
@@ -214,8 +271,8 @@ def build_borneo_azure_sync(skipIndex: bool) -> Sync:
     if skipIndex != True:
         sync.add_stages([('create-indexes', cartography.intel.create_indexes.run)])
     sync.add_stages([
-        ('azure', cartography.intel.azure.start_azure_ingestion),
-        ('analysis', cartography.intel.analysis.run)
+        ('azure', cartography.intel.azure.start_azure_ingestion, ['create-indexes']),
+        ('analysis', cartography.intel.analysis.run, ['azure']),
     ])
     return sync
 
@@ -225,7 +282,7 @@ def build_borneo_okta_sync(skipIndex: bool) -> Sync:
     if skipIndex != True:
         sync.add_stages([('create-indexes', cartography.intel.create_indexes.run)])
     sync.add_stages([
-        ('okta', cartography.intel.okta.start_okta_ingestion),
+        ('okta', cartography.intel.okta.start_okta_ingestion, ['create-indexes']),
     ])
     return sync
 
@@ -1,6 +1,10 @@
 import logging
 import re
 import sys
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
 from functools import wraps
 from string import Template
 from typing import Any
@@ -10,7 +14,9 @@ from typing import cast
 from typing import Dict
 from typing import Iterable
 from typing import List
+from typing import Mapping
 from typing import Optional
+from typing import Set
 from typing import TypeVar
 from typing import Union
 
@@ -18,6 +24,9 @@ import backoff
 import botocore
 import neo4j
 
+from cartography.config import Config
+from cartography.graph.instrumentation import get_query_recorder
+from cartography.graph.instrumentation import InstrumentedDriver
 from cartography.graph.job import GraphJob
 from cartography.graph.statement import get_job_shortname
 from cartography.stats import get_stats_client
@@ -36,6 +45,26 @@ STATUS_FAILURE = 1
 STATUS_KEYBOARD_INTERRUPT = 130
 
 
+def get_neo4j_driver(config: Config) -> neo4j.Driver:
+    """
+    Create a Neo4j driver from the Neo4j options (URI, auth, connection lifetime) on the given configuration object.
+
+    Intel modules that sync with a pool of workers use this to give every worker its own session. If query
+    instrumentation is turned on, the driver's sessions record their queries, see cartography.graph.instrumentation.
+    """
+    neo4j_auth = None
+    if config.neo4j_user or config.neo4j_password:
+        neo4j_auth = (config.neo4j_user, config.neo4j_password)
+    neo4j_driver = neo4j.GraphDatabase.driver(
+        config.neo4j_uri,
+        auth=neo4j_auth,
+        max_connection_lifetime=config.neo4j_max_connection_lifetime,
+    )
+    if config.neo4j_query_instrumentation or config.neo4j_query_report_file:
+        return InstrumentedDriver(neo4j_driver, get_query_recorder())
+    return neo4j_driver
+
+
 def run_analysis_job(
     filename: str,
     neo4j_session: neo4j.Session,
@@ -68,6 +97,89 @@ def run_cleanup_job(
     )
 
 
+def _resolve_dependencies(
+    task_names: Iterable[str], dependencies: Mapping[str, Iterable[str]],
+) -> Dict[str, Set[str]]:
+    """
+    Restrict the declared dependencies of every task to the given task names and reject dependency cycles.
+    """
+    task_names = list(task_names)
+    resolved: Dict[str, Set[str]] = {}
+    for name in task_names:
+        resolved[name] = set()
+        for dependency in dependencies.get(name, []):
+            if dependency not in task_names:
+                logger.debug("'%s' depends on '%s' which is not being run, ignoring.", name, dependency)
+                continue
+            resolved[name].add(dependency)
+
+    done: Set[str] = set()
+    remaining = dict(resolved)
+    while remaining:
+        ready = [name for name, deps in remaining.items() if deps <= done]
+        if not ready:
+            raise ValueError(f"Circular dependencies between {sorted(remaining)}")
+        for name in ready:
+            done.add(name)
+            del remaining[name]
+    return resolved
+
+
+def run_with_dependencies(
+    tasks: Mapping[str, Callable[[], Any]],
+    dependencies: Mapping[str, Iterable[str]],
+    max_workers: int = 1,
+    thread_name_prefix: str = 'cartography',
+) -> None:
+    """
+    Run named tasks so that every task starts only after the tasks it depends on have finished.
+
+    Dependencies on names that are not in `tasks` are ignored. Ties are broken by the order of `tasks`, so with
+    `max_workers` of 1 the tasks run one after another, in their given order wherever the dependencies allow it.
+    With more workers, every task whose dependencies have finished is started on a thread pool. If a task fails, no
+    further tasks are started, the tasks already running are allowed to finish, and the first exception is re-raised.
+
+    :param tasks: Ordered mapping of task name to a callable that takes no arguments.
+    :param dependencies: Mapping of task name to the names of the tasks that must finish before it starts.
+    :param max_workers: The maximum number of tasks to run at the same time.
+    :param thread_name_prefix: Prefix for the names of the worker threads.
+    """
+    pending = _resolve_dependencies(tasks.keys(), dependencies)
+    finished: Set[str] = set()
+
+    if max_workers <= 1:
+        while pending:
+            name = next(name for name, deps in pending.items() if deps <= finished)
+            del pending[name]
+            tasks[name]()
+            finished.add(name)
+        return
+
+    running: Dict[Future, str] = {}
+    error: Optional[BaseException] = None
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix) as executor:
+        while pending or running:
+            if error is None:
+                for name in list(pending):
+                    if len(running) >= max_workers:
+                        break
+                    if pending[name] <= finished:
+                        del pending[name]
+                        running[executor.submit(tasks[name])] = name
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                exception = future.exception()
+                if exception is not None:
+                    error = error or exception
+                else:
+                    finished.add(name)
+    if error is not None:
+        raise error
+
+
 def merge_module_sync_metadata(
     neo4j_session: neo4j.Session,
     group_type: str,
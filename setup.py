@@ -34,7 +34,7 @@ setup(
         "dnspython>=1.15.0",
         "neo4j>=4.4.4,<5.0.0",
         "policyuniverse>=1.1.0.0",
-        "google-api-python-client>=1.7.8",
+        "google-api-python-client>=2.0.0",
         "oauth2client>=4.1.3",
         "marshmallow>=3.0.0rc7",
         "oci>=2.71.0",
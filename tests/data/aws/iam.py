@@ -187,3 +187,131 @@ INSTACE = {
         },
     ],
 }
+
+GET_ACCOUNT_AUTHORIZATION_DETAILS = {
+    "UserDetailList": [
+        {
+            "UserName": "example-user-0",
+            "UserId": "AIDA00000000000000000",
+            "Path": "/",
+            "Arn": "arn:aws:iam::000000000000:user/example-user-0",
+            "CreateDate": datetime.datetime(2019, 1, 1, 0, 0, 1),
+            "UserPolicyList": [
+                {
+                    "PolicyName": "user-inline",
+                    # The IAM API returns URL-encoded policy documents.
+                    "PolicyDocument": (
+                        "%7B%22Version%22%3A%222012-10-17%22%2C%22Statement%22%3A%5B%7B%22Effect%22%3A%22Allow%22%2C"
+                        "%22Action%22%3A%22s3%3AGetObject%22%2C%22Resource%22%3A%22%2A%22%7D%5D%7D"
+                    ),
+                },
+            ],
+            "GroupList": ["example-group-0"],
+            "AttachedManagedPolicies": [],
+        },
+    ],
+    "GroupDetailList": [
+        {
+            "Path": "/",
+            "GroupName": "example-group-0",
+            "GroupId": "AGPA000000000000000000",
+            "Arn": "arn:aws:iam::000000000000:group/example-group-0",
+            "CreateDate": datetime.datetime(2019, 1, 1, 0, 0, 1),
+            "GroupPolicyList": [],
+            "AttachedManagedPolicies": [
+                {
+                    "PolicyName": "ReadOnlyAccess",
+                    "PolicyArn": "arn:aws:iam::aws:policy/ReadOnlyAccess",
+                },
+            ],
+        },
+    ],
+    "RoleDetailList": [
+        {
+            "Path": "/",
+            "RoleName": "example-role-0",
+            "RoleId": "AROA00000000000000000",
+            "Arn": "arn:aws:iam::000000000000:role/example-role-0",
+            "CreateDate": datetime.datetime(2019, 1, 1, 0, 0, 1),
+            "AssumeRolePolicyDocument": {
+                "Version": "2012-10-17",
+                "Statement": [
+                    {
+                        "Effect": "Allow",
+                        "Principal": {"Service": "ec2.amazonaws.com"},
+                        "Action": "sts:AssumeRole",
+                    },
+                ],
+            },
+            "RolePolicyList": [
+                {
+                    "PolicyName": "role-inline",
+                    "PolicyDocument": {
+                        "Version": "2012-10-17",
+                        "Statement": [{"Effect": "Deny", "Action": "iam:*", "Resource": "*"}],
+                    },
+                },
+            ],
+            "AttachedManagedPolicies": [
+                {
+                    "PolicyName": "ReadOnlyAccess",
+                    "PolicyArn": "arn:aws:iam::aws:policy/ReadOnlyAccess",
+                },
+            ],
+        },
+        {
+            "Path": "/",
+            "RoleName": "example-role-1",
+            "RoleId": "AROA00000000000000001",
+            "Arn": "arn:aws:iam::000000000000:role/example-role-1",
+            "CreateDate": datetime.datetime(2019, 1, 1, 0, 0, 1),
+            "AssumeRolePolicyDocument": {
+                "Version": "2012-10-17",
+                "Statement": [
+                    {
+                        "Effect": "Allow",
+                        "Principal": {"AWS": "arn:aws:iam::000000000000:role/example-role-0"},
+                        "Action": "sts:AssumeRole",
+                    },
+                ],
+            },
+            "RolePolicyList": [],
+            "AttachedManagedPolicies": [
+                {
+                    "PolicyName": "ReadOnlyAccess",
+                    "PolicyArn": "arn:aws:iam::aws:policy/ReadOnlyAccess",
+                },
+                {
+                    "PolicyName": "Missing",
+                    "PolicyArn": "arn:aws:iam::000000000000:policy/Missing",
+                },
+            ],
+        },
+    ],
+    "Policies": [
+        {
+            "PolicyName": "ReadOnlyAccess",
+            "PolicyId": "ANPA00000000000000000",
+            "Arn": "arn:aws:iam::aws:policy/ReadOnlyAccess",
+            "DefaultVersionId": "v2",
+            "PolicyVersionList": [
+                {
+                    "Document": {
+                        "Version": "2012-10-17",
+                        "Statement": [{"Effect": "Allow", "Action": "*", "Resource": "*"}],
+                    },
+                    "VersionId": "v1",
+                    "IsDefaultVersion": False,
+                },
+                {
+                    "Document": {
+                        "Version": "2012-10-17",
+                        "Statement": [{"Effect": "Allow", "Action": ["s3:Get*", "s3:List*"], "Resource": "*"}],
+                    },
+                    "VersionId": "v2",
+                    "IsDefaultVersion": True,
+                },
+            ],
+        },
+    ],
+}
@@ -11,6 +11,7 @@ from pytest import raises
 import cartography.config
 import cartography.intel.aws
 import cartography.util
+from cartography.intel.aws.util.common import AWSSyncOptions
 
 # These unit tests are a sanity check for start*() and sync*() functions.
 
@@ -38,6 +39,7 @@ def make_aws_sync_test_kwargs(neo4j_session: neo4j.Session, mock_boto3_session:
         'update_tag': TEST_UPDATE_TAG,
         'regions': TEST_REGIONS,
         'common_job_parameters': GRAPH_JOB_PARAMETERS,
+        'sync_options': AWSSyncOptions(),
     }
 
 
@@ -59,15 +61,15 @@ def test_sync_multiple_accounts(
     # Ensure we call _sync_one_account on all accounts in our list.
     mock_sync_one.assert_any_call(
         neo4j_session, mock_boto3_session(), '000000000000', TEST_UPDATE_TAG, GRAPH_JOB_PARAMETERS,
-        aws_requested_syncs=[],
+        aws_requested_syncs=[], neo4j_driver=None, sync_options=AWSSyncOptions(),
     )
     mock_sync_one.assert_any_call(
         neo4j_session, mock_boto3_session(), '000000000001', TEST_UPDATE_TAG, GRAPH_JOB_PARAMETERS,
-        aws_requested_syncs=[],
+        aws_requested_syncs=[], neo4j_driver=None, sync_options=AWSSyncOptions(),
     )
     mock_sync_one.assert_any_call(
         neo4j_session, mock_boto3_session(), '000000000002', TEST_UPDATE_TAG, GRAPH_JOB_PARAMETERS,
-        aws_requested_syncs=[],
+        aws_requested_syncs=[], neo4j_driver=None, sync_options=AWSSyncOptions(),
     )
 
     # Ensure _sync_one_account and _autodiscover is called once for each account
@@ -78,6 +80,64 @@ def test_sync_multiple_accounts(
     assert mock_cleanup.call_count == 1
 
 
+@mock.patch.object(cartography.intel.aws.organizations, 'sync', return_value=None)
+@mock.patch.object(cartography.intel.aws.organizations, 'load_accounts_public_access_block', return_value=None)
+@mock.patch('cartography.intel.aws.boto3.Session')
+@mock.patch.object(cartography.intel.aws, '_sync_one_account', return_value=None)
+@mock.patch.object(cartography.intel.aws, '_autodiscover_accounts', return_value=None)
+@mock.patch.object(cartography.intel.aws, 'run_cleanup_job', return_value=None)
+def test_sync_multiple_accounts_concurrently(
+    mock_cleanup, mock_autodiscover, mock_sync_one, mock_boto3_session, mock_public_access_block, mock_sync_orgs,
+):
+    neo4j_session = mock.MagicMock()
+    neo4j_driver = mock.MagicMock()
+    common_job_parameters = {'UPDATE_TAG': TEST_UPDATE_TAG}
+    sync_options = AWSSyncOptions(resource_max_workers=4)
+    cartography.intel.aws._sync_multiple_accounts(
+        neo4j_session, TEST_ACCOUNTS, TEST_UPDATE_TAG, common_job_parameters, False,
+        neo4j_driver=neo4j_driver, max_workers=2, sync_options=sync_options,
+    )
+
+    # Each account is synced with its own boto3 session, Neo4j session, and copy of the job parameters.
+    for profile_name in TEST_ACCOUNTS:
+        mock_boto3_session.assert_any_call(profile_name=profile_name)
+    assert neo4j_driver.session.call_count == len(TEST_ACCOUNTS)
+    synced_account_ids = sorted(call.args[2] for call in mock_sync_one.call_args_list)
+    assert synced_account_ids == sorted(TEST_ACCOUNTS.values())
+    for call in mock_sync_one.call_args_list:
+        assert call.args[4]['AWS_ID'] == call.args[2]
+        assert call.kwargs['sync_options'] == sync_options
+    assert 'AWS_ID' not in common_job_parameters
+
+    # The principals cleanup still runs once, on the caller's session, after every account is done.
+    mock_cleanup.assert_called_once_with(
+        'aws_post_ingestion_principals_cleanup.json', neo4j_session, common_job_parameters,
+    )
+
+
+@mock.patch.object(cartography.intel.aws.organizations, 'sync', return_value=None)
+@mock.patch.object(cartography.intel.aws.organizations, 'load_accounts_public_access_block', return_value=None)
+@mock.patch('cartography.intel.aws.boto3.Session')
+@mock.patch.object(cartography.intel.aws, '_sync_one_account', return_value=None)
+@mock.patch.object(cartography.intel.aws, '_autodiscover_accounts', return_value=None)
+@mock.patch.object(cartography.intel.aws, 'run_cleanup_job', return_value=None)
+def test_sync_multiple_accounts_concurrently_best_effort(
+    mock_cleanup, mock_autodiscover, mock_sync_one, mock_boto3_session, mock_public_access_block, mock_sync_orgs,
+):
+    mock_sync_one.side_effect = KeyError('foo')
+    with raises(Exception) as e:
+        cartography.intel.aws._sync_multiple_accounts(
+            mock.MagicMock(), TEST_ACCOUNTS, TEST_UPDATE_TAG, {'UPDATE_TAG': TEST_UPDATE_TAG}, True,
+            neo4j_driver=mock.MagicMock(), max_workers=2,
+        )
+    message = str(e.value)
+    assert message.count('KeyError') == len(TEST_ACCOUNTS)
+    for account_id in TEST_ACCOUNTS.values():
+        assert account_id in message
+    assert mock_sync_one.call_count == len(TEST_ACCOUNTS)
+    assert mock_cleanup.call_count == 0
+
+
 @mock.patch('cartography.intel.aws.boto3.Session')
 @mock.patch('cartography.intel.aws.organizations')
 @mock.patch.object(cartography.intel.aws, '_sync_multiple_accounts', return_value=True)
@@ -214,6 +274,56 @@ def test_sync_one_account_just_iam_rels_and_tags(
     assert mock_cleanup.call_count == 0
 
 
+@mock.patch.object(cartography.intel.aws, 'run_analysis_job', return_value=None)
+@mock.patch.object(cartography.intel.aws, 'merge_module_sync_metadata', return_value=None)
+def test_sync_one_account_concurrent_resource_syncs(mock_metadata, mock_run_analysis):
+    calls = []
+    resource_functions = {
+        sync_name: mock.MagicMock(side_effect=lambda sync_name=sync_name, **kwargs: calls.append(sync_name))
+        for sync_name in cartography.intel.aws.resources.RESOURCE_FUNCTIONS.keys()
+    }
+    neo4j_driver = mock.MagicMock()
+    common_job_parameters = {'UPDATE_TAG': TEST_UPDATE_TAG, 'aws_region': None}
+    requested_syncs = ['resourcegroupstaggingapi', 'permission_relationships', 'ssm', 'ec2:instance', 's3', 'iam']
+    with mock.patch.dict('cartography.intel.aws.RESOURCE_FUNCTIONS', resource_functions):
+        cartography.intel.aws._sync_one_account(
+            mock.MagicMock(), mock.MagicMock(), '1234', TEST_UPDATE_TAG, common_job_parameters,
+            regions=list(TEST_REGIONS), aws_requested_syncs=requested_syncs, neo4j_driver=neo4j_driver,
+            sync_options=AWSSyncOptions(resource_max_workers=4),
+        )
+
+    assert sorted(calls) == sorted(requested_syncs)
+    assert calls.index('ec2:instance') < calls.index('ssm')
+    assert calls[-2:] == ['permission_relationships', 'resourcegroupstaggingapi']
+    # Every resource sync gets its own Neo4j session
+    assert neo4j_driver.session.call_count == len(requested_syncs)
+
+
+@mock.patch.object(cartography.intel.aws, 'run_analysis_job', return_value=None)
+@mock.patch.object(cartography.intel.aws, 'merge_module_sync_metadata', return_value=None)
+def test_sync_one_account_concurrent_load_balancers_after_instances(mock_metadata, mock_run_analysis):
+    calls = []
+    resource_functions = {
+        sync_name: mock.MagicMock(side_effect=lambda sync_name=sync_name, **kwargs: calls.append(sync_name))
+        for sync_name in cartography.intel.aws.resources.RESOURCE_FUNCTIONS.keys()
+    }
+    common_job_parameters = {'UPDATE_TAG': TEST_UPDATE_TAG, 'aws_region': None}
+    # Load balancers MATCH on instances and subnets to build their EXPOSE and SUBNET edges.
+    requested_syncs = ['ec2:load_balancer', 'ec2:load_balancer_v2', 'ec2:subnet', 'ec2:vpc', 'ec2:instance']
+    with mock.patch.dict('cartography.intel.aws.RESOURCE_FUNCTIONS', resource_functions):
+        cartography.intel.aws._sync_one_account(
+            mock.MagicMock(), mock.MagicMock(), '1234', TEST_UPDATE_TAG, common_job_parameters,
+            regions=list(TEST_REGIONS), aws_requested_syncs=requested_syncs, neo4j_driver=mock.MagicMock(),
+            sync_options=AWSSyncOptions(resource_max_workers=4),
+        )
+
+    assert sorted(calls) == sorted(requested_syncs)
+    assert calls.index('ec2:instance') < calls.index('ec2:load_balancer')
+    assert calls.index('ec2:instance') < calls.index('ec2:load_balancer_v2')
+    assert calls.index('ec2:subnet') < calls.index('ec2:load_balancer')
+    assert calls.index('ec2:vpc') < calls.index('ec2:subnet')
+
+
 def test_standardize_aws_sync_kwargs():
     """
     Makes sure that we always use a standard set of parameter names for AWS syncs referenced in the
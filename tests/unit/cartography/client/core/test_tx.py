@@ -0,0 +1,32 @@
+from unittest import mock
+
+import pytest
+
+from cartography.client.core.tx import load_graph_data
+from cartography.client.core.tx import write_list_of_dicts_tx
+
+
+def test_load_graph_data_writes_one_transaction_per_batch():
+    session = mock.MagicMock()
+    data = [{'id': i} for i in range(5)]
+
+    load_graph_data(session, 'UNWIND {DictList} AS item MERGE (:A{id: item.id})', data, batch_size=2, UpdateTag=1)
+
+    assert session.write_transaction.call_count == 3
+    session.write_transaction.assert_any_call(
+        write_list_of_dicts_tx,
+        'UNWIND {DictList} AS item MERGE (:A{id: item.id})',
+        DictList=[{'id': 4}],
+        UpdateTag=1,
+    )
+
+
+def test_load_graph_data_empty_list():
+    session = mock.MagicMock()
+    load_graph_data(session, 'UNWIND {DictList} AS item RETURN item', [])
+    session.write_transaction.assert_not_called()
+
+
+def test_load_graph_data_rejects_bad_batch_size():
+    with pytest.raises(ValueError):
+        load_graph_data(mock.MagicMock(), 'UNWIND {DictList} AS item RETURN item', [{}], batch_size=0)
@@ -0,0 +1,197 @@
+import json
+from pathlib import Path
+from unittest import mock
+
+import neo4j.exceptions
+import pytest
+
+from cartography.graph.cleanup import AdaptiveBatchSize
+from cartography.graph.cleanup import parse_cleanup_query
+from cartography.graph.cleanup import run_batched_cleanup
+from cartography.graph.statement import GraphStatement
+
+JOBS_DIR = Path(__file__).parents[4] / 'cartography' / 'data' / 'jobs'
+
+
+def test_parse_cleanup_query_node():
+    query = parse_cleanup_query(
+        "MATCH (n:EC2Instance)<-[:RESOURCE]-(:AWSAccount{id: {AWS_ID}}) WHERE n.lastupdated <> {UPDATE_TAG} "
+        "WITH n LIMIT {LIMIT_SIZE} DETACH DELETE (n)",
+    )
+    assert query.variable == 'n'
+    assert query.detach
+    assert not query.is_relationship
+    assert query.collect_query == (
+        "MATCH (n:EC2Instance)<-[:RESOURCE]-(:AWSAccount{id: {AWS_ID}}) "
+        "WHERE id(n) > {LastItemId} AND (n.lastupdated <> {UPDATE_TAG}) "
+        "RETURN DISTINCT id(n) AS item_id ORDER BY item_id LIMIT {PageSize}"
+    )
+    # The delete matches the original pattern and WHERE again, not just the id.
+    assert query.delete_query == (
+        "UNWIND {ItemIds} AS item_id MATCH (n:EC2Instance)<-[:RESOURCE]-(:AWSAccount{id: {AWS_ID}}) "
+        "WHERE id(n) = item_id AND (n.lastupdated <> {UPDATE_TAG}) "
+        "WITH DISTINCT n DETACH DELETE n"
+    )
+
+
+def test_parse_cleanup_query_relationship():
+    query = parse_cleanup_query(
+        "MATCH (:Human)-[r:IDENTITY_GSUITE]->(:GSuiteUser) WHERE r.lastupdated <> {UPDATE_TAG} "
+        "WITH r LIMIT {LIMIT_SIZE} DELETE (r) return COUNT(*) as TotalCompleted",
+    )
+    assert query.is_relationship
+    assert not query.detach
+    assert query.delete_query == (
+        "UNWIND {ItemIds} AS item_id MATCH (:Human)-[r:IDENTITY_GSUITE]->(:GSuiteUser) "
+        "WHERE id(r) = item_id AND (r.lastupdated <> {UPDATE_TAG}) "
+        "WITH DISTINCT r DELETE r"
+    )
+
+
+def test_parse_cleanup_query_without_where():
+    query = parse_cleanup_query(
+        "MATCH (:AWSAccount{id: {AWS_ID}})-[:RESOURCE]->(:AWSLambda)-[r:STS_ASSUME_ROLE_ALLOW]->(:AWSPrincipal) "
+        "WITH r LIMIT {LIMIT_SIZE} DELETE (r)",
+    )
+    assert query.delete_query == (
+        "UNWIND {ItemIds} AS item_id "
+        "MATCH (:AWSAccount{id: {AWS_ID}})-[:RESOURCE]->(:AWSLambda)-[r:STS_ASSUME_ROLE_ALLOW]->(:AWSPrincipal) "
+        "WHERE id(r) = item_id "
+        "WITH DISTINCT r DELETE r"
+    )
+
+
+def test_parse_cleanup_query_other_statements():
+    assert parse_cleanup_query(
+        "MATCH (s:S3Bucket) WHERE EXISTS(s.anonymous_access) WITH s LIMIT {LIMIT_SIZE} REMOVE s.anonymous_access",
+    ) is None
+
+
+def test_parse_cleanup_query_shipped_jobs():
+    # Every shipped LIMIT-based delete statement should take the batched path.
+    parsed = 0
+    total = 0
+    for job_file in JOBS_DIR.glob('**/*.json'):
+        for statement in json.loads(job_file.read_text())['statements']:
+            query = statement['query']
+            if statement.get('iterative') and 'LIMIT_SIZE' in query and 'DELETE' in query.upper():
+                total += 1
+                parsed += parse_cleanup_query(query) is not None
+    assert total > 0
+    assert parsed == total
+
+
+def test_adaptive_batch_size():
+    size = AdaptiveBatchSize(1000, 100, 4000, target_seconds=2.0)
+    size.record(0.1)
+    assert size.size == 2000
+    size.record(0.1)
+    size.record(0.1)
+    assert size.size == 4000
+    size.record(1.5)
+    assert size.size == 4000
+    for _ in range(10):
+        size.record(5.0)
+    assert size.size == 100
+
+
+def _mock_session(item_ids):
+    session = mock.MagicMock()
+    session.read_transaction.return_value = item_ids
+    session.write_transaction.side_effect = lambda func, query, parameters: (len(parameters['ItemIds']), 0)
+    return session
+
+
+def test_run_batched_cleanup():
+    session = _mock_session(list(range(2500)))
+    query = parse_cleanup_query("MATCH (n:A) WHERE n.lastupdated <> {UPDATE_TAG} WITH n LIMIT {LIMIT_SIZE} DELETE n")
+
+    assert run_batched_cleanup(session, query, {'UPDATE_TAG': 1}) == (2500, 0)
+
+    session.read_transaction.assert_called_once()
+    batches = [c[0][2]['ItemIds'] for c in session.write_transaction.call_args_list]
+    # Fast transactions grow the batch size: 1000, then 2000 for the remaining 1500.
+    assert [len(b) for b in batches] == [1000, 1500]
+    assert batches[0][0] == 0 and batches[-1][-1] == 2499
+    assert session.write_transaction.call_args[0][2]['UPDATE_TAG'] == 1
+
+
+def test_run_batched_cleanup_pages_collect():
+    session = _mock_session(None)
+    pages = [list(range(0, 3)), list(range(3, 6)), [6]]
+    session.read_transaction.side_effect = lambda func, query, parameters: pages.pop(0)
+    query = parse_cleanup_query("MATCH (n:A) WHERE n.lastupdated <> {UPDATE_TAG} WITH n LIMIT {LIMIT_SIZE} DELETE n")
+
+    with mock.patch('cartography.graph.cleanup.CLEANUP_COLLECT_PAGE_SIZE', 3):
+        assert run_batched_cleanup(session, query, {'UPDATE_TAG': 1}) == (7, 0)
+
+    # Each page starts after the last id of the previous one.
+    last_item_ids = [c[0][2]['LastItemId'] for c in session.read_transaction.call_args_list]
+    assert last_item_ids == [-1, 2, 5]
+    assert session.read_transaction.call_args[0][2]['PageSize'] == 3
+    batches = [c[0][2]['ItemIds'] for c in session.write_transaction.call_args_list]
+    assert batches == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_graph_statement_uses_batched_cleanup():
+    session = _mock_session([1, 2, 3])
+    statement = GraphStatement(
+        "MATCH (n:A) WHERE n.lastupdated <> {UPDATE_TAG} WITH n LIMIT {LIMIT_SIZE} DETACH DELETE (n)",
+        {'UPDATE_TAG': 1},
+        iterative=True,
+        iterationsize=100,
+    )
+    statement.run(session)
+    session.read_transaction.assert_called_once()
+    assert session.write_transaction.call_count == 1
+
+
+def test_run_batched_cleanup_backs_off_on_transient_error():
+    session = _mock_session(list(range(1500)))
+    calls = []
+
+    def write_transaction(func, query, parameters):
+        calls.append(len(parameters['ItemIds']))
+        if len(calls) == 1:
+            raise neo4j.exceptions.TransientError('out of memory')
+        return len(parameters['ItemIds']), 0
+
+    session.write_transaction.side_effect = write_transaction
+    query = parse_cleanup_query("MATCH (n:A) WHERE n.lastupdated <> {UPDATE_TAG} WITH n LIMIT {LIMIT_SIZE} DELETE n")
+
+    assert run_batched_cleanup(session, query, {'UPDATE_TAG': 1}, min_batch_size=100) == (1500, 0)
+    # The first batch of 1000 failed and was retried as 500, then the size grew back.
+    assert calls == [1000, 500, 1000]
+
+
+def test_run_batched_cleanup_not_adaptive():
+    session = _mock_session(list(range(250)))
+    query = parse_cleanup_query("MATCH (n:A) WHERE n.lastupdated <> {UPDATE_TAG} WITH n LIMIT {LIMIT_SIZE} DELETE n")
+
+    assert run_batched_cleanup(session, query, {'UPDATE_TAG': 1}, min_batch_size=100, adaptive=False) == (250, 0)
+
+    batches = [c[0][2]['ItemIds'] for c in session.write_transaction.call_args_list]
+    assert [len(b) for b in batches] == [100, 100, 50]
+
+
+def test_run_batched_cleanup_not_adaptive_does_not_back_off():
+    session = _mock_session(list(range(250)))
+    session.write_transaction.side_effect = neo4j.exceptions.TransientError('out of memory')
+    query = parse_cleanup_query("MATCH (n:A) WHERE n.lastupdated <> {UPDATE_TAG} WITH n LIMIT {LIMIT_SIZE} DELETE n")
+
+    with pytest.raises(neo4j.exceptions.TransientError):
+        run_batched_cleanup(session, query, {'UPDATE_TAG': 1}, min_batch_size=100, adaptive=False)
+    assert session.write_transaction.call_count == 1
+
+
+def test_graph_statement_not_adaptive_uses_fixed_cleanup_batches():
+    session = _mock_session(list(range(2500)))
+    statement = GraphStatement.create_from_json({
+        'query': "MATCH (n:A) WHERE n.lastupdated <> {UPDATE_TAG} WITH n LIMIT {LIMIT_SIZE} DETACH DELETE (n)",
+        'iterative': True,
+        'iterationsize': 1000,
+        'adaptive': False,
+    })
+    statement.run(session)
+    batches = [c[0][2]['ItemIds'] for c in session.write_transaction.call_args_list]
+    assert [len(b) for b in batches] == [1000, 1000, 500]
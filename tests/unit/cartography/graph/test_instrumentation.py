@@ -0,0 +1,109 @@
+import json
+from unittest import mock
+
+from cartography.graph import instrumentation
+from cartography.graph.instrumentation import InstrumentedDriver
+from cartography.graph.instrumentation import query_shape_hash
+from cartography.graph.instrumentation import QueryRecorder
+
+QUERY = "UNWIND {DictList} AS item MERGE (n:A{id: item.id}) SET n.lastupdated = {UpdateTag}"
+
+
+def _result(records, nodes_created=0):
+    result = mock.MagicMock()
+    result.keys.return_value = ['n.id']
+    result.__iter__.side_effect = lambda: iter(records)
+    result.consume.return_value.counters = mock.Mock(
+        nodes_created=nodes_created, nodes_deleted=0, relationships_created=0, relationships_deleted=0,
+        properties_set=nodes_created, labels_added=0, labels_removed=0,
+    )
+    return result
+
+
+def _intel_function(code):
+    # Functions defined in an intel module are what queries are attributed to.
+    namespace = {'__name__': 'cartography.intel.fake'}
+    exec(code, namespace)
+    return namespace['run']
+
+
+def test_query_shape_hash_ignores_whitespace():
+    assert query_shape_hash("MATCH (n)\n    RETURN n") == query_shape_hash("MATCH (n) RETURN n")
+    assert query_shape_hash("MATCH (n) RETURN n") != query_shape_hash("MATCH (m) RETURN m")
+
+
+def test_instrumented_session_run():
+    recorder = QueryRecorder()
+    driver = mock.MagicMock()
+    driver.session.return_value.run.return_value = _result([{'n.id': 1}, {'n.id': 2}], nodes_created=3)
+    session = InstrumentedDriver(driver, recorder).session()
+
+    run = _intel_function("def run(session, query):\n    return session.run(query, DictList=[{}, {}, {}], UpdateTag=1)")
+    result = run(session, QUERY)
+
+    assert list(result) == [{'n.id': 1}, {'n.id': 2}]
+    assert result.consume().counters.nodes_created == 3
+    report = recorder.report()
+    assert list(report) == ['cartography.intel.fake']
+    query_stats, = report['cartography.intel.fake']['queries']
+    assert query_stats['shape'] == query_shape_hash(QUERY)
+    assert query_stats['count'] == 1
+    assert query_stats['rows'] == 3
+    assert query_stats['counters']['nodes_created'] == 3
+
+
+def test_instrumented_session_transaction():
+    recorder = QueryRecorder()
+    driver = mock.MagicMock()
+    tx = mock.MagicMock()
+    tx.run.return_value = _result([{'n.id': 1}], nodes_created=1)
+    driver.session.return_value.write_transaction.side_effect = lambda func, *args, **kwargs: func(tx, *args, **kwargs)
+    session = InstrumentedDriver(driver, recorder).session()
+
+    def write(tx, query, **kwargs):
+        return tx.run(query, kwargs).single()
+
+    assert session.write_transaction(write, QUERY, DictList=[{}], UpdateTag=1) == {'n.id': 1}
+    query_stats, = recorder.report()['tests.unit.cartography.graph.test_instrumentation']['queries']
+    assert query_stats['counters']['nodes_created'] == 1
+
+
+def test_query_recorder_report_ranks_slowest(tmp_path):
+    recorder = QueryRecorder()
+    recorder.record("MATCH (a) RETURN a", 'cartography.intel.a', 1.0, 1)
+    recorder.record("MATCH (b) RETURN b", 'cartography.intel.a', 3.0, 1)
+    recorder.record("MATCH (b) RETURN b", 'cartography.intel.a', 2.0, 1)
+    recorder.record("MATCH (c) RETURN c", 'cartography.intel.b', 10.0, 1)
+
+    report_file = tmp_path / 'report.json'
+    recorder.write_report(str(report_file), top=1)
+    report = json.loads(report_file.read_text())
+
+    assert list(report) == ['cartography.intel.b', 'cartography.intel.a']
+    assert report['cartography.intel.a']['total_seconds'] == 6.0
+    assert report['cartography.intel.a']['query_count'] == 3
+    assert report['cartography.intel.a']['queries'] == [
+        {
+            'shape': query_shape_hash("MATCH (b) RETURN b"),
+            'query': "MATCH (b) RETURN b",
+            'count': 2,
+            'total_seconds': 5.0,
+            'max_seconds': 3.0,
+            'rows': 2,
+            'counters': dict.fromkeys(instrumentation.COUNTERS, 0),
+        },
+    ]
+
+
+def test_query_recorder_sends_statsd_metrics(mocker):
+    stat_handler = mocker.patch.object(instrumentation, 'stat_handler')
+    stat_handler.is_enabled.return_value = True
+    counters = mock.Mock(**dict.fromkeys(instrumentation.COUNTERS, 0))
+    counters.nodes_created = 2
+
+    QueryRecorder().record(QUERY, 'cartography.intel.fake', 0.5, 2, counters)
+
+    prefix = f'cartography.intel.fake.{query_shape_hash(QUERY)}'
+    stat_handler.timing.assert_called_once_with(f'{prefix}.time', 500.0)
+    stat_handler.incr.assert_any_call(f'{prefix}.rows', 2)
+    stat_handler.incr.assert_any_call(f'{prefix}.nodes_created', 2)
@@ -0,0 +1,48 @@
+import threading
+
+import pytest
+
+from cartography.graph.pipeline import WritePipeline
+
+
+def test_write_pipeline_inline(mocker):
+    session = mocker.Mock()
+    calls = []
+
+    with WritePipeline(session) as pipeline:
+        pipeline.submit(lambda s, x: calls.append((s, x, threading.current_thread())), 1)
+        # With no queue the write has already happened.
+        assert calls == [(session, 1, threading.current_thread())]
+
+
+def test_write_pipeline_background_keeps_order(mocker):
+    session = mocker.Mock()
+    calls = []
+    main_thread = threading.current_thread()
+
+    def load(neo4j_session, item, tag=None):
+        assert neo4j_session is session
+        calls.append((item, tag, threading.current_thread() is main_thread))
+
+    with WritePipeline(session, queue_size=2) as pipeline:
+        for i in range(10):
+            pipeline.submit(load, i, tag='t')
+
+    assert calls == [(i, 't', False) for i in range(10)]
+
+
+def test_write_pipeline_background_raises_write_error(mocker):
+    calls = []
+
+    def load(neo4j_session, item):
+        if item == 1:
+            raise RuntimeError('boom')
+        calls.append(item)
+
+    with pytest.raises(RuntimeError):
+        with WritePipeline(mocker.Mock(), queue_size=1) as pipeline:
+            for i in range(50):
+                pipeline.submit(load, i)
+
+    # Writes after the failed one are skipped.
+    assert calls == [0]
@@ -0,0 +1,68 @@
+from unittest import mock
+
+import neo4j.exceptions
+import pytest
+
+from cartography.graph import statement as statement_module
+from cartography.graph.statement import GraphStatement
+
+REMOVE_QUERY = "MATCH (n:A) WHERE EXISTS(n.x) WITH n LIMIT {LIMIT_SIZE} REMOVE n.x return COUNT(*) as TotalCompleted"
+
+
+def _session(results):
+    """
+    Mock session whose write_transaction() returns (or raises) the given items in order, recording LIMIT_SIZE.
+    """
+    session = mock.MagicMock()
+    session.limit_sizes = []
+
+    def write_transaction(func):
+        session.limit_sizes.append(func.__self__.parameters['LIMIT_SIZE'])
+        item = results.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        result = mock.MagicMock()
+        result.consume.return_value.counters.contains_updates = item
+        return result
+
+    session.write_transaction.side_effect = write_transaction
+    return session
+
+
+def test_iterative_statement_grows_limit_size():
+    session = _session([True, True, True, False])
+    GraphStatement(REMOVE_QUERY, iterative=True, iterationsize=100).run(session)
+    assert session.limit_sizes == [100, 200, 400, 800]
+
+
+def test_iterative_statement_shrinks_slow_iterations(mocker):
+    mocker.patch.object(statement_module.time, 'monotonic', side_effect=[0, 10, 10, 20, 20, 20.1])
+    session = _session([True, True, False])
+    GraphStatement(REMOVE_QUERY, iterative=True, iterationsize=100).run(session)
+    assert session.limit_sizes == [100, 50, 25]
+
+
+def test_iterative_statement_backs_off_on_memory_error():
+    memory_error = neo4j.exceptions.TransientError('out of memory')
+    memory_error.code = 'Neo.TransientError.General.MemoryPoolOutOfMemoryError'
+    session = _session([memory_error, True, False])
+    GraphStatement(REMOVE_QUERY, iterative=True, iterationsize=100).run(session)
+    assert session.limit_sizes == [100, 50, 100]
+
+
+def test_iterative_statement_gives_up_at_min_size():
+    errors = [neo4j.exceptions.TransientError('deadlock') for _ in range(10)]
+    session = _session(errors)
+    with pytest.raises(neo4j.exceptions.TransientError):
+        GraphStatement(REMOVE_QUERY, iterative=True, iterationsize=40).run(session)
+    assert session.limit_sizes == [40, 20, 10]
+
+
+def test_iterative_statement_not_adaptive():
+    session = _session([True, True, False])
+    statement = GraphStatement.create_from_json(
+        {'query': REMOVE_QUERY, 'iterative': True, 'iterationsize': 100, 'adaptive': False},
+    )
+    statement.run(session)
+    assert session.limit_sizes == [100, 100, 100]
+    assert not statement.as_dict()['adaptive']
@@ -1,4 +1,8 @@
+from unittest import mock
+
 from cartography.intel.aws import iam
+from cartography.intel.aws.util.common import AWSSyncOptions
+from tests.data.aws.iam import GET_ACCOUNT_AUTHORIZATION_DETAILS
 
 SINGLE_STATEMENT = {
     "Resource": "*",
@@ -30,3 +34,133 @@ def test__parse_principal_entries():
     assert principal_entries[1] == ("Service", "test-service-1")
     assert principal_entries[2] == ("Service", "test-service-2")
     assert principal_entries[3] == ("Federated", "test-provider-1")
+
+
+def test_transform_managed_policy_documents():
+    statements = iam.transform_managed_policy_documents(GET_ACCOUNT_AUTHORIZATION_DETAILS['Policies'])
+    assert statements == {
+        "arn:aws:iam::aws:policy/ReadOnlyAccess": [
+            {"Effect": "Allow", "Action": ["s3:Get*", "s3:List*"], "Resource": "*"},
+        ],
+    }
+
+
+def test_transform_authorization_details_policies():
+    managed_policy_statements = iam.transform_managed_policy_documents(GET_ACCOUNT_AUTHORIZATION_DETAILS['Policies'])
+    inline, managed = iam.transform_authorization_details_policies(
+        GET_ACCOUNT_AUTHORIZATION_DETAILS['RoleDetailList'], 'RolePolicyList', managed_policy_statements,
+    )
+    role_0 = "arn:aws:iam::000000000000:role/example-role-0"
+    role_1 = "arn:aws:iam::000000000000:role/example-role-1"
+    assert inline == {
+        role_0: {"role-inline": [{"Effect": "Deny", "Action": "iam:*", "Resource": "*"}]},
+        role_1: {},
+    }
+    # The policy without a document is skipped.
+    assert list(managed[role_0]) == ["ReadOnlyAccess"]
+    assert list(managed[role_1]) == ["ReadOnlyAccess"]
+
+    # Each role gets its own copy of the shared managed policy statements.
+    iam.transform_policy_data(managed, iam.PolicyType.managed.value)
+    assert managed[role_0]["ReadOnlyAccess"][0]["id"] == f"{role_0}/managed_policy/ReadOnlyAccess/statement/1"
+    assert managed[role_1]["ReadOnlyAccess"][0]["id"] == f"{role_1}/managed_policy/ReadOnlyAccess/statement/1"
+    assert "id" not in managed_policy_statements["arn:aws:iam::aws:policy/ReadOnlyAccess"][0]
+
+
+def test_transform_authorization_details_policies_url_encoded_document():
+    inline, managed = iam.transform_authorization_details_policies(
+        GET_ACCOUNT_AUTHORIZATION_DETAILS['UserDetailList'], 'UserPolicyList', {},
+    )
+    assert inline == {
+        "arn:aws:iam::000000000000:user/example-user-0": {
+            "user-inline": [{"Effect": "Allow", "Action": "s3:GetObject", "Resource": "*"}],
+        },
+    }
+    assert managed == {"arn:aws:iam::000000000000:user/example-user-0": {}}
+
+
+def test_load_policy_data_batches_policies_and_statements():
+    session = mock.MagicMock()
+    policy_map = {
+        "arn:aws:iam::000000000000:role/example-role-0": {
+            "policy-a": [{"Effect": "Allow", "Action": "*", "Resource": "*"}],
+            "policy-b": {"Effect": "Deny", "Action": "iam:*", "Resource": "*"},
+        },
+        "arn:aws:iam::000000000000:role/example-role-1": {
+            "policy-a": [
+                {"Effect": "Allow", "Action": "s3:*", "Resource": "*"},
+                {"Effect": "Allow", "Action": "ec2:*", "Resource": "*"},
+            ],
+        },
+    }
+    iam.transform_policy_data(policy_map, iam.PolicyType.inline.value)
+    iam.load_policy_data(session, policy_map, iam.PolicyType.inline.value, 1)
+
+    # One transaction for the policies and one for the statements.
+    assert session.write_transaction.call_count == 2
+    policies = session.write_transaction.call_args_list[0][1]['DictList']
+    statements = session.write_transaction.call_args_list[1][1]['DictList']
+    assert [p['PolicyId'] for p in policies] == [
+        "arn:aws:iam::000000000000:role/example-role-0/inline_policy/policy-a",
+        "arn:aws:iam::000000000000:role/example-role-0/inline_policy/policy-b",
+        "arn:aws:iam::000000000000:role/example-role-1/inline_policy/policy-a",
+    ]
+    assert policies[0]['PrincipalArn'] == "arn:aws:iam::000000000000:role/example-role-0"
+    assert [(s['PolicyId'], s['id']) for s in statements] == [
+        (policies[0]['PolicyId'], policies[0]['PolicyId'] + "/statement/1"),
+        (policies[1]['PolicyId'], policies[1]['PolicyId'] + "/statement/1"),
+        (policies[2]['PolicyId'], policies[2]['PolicyId'] + "/statement/1"),
+        (policies[2]['PolicyId'], policies[2]['PolicyId'] + "/statement/2"),
+    ]
+
+
+def test_calculate_assumerole_relationships():
+    policies_by_source = {
+        "arn:aws:iam::000000000000:role/source-0": {
+            "assume-some": [{
+                "effect": "Allow", "action": ["sts:AssumeRole"], "resource": ["arn:aws:iam::000000000000:role/app-*"],
+            }],
+        },
+        "arn:aws:iam::000000000000:user/source-1": {
+            "allow-all": [{"effect": "Allow", "action": ["*"], "resource": ["*"]}],
+            "deny-admin": [{
+                "effect": "Deny", "action": ["sts:*"], "resource": ["arn:aws:iam::000000000000:role/admin"],
+            }],
+        },
+    }
+    targets_by_source = {
+        "arn:aws:iam::000000000000:role/source-0": [
+            "arn:aws:iam::000000000000:role/app-0", "arn:aws:iam::000000000000:role/admin",
+        ],
+        "arn:aws:iam::000000000000:user/source-1": [
+            "arn:aws:iam::000000000000:role/app-0", "arn:aws:iam::000000000000:role/admin",
+        ],
+        # No policies, so it cannot assume anything.
+        "arn:aws:iam::000000000000:role/source-2": ["arn:aws:iam::000000000000:role/app-0"],
+    }
+    assert iam.calculate_assumerole_relationships(policies_by_source, targets_by_source) == [
+        {"SourceArn": "arn:aws:iam::000000000000:role/source-0", "TargetArn": "arn:aws:iam::000000000000:role/app-0"},
+        {"SourceArn": "arn:aws:iam::000000000000:user/source-1", "TargetArn": "arn:aws:iam::000000000000:role/app-0"},
+    ]
+
+
+@mock.patch.object(iam, 'merge_module_sync_metadata')
+@mock.patch.object(iam, 'sync_user_access_keys')
+@mock.patch.object(iam, 'sync_assumerole_relationships')
+@mock.patch.object(iam, 'sync_group_memberships')
+@mock.patch.object(iam, 'run_cleanup_job')
+@mock.patch.object(iam, 'load_policy_data')
+@mock.patch.object(iam, 'load_roles')
+@mock.patch.object(iam, 'load_groups')
+@mock.patch.object(iam, 'load_users')
+@mock.patch.object(iam, 'get_user_list_data', return_value={'Users': []})
+@mock.patch.object(iam, 'get_account_authorization_details', return_value=GET_ACCOUNT_AUTHORIZATION_DETAILS)
+def test_sync_bulk_fetch_transforms_managed_policies_once(mock_get_details, *mocks):
+    with mock.patch.object(
+        iam, 'transform_managed_policy_documents', wraps=iam.transform_managed_policy_documents,
+    ) as mock_transform:
+        iam.sync(
+            mock.MagicMock(), mock.MagicMock(), ['us-east-1'], '1234', 1,
+            {'UPDATE_TAG': 1, 'AWS_ID': '1234'}, AWSSyncOptions(iam_bulk_fetch=True),
+        )
+    mock_transform.assert_called_once_with(GET_ACCOUNT_AUTHORIZATION_DETAILS['Policies'])
@@ -1,3 +1,6 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
 from cartography.intel.aws import permission_relationships
 
 
@@ -464,3 +467,82 @@ def test_permissions_list():
         assert False
     except ValueError:
         assert True
+
+
+def test_resource_arn_index_match_clause():
+    arns = [
+        "arn:aws:s3:::testbucket", "arn:aws:s3:::TestBucket/key", "arn:aws:s3:::other", "arn:aws:s3:::testbucket",
+    ]
+    index = permission_relationships.ResourceArnIndex(arns)
+    assert index.match_clause("arn:aws:s3:::testbucket") == {0, 3}
+    assert index.match_clause("arn:aws:s3:::testbucket*") == {0, 1, 3}
+    assert index.match_clause("arn:aws:s3:::????bucket/*") == {1}
+    assert index.match_clause("*") == {0, 1, 2, 3}
+    assert index.match_clause("arn:aws:s3:::nothing*") == set()
+
+
+def test_calculate_permission_relationships_matches_principal_allowed_on_resource():
+    principals = {
+        "admin": {
+            "AdminAccess": [{"action": ["*"], "resource": ["*"], "effect": "Allow"}],
+        },
+        "reader": {
+            "Read": [{"action": ["s3:Get*"], "resource": ["arn:aws:s3:::test*"], "effect": "Allow"}],
+            "DenyOther": [{"action": ["s3:*"], "resource": ["arn:aws:s3:::testother"], "effect": "Deny"}],
+        },
+        "notresource": {
+            "AllButSecret": [{
+                "action": ["s3:GetObject"], "resource": ["*"], "notresource": ["arn:aws:s3:::*secret"],
+                "effect": "Allow",
+            }],
+        },
+        "unrelated": {
+            "Ec2": [{"action": ["ec2:*"], "resource": ["*"], "effect": "Allow"}],
+        },
+        "ordered": {
+            # The first permission that this policy decides wins, so the later deny does not apply.
+            "AllowThenDeny": [
+                {"action": ["s3:GetObject"], "resource": ["*"], "effect": "Allow"},
+                {"action": ["s3:PutObject"], "resource": ["*"], "effect": "Deny"},
+            ],
+        },
+    }
+    resource_arns = [
+        "arn:aws:s3:::testbucket", "arn:aws:s3:::testother", "arn:aws:s3:::mysecret", "arn:aws:s3:::TESTBUCKET",
+    ]
+    permissions = ["S3:GetObject", "S3:PutObject"]
+    for policies in principals.values():
+        for statements in policies.values():
+            permission_relationships.compile_statement(statements)
+
+    expected = [
+        {"principal_arn": principal_arn, "resource_arn": resource_arn}
+        for resource_arn in resource_arns
+        for principal_arn, policies in principals.items()
+        if permission_relationships.principal_allowed_on_resource(policies, resource_arn, permissions)
+    ]
+    assert len(expected) == 13
+    assert permission_relationships.calculate_permission_relationships(
+        principals, resource_arns, permissions,
+    ) == expected
+
+
+def test_calculate_permission_relationships_in_parallel():
+    principals = {
+        f"principal{i}": {
+            "Read": permission_relationships.compile_statement([{
+                "action": ["s3:Get*"], "resource": [f"arn:aws:s3:::bucket{i % 3}*"], "effect": "Allow",
+            }]),
+        }
+        for i in range(10)
+    }
+    resource_arns = [f"arn:aws:s3:::bucket{i % 4}/object{i}" for i in range(25)]
+    permissions = ["S3:GetObject"]
+    expected = permission_relationships.calculate_permission_relationships(principals, resource_arns, permissions)
+    assert expected
+
+    with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn')) as executor:
+        for shard_count in (1, 2, 3, 50):
+            assert permission_relationships.calculate_permission_relationships_in_parallel(
+                executor, shard_count, principals, resource_arns, permissions,
+            ) == expected
@@ -0,0 +1,44 @@
+import inspect
+import itertools
+import re
+from typing import Dict
+from typing import Set
+from typing import Tuple
+
+from cartography.intel.aws.resources import RESOURCE_DEPENDENCIES
+from cartography.intel.aws.resources import RESOURCE_FUNCTIONS
+from cartography.util import _resolve_dependencies
+
+# Matches e.g. `MERGE (instance:Instance:EC2Instance{id: ...` and captures the labels and the key property.
+MERGE_NODE_RE = re.compile(r'MERGE\s*\(\s*\w*((?:\s*:\s*\w+)+)\s*\{\s*(\w+)\s*:')
+
+
+def _merged_node_keys() -> Dict[Tuple[str, str], Set[str]]:
+    """
+    Return the names of the syncs that MERGE each (label, key property), read from the sync modules' queries.
+    """
+    writers: Dict[Tuple[str, str], Set[str]] = {}
+    for sync_name, func in RESOURCE_FUNCTIONS.items():
+        with open(inspect.getsourcefile(inspect.unwrap(func))) as source_file:
+            source = source_file.read()
+        for labels, key in MERGE_NODE_RE.findall(source):
+            for label in re.findall(r'\w+', labels):
+                writers.setdefault((label, key), set()).add(sync_name)
+    return writers
+
+
+def test_resource_dependencies_are_acyclic():
+    _resolve_dependencies(RESOURCE_FUNCTIONS.keys(), RESOURCE_DEPENDENCIES)
+
+
+def test_syncs_merging_the_same_node_key_are_ordered():
+    writers = _merged_node_keys()
+    assert ('EC2Instance', 'id') in writers
+
+    unordered = []
+    for node_key, sync_names in sorted(writers.items()):
+        for first, second in itertools.combinations(sorted(sync_names), 2):
+            ordered = first in RESOURCE_DEPENDENCIES.get(second, []) or second in RESOURCE_DEPENDENCIES.get(first, [])
+            if not ordered:
+                unordered.append((node_key, first, second))
+    assert unordered == []
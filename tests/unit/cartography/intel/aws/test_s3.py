@@ -0,0 +1,38 @@
+from unittest import mock
+
+from cartography.intel.aws import s3
+
+
+def _client(region):
+    client = mock.MagicMock()
+    client.get_bucket_acl.side_effect = lambda Bucket: {'Bucket': Bucket, 'Region': region}
+    client.get_bucket_location.side_effect = lambda Bucket: {
+        'LocationConstraint': None if Bucket.endswith('-0') else 'eu-west-1',
+    }
+    return client
+
+
+def test_get_s3_bucket_details_keeps_bucket_order():
+    boto3_session = mock.MagicMock()
+    boto3_session.client.side_effect = lambda service, region: _client(region)
+    buckets = [{'Name': f'bucket-{i}', 'Region': 'us-east-1' if i % 2 else 'eu-west-1'} for i in range(20)]
+
+    for max_workers in (1, 4):
+        boto3_session.client.reset_mock()
+        details = list(s3.get_s3_bucket_details(boto3_session, {'Buckets': buckets}, max_workers))
+
+        assert [d[0] for d in details] == [b['Name'] for b in buckets]
+        assert [d[1] for d in details] == [{'Bucket': b['Name'], 'Region': b['Region']} for b in buckets]
+        # One client per region.
+        assert boto3_session.client.call_count == 2
+
+
+def test_get_s3_bucket_list_sets_regions():
+    boto3_session = mock.MagicMock()
+    client = _client(None)
+    client.list_buckets.return_value = {'Buckets': [{'Name': f'bucket-{i}'} for i in range(5)]}
+    boto3_session.client.return_value = client
+
+    buckets = s3.get_s3_bucket_list(boto3_session, max_workers=3)
+
+    assert [b['Region'] for b in buckets['Buckets']] == ['us-east-1'] + ['eu-west-1'] * 4
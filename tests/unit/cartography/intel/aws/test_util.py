@@ -1,5 +1,9 @@
+import threading
+import time
+
 import pytest
 
+from cartography.intel.aws.util.common import aws_fetch_regions
 from cartography.intel.aws.util.common import parse_and_validate_aws_requested_syncs
 
 
@@ -17,3 +21,46 @@ def test_parse_and_validate_requested_syncs():
     absolute_garbage = '#@$@#RDFFHKjsdfkjsd,KDFJHW#@,'
     with pytest.raises(ValueError):
         parse_and_validate_aws_requested_syncs(absolute_garbage)
+
+
+def test_aws_fetch_regions_serial(mocker):
+    boto3_session = mocker.Mock()
+    get_func = mocker.Mock(side_effect=lambda session, region, suffix: f'{region}{suffix}')
+
+    results = aws_fetch_regions(get_func, boto3_session, ['us-east-1', 'us-west-2'], '-data')
+
+    # Serial mode is lazy: each region is fetched only when the caller asks for it.
+    assert get_func.call_count == 0
+    assert list(results) == [('us-east-1', 'us-east-1-data'), ('us-west-2', 'us-west-2-data')]
+    get_func.assert_any_call(boto3_session, 'us-east-1', '-data')
+
+
+def test_aws_fetch_regions_concurrent_keeps_region_order(mocker):
+    regions = ['us-east-1', 'us-east-2', 'us-west-1', 'us-west-2', 'eu-west-1']
+    thread_ids = set()
+    lock = threading.Lock()
+
+    def get_func(boto3_session, region):
+        boto3_session.client('ec2', region_name=region)
+        with lock:
+            thread_ids.add(threading.get_ident())
+        # Make earlier regions finish last
+        time.sleep(0.01 * (len(regions) - regions.index(region)))
+        return [region]
+
+    boto3_session = mocker.Mock()
+    results = list(aws_fetch_regions(get_func, boto3_session, regions, max_workers=5))
+
+    assert results == [(region, [region]) for region in regions]
+    assert len(thread_ids) > 1
+    assert boto3_session.client.call_count == len(regions)
+
+
+def test_aws_fetch_regions_concurrent_raises(mocker):
+    def get_func(boto3_session, region):
+        if region == 'us-west-2':
+            raise ValueError(region)
+        return [region]
+
+    with pytest.raises(ValueError):
+        list(aws_fetch_regions(get_func, mocker.Mock(), ['us-east-1', 'us-west-2'], max_workers=2))
@@ -0,0 +1,134 @@
+import copy
+import gzip
+import hashlib
+import io
+import json
+from unittest import mock
+
+import pytest
+
+from cartography.intel.cve import feed
+from tests.data.cve.feed import GET_CVE_SYNC_METADATA
+
+
+def _feed_with_items(count):
+    data = copy.deepcopy(GET_CVE_SYNC_METADATA)
+    item = data['CVE_Items'][0]
+    data['CVE_Items'] = []
+    for i in range(count):
+        cve = copy.deepcopy(item)
+        cve['cve']['CVE_data_meta']['ID'] = f'CVE-1999-{i:04}'
+        data['CVE_Items'].append(cve)
+    return data
+
+
+@pytest.mark.parametrize('read_size', [1, 7, 1024 * 1024])
+def test_iter_json_array(mocker, read_size):
+    mocker.patch.object(feed, '_READ_SIZE', read_size)
+    data = _feed_with_items(3)
+    for text in (json.dumps(data), json.dumps(data, indent=4)):
+        assert list(feed.iter_json_array(io.StringIO(text), 'CVE_Items')) == data['CVE_Items']
+
+    assert list(feed.iter_json_array(io.StringIO('{"CVE_Items" : [ ]}'), 'CVE_Items')) == []
+
+
+def test_iter_json_array_errors():
+    with pytest.raises(ValueError):
+        list(feed.iter_json_array(io.StringIO('{"Other": []}'), 'CVE_Items'))
+    with pytest.raises(ValueError):
+        list(feed.iter_json_array(io.StringIO('{"CVE_Items": [{"a": 1}, {"b": '), 'CVE_Items'))
+
+
+def test_iter_cves(mocker):
+    data = _feed_with_items(2)
+    response = mock.MagicMock()
+    response.raw = io.BytesIO(gzip.compress(json.dumps(data).encode('utf-8')))
+    get = mocker.patch.object(feed.requests, 'get')
+    get.return_value.__enter__.return_value = response
+
+    assert list(feed.iter_cves('https://nvd.example.com', '2002')) == data['CVE_Items']
+    get.assert_called_once_with('https://nvd.example.com/nvdcve-1.1-2002.json.gz', stream=True)
+
+
+def test_load_cve_items_batches():
+    session = mock.MagicMock()
+    cves = _feed_with_items(5)['CVE_Items']
+
+    assert feed.load_cve_items(session, iter(cves), 1, batch_size=2) == 5
+
+    batches = [c[1]['cves'] for c in session.write_transaction.call_args_list]
+    assert [len(b) for b in batches] == [2, 2, 1]
+    assert batches[0][0]['cve']['parsed_problem_types'] == ['CWE-20']
+    assert batches[0][0]['cve']['parsed_desc']['en'].startswith('ip_input.c')
+
+
+def _mock_feed_download(mocker, data):
+    content = json.dumps(data).encode('utf-8')
+    compressed = gzip.compress(content)
+    response = mock.MagicMock()
+    response.raw.stream.side_effect = lambda size, decode_content: [compressed[:10], compressed[10:]]
+    get = mocker.patch.object(feed.requests, 'get')
+    get.return_value.__enter__.return_value = response
+    return hashlib.sha256(content).hexdigest().upper(), get
+
+
+def test_download_cve_feed(mocker, tmp_path):
+    data = _feed_with_items(2)
+    sha256, get = _mock_feed_download(mocker, data)
+
+    assert feed.download_cve_feed('https://nvd.example.com', 'recent', str(tmp_path)) == (
+        sha256, str(tmp_path / f'nvdcve-1.1-recent.{sha256}.json.gz'),
+    )
+    assert list(feed.iter_cves_from_file(str(tmp_path / f'nvdcve-1.1-recent.{sha256}.json.gz'))) == data['CVE_Items']
+    assert [p.name for p in tmp_path.iterdir()] == [f'nvdcve-1.1-recent.{sha256}.json.gz']
+
+
+def test_sync_cve_feed_with_cache(mocker, tmp_path):
+    data = _feed_with_items(2)
+    sha256, get = _mock_feed_download(mocker, data)
+    (tmp_path / 'nvdcve-1.1-recent.OLD.json.gz').write_bytes(b'')
+    mocker.patch.object(feed, 'get_cve_feed_meta', return_value={'sha256': sha256.lower()})
+    hashes = mocker.patch.object(feed, 'get_cve_feed_hashes', return_value={'recent': 'OLD'})
+    set_hash = mocker.patch.object(feed, 'set_cve_feed_hash')
+    load = mocker.patch.object(feed, 'load_cve_items', side_effect=lambda session, cves, tag: len(list(cves)))
+    session = mock.MagicMock()
+
+    # A new feed is downloaded, loaded, and replaces the old cached archive.
+    feed.sync_cve_feed(session, 'https://nvd.example.com', 'recent', 1, str(tmp_path))
+    assert get.call_count == 1
+    assert load.call_count == 1
+    set_hash.assert_called_once_with(session, 'recent', sha256, 1)
+    assert [p.name for p in tmp_path.iterdir()] == [f'nvdcve-1.1-recent.{sha256}.json.gz']
+
+    # An unchanged feed is neither downloaded nor loaded.
+    hashes.return_value = {'recent': sha256}
+    feed.sync_cve_feed(session, 'https://nvd.example.com', 'recent', 2, str(tmp_path))
+    assert get.call_count == 1
+    assert load.call_count == 1
+
+    # If the graph is missing the feed, it is loaded from the cache without downloading it.
+    hashes.return_value = {}
+    feed.sync_cve_feed(session, 'https://nvd.example.com', 'recent', 3, str(tmp_path))
+    assert get.call_count == 1
+    assert load.call_count == 2
+
+
+def test_sync_cve_feed_offline(mocker, tmp_path):
+    data = _feed_with_items(2)
+    sha256, get = _mock_feed_download(mocker, data)
+    feed.download_cve_feed('https://nvd.example.com', '2002', str(tmp_path))
+    mocker.patch.object(
+        feed, 'get_cve_feed_meta', side_effect=feed.requests.exceptions.ConnectionError('offline'),
+    )
+    mocker.patch.object(feed, 'get_cve_feed_hashes', return_value={})
+    set_hash = mocker.patch.object(feed, 'set_cve_feed_hash')
+    loaded = []
+    mocker.patch.object(feed, 'load_cve_items', side_effect=lambda session, cves, tag: loaded.extend(cves))
+
+    feed.sync_cve_feed(mock.MagicMock(), 'https://nvd.example.com', '2002', 1, str(tmp_path))
+    assert loaded == data['CVE_Items']
+    assert set_hash.call_args[0][2] == sha256
+
+    # Without a cached archive the error is raised.
+    with pytest.raises(feed.requests.exceptions.ConnectionError):
+        feed.sync_cve_feed(mock.MagicMock(), 'https://nvd.example.com', '2003', 1, str(tmp_path))
@@ -1,3 +1,9 @@
+import json
+from unittest import mock
+
+import pytest
+from googleapiclient.discovery import HttpError
+
 import cartography.intel.gcp.compute
 from tests.data.gcp.compute import LIST_FIREWALLS_RESPONSE
 from tests.data.gcp.compute import VPC_RESPONSE
@@ -63,3 +69,112 @@ def test_transform_gcp_firewall():
     assert sample_fw_icmp_rule['fromport'] is None
     assert sample_fw_icmp_rule['toport'] is None
     assert sample_fw_icmp_rule['protocol'] == 'icmp'
+
+
+def _http_error(reason):
+    content = json.dumps({'error': {'errors': [{'reason': reason}]}}).encode('utf-8')
+    return HttpError(mock.Mock(status=403), content)
+
+
+def _mock_batching_compute():
+    """
+    Mock compute resource whose batch requests call back with the result of executing each added request.
+    """
+    compute = mock.MagicMock()
+
+    def new_batch_http_request(callback):
+        batch = mock.MagicMock()
+        added = []
+        batch.add.side_effect = lambda request, request_id: added.append((request_id, request))
+        batch.execute.side_effect = lambda: [
+            callback(request_id, request.execute(), None) for request_id, request in added
+        ]
+        return batch
+
+    compute.new_batch_http_request.side_effect = new_batch_http_request
+    return compute
+
+
+def _request(response):
+    request = mock.MagicMock()
+    request.execute.return_value = response
+    return request
+
+
+def test_get_gcp_instance_responses_aggregated():
+    compute = mock.MagicMock()
+    instances = compute.instances.return_value
+    first_page = {
+        'items': {
+            'zones/us-east1-b': {'instances': [{'name': 'a'}]},
+            'zones/us-east1-c': {'warning': {'code': 'NO_RESULTS_ON_PAGE'}},
+            'zones/europe-west2-a': {'instances': [{'name': 'not-enabled'}]},
+        },
+        'nextPageToken': 'token',
+    }
+    second_page = {'items': {'zones/us-east1-b': {'instances': [{'name': 'b'}]}}}
+    instances.aggregatedList.return_value = _request(first_page)
+    instances.aggregatedList_next.side_effect = [_request(second_page), None]
+
+    responses = cartography.intel.gcp.compute.get_gcp_instance_responses(
+        'project-abc', [{'name': 'us-east1-b'}, {'name': 'us-east1-c'}], compute,
+    )
+
+    assert responses == [
+        {'id': 'projects/project-abc/zones/us-east1-b/instances', 'items': [{'name': 'a'}, {'name': 'b'}]},
+        {'id': 'projects/project-abc/zones/us-east1-c/instances', 'items': []},
+    ]
+    instances.aggregatedList.assert_called_once_with(project='project-abc')
+    instances.list.assert_not_called()
+    instance_list = cartography.intel.gcp.compute.transform_gcp_instances(responses)
+    assert [(i['partial_uri'], i['zone_name']) for i in instance_list] == [
+        ('projects/project-abc/zones/us-east1-b/instances/a', 'us-east1-b'),
+        ('projects/project-abc/zones/us-east1-b/instances/b', 'us-east1-b'),
+    ]
+
+
+def test_get_gcp_subnet_responses_falls_back_to_batched_lists():
+    compute = _mock_batching_compute()
+    subnetworks = compute.subnetworks.return_value
+    subnetworks.aggregatedList.return_value.execute.side_effect = _http_error('forbidden')
+    east = 'projects/p/regions/us-east1/subnetworks'
+    pages = {
+        ('us-east1', None): {'id': east, 'items': [{'name': 'a'}], 'nextPageToken': 't'},
+        ('us-east1', 't'): {'id': east, 'items': [{'name': 'b'}]},
+        ('us-west1', None): {'id': 'projects/p/regions/us-west1/subnetworks', 'items': [{'name': 'c'}]},
+    }
+    subnetworks.list.side_effect = lambda project, region: _request(pages[(region, None)])
+    subnetworks.list_next.side_effect = lambda request, response: (
+        _request(pages[('us-east1', 't')]) if response.get('nextPageToken') else None
+    )
+
+    responses = cartography.intel.gcp.compute.get_gcp_subnet_responses('p', ['us-east1', 'us-west1'], compute)
+
+    assert responses == [
+        {'id': 'projects/p/regions/us-east1/subnetworks', 'items': [{'name': 'a'}, {'name': 'b'}]},
+        {'id': 'projects/p/regions/us-west1/subnetworks', 'items': [{'name': 'c'}]},
+    ]
+    # Both regions were listed in one batch request, and the second page of us-east1 in another.
+    assert compute.new_batch_http_request.call_count == 2
+
+
+def test_get_gcp_regional_forwarding_rule_responses_raises_other_errors():
+    compute = _mock_batching_compute()
+    compute.forwardingRules.return_value.aggregatedList.return_value.execute.side_effect = _http_error('backendError')
+
+    with pytest.raises(HttpError):
+        cartography.intel.gcp.compute.get_gcp_regional_forwarding_rule_responses('p', ['us-east1'], compute)
+    compute.forwardingRules.return_value.list.assert_not_called()
+
+
+def test_is_shared_vpc_host_project():
+    compute = mock.MagicMock()
+    compute.projects.return_value.get.return_value.execute.return_value = {'xpnProjectStatus': 'HOST'}
+    assert cartography.intel.gcp.compute.is_shared_vpc_host_project('p', compute)
+    compute.projects.return_value.get.assert_called_once_with(project='p', fields='xpnProjectStatus')
+
+    compute.projects.return_value.get.return_value.execute.return_value = {}
+    assert not cartography.intel.gcp.compute.is_shared_vpc_host_project('p', compute)
+
+    compute.projects.return_value.get.return_value.execute.side_effect = _http_error('forbidden')
+    assert not cartography.intel.gcp.compute.is_shared_vpc_host_project('p', compute)
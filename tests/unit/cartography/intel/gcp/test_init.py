@@ -0,0 +1,104 @@
+import threading
+from unittest import mock
+
+import pytest
+from google.auth.credentials import AnonymousCredentials
+
+import cartography.intel.gcp
+
+PROJECTS = [{'projectId': f'project-{i}'} for i in range(6)]
+
+
+def test_build_resource_reuses_discovery_document():
+    credentials = AnonymousCredentials()
+    first = cartography.intel.gcp._get_compute_resource(credentials)
+    with mock.patch.object(cartography.intel.gcp.googleapiclient.discovery, 'build') as mock_build, \
+            mock.patch.object(cartography.intel.gcp.googleapiclient.discovery_cache, 'get_static_doc') as mock_get_doc:
+        second = cartography.intel.gcp._get_compute_resource(credentials)
+    mock_build.assert_not_called()
+    mock_get_doc.assert_not_called()
+    assert first is not second
+    assert second.instances().list(project='p', zone='z').uri == first.instances().list(project='p', zone='z').uri
+
+
+@mock.patch.object(cartography.intel.gcp.crm, 'sync_gcp_projects')
+@mock.patch.object(cartography.intel.gcp, '_initialize_resources')
+@mock.patch.object(cartography.intel.gcp, '_sync_single_project')
+def test_sync_multiple_projects_concurrently(mock_sync_project, mock_initialize_resources, mock_sync_projects):
+    mock_initialize_resources.side_effect = lambda credentials: object()
+    synced = {}
+    mock_sync_project.side_effect = lambda session, resources, project_id, tag, params, **kwargs: synced.update(
+        {project_id: (threading.current_thread(), resources)},
+    )
+    neo4j_driver = mock.MagicMock()
+
+    cartography.intel.gcp._sync_multiple_projects(
+        mock.MagicMock(), mock.MagicMock(), PROJECTS, 1, {'UPDATE_TAG': 1},
+        neo4j_driver=neo4j_driver, credentials=AnonymousCredentials(), max_workers=3,
+    )
+
+    assert set(synced) == {p['projectId'] for p in PROJECTS}
+    assert neo4j_driver.session.call_count == len(PROJECTS)
+    # Every worker thread builds its resource objects once and never shares them.
+    resources_by_thread = {}
+    for thread, resources in synced.values():
+        assert thread is not threading.current_thread()
+        assert resources_by_thread.setdefault(thread, resources) is resources
+    assert mock_initialize_resources.call_count == len(resources_by_thread)
+
+
+@mock.patch.object(cartography.intel.gcp.crm, 'sync_gcp_projects')
+@mock.patch.object(cartography.intel.gcp, '_initialize_resources')
+@mock.patch.object(cartography.intel.gcp, '_sync_single_project')
+def test_sync_multiple_projects_concurrently_raises(mock_sync_project, mock_initialize_resources, mock_sync_projects):
+    def sync_project(session, resources, project_id, tag, params, **kwargs):
+        if project_id == 'project-0':
+            raise RuntimeError('denied')
+
+    mock_sync_project.side_effect = sync_project
+    with pytest.raises(RuntimeError):
+        cartography.intel.gcp._sync_multiple_projects(
+            mock.MagicMock(), mock.MagicMock(), PROJECTS, 1, {'UPDATE_TAG': 1},
+            neo4j_driver=mock.MagicMock(), credentials=AnonymousCredentials(), max_workers=2,
+        )
+
+
+@mock.patch.object(cartography.intel.gcp.crm, 'sync_gcp_projects')
+@mock.patch.object(cartography.intel.gcp, '_initialize_resources')
+@mock.patch.object(cartography.intel.gcp, '_sync_single_project')
+def test_sync_multiple_projects_concurrently_syncs_host_projects_first(
+    mock_sync_project, mock_initialize_resources, mock_sync_projects,
+):
+    calls = []
+    mock_sync_project.side_effect = lambda session, resources, project_id, tag, params, **kwargs: calls.append(
+        (project_id, threading.current_thread()),
+    )
+    resources = mock.MagicMock()
+    resources.compute.projects.return_value.get.side_effect = lambda project, fields: mock.Mock(
+        execute=mock.Mock(return_value={'xpnProjectStatus': 'HOST'} if project == 'project-3' else {}),
+    )
+
+    cartography.intel.gcp._sync_multiple_projects(
+        mock.MagicMock(), resources, PROJECTS, 1, {'UPDATE_TAG': 1},
+        neo4j_driver=mock.MagicMock(), credentials=AnonymousCredentials(), max_workers=3,
+    )
+
+    # The host project is synced on the calling thread before any service project starts.
+    assert calls[0] == ('project-3', threading.current_thread())
+    assert sorted(project_id for project_id, _ in calls[1:]) == [
+        p['projectId'] for p in PROJECTS if p['projectId'] != 'project-3'
+    ]
+
+
+@mock.patch.object(cartography.intel.gcp.crm, 'sync_gcp_projects')
+@mock.patch.object(cartography.intel.gcp, '_sync_single_project')
+def test_sync_multiple_projects_serially(mock_sync_project, mock_sync_projects):
+    neo4j_session = mock.MagicMock()
+    resources = mock.MagicMock()
+    cartography.intel.gcp._sync_multiple_projects(
+        neo4j_session, resources, PROJECTS, 1, {'UPDATE_TAG': 1}, neo4j_write_queue_size=2,
+    )
+    assert mock_sync_project.call_args_list == [
+        mock.call(neo4j_session, resources, p['projectId'], 1, {'UPDATE_TAG': 1}, neo4j_write_queue_size=2)
+        for p in PROJECTS
+    ]
@@ -0,0 +1,100 @@
+import threading
+from unittest import mock
+
+import pytest
+
+import cartography.intel.kubernetes
+from cartography.config import Config
+
+
+def _client(name, server=None):
+    client = mock.MagicMock()
+    client.name = name
+    client.server = server or f'https://{name}.example.com'
+    return client
+
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+@mock.patch.object(cartography.intel.kubernetes, 'run_cleanup_job')
+@mock.patch.object(cartography.intel.kubernetes, 'get_neo4j_driver')
+@mock.patch.object(cartography.intel.kubernetes, 'sync_services')
+@mock.patch.object(cartography.intel.kubernetes, 'sync_pods')
+@mock.patch.object(cartography.intel.kubernetes, 'sync_namespaces')
+@mock.patch.object(cartography.intel.kubernetes, 'get_k8s_clients')
+def test_start_k8s_ingestion(
+    mock_get_clients, mock_namespaces, mock_pods, mock_services, mock_get_driver, mock_cleanup, max_workers,
+):
+    mock_get_clients.return_value = [_client('a'), _client('b'), _client('c')]
+    threads = set()
+    mock_namespaces.side_effect = lambda session, client, update_tag: threads.add(threading.current_thread())
+    session = mock.MagicMock()
+    config = Config(
+        'bolt://localhost:7687', update_tag=1, k8s_kubeconfig='kubeconfig', k8s_cluster_max_workers=max_workers,
+    )
+
+    cartography.intel.kubernetes.start_k8s_ingestion(session, config)
+
+    assert mock_namespaces.call_count == mock_pods.call_count == mock_services.call_count == 3
+    mock_cleanup.assert_called_once()
+    if max_workers > 1:
+        mock_get_driver.return_value.close.assert_called_once()
+        assert threading.current_thread() not in threads
+    else:
+        mock_get_driver.assert_not_called()
+        assert threads == {threading.current_thread()}
+
+
+@pytest.mark.parametrize('max_workers', [1, 3])
+@mock.patch.object(cartography.intel.kubernetes, 'run_cleanup_job')
+@mock.patch.object(cartography.intel.kubernetes, 'get_neo4j_driver')
+@mock.patch.object(cartography.intel.kubernetes, 'sync_services')
+@mock.patch.object(cartography.intel.kubernetes, 'sync_pods')
+@mock.patch.object(cartography.intel.kubernetes, 'sync_namespaces')
+@mock.patch.object(cartography.intel.kubernetes, 'get_k8s_clients')
+def test_start_k8s_ingestion_isolates_failures(
+    mock_get_clients, mock_namespaces, mock_pods, mock_services, mock_get_driver, mock_cleanup, max_workers,
+):
+    mock_get_clients.return_value = [_client('a'), _client('b'), _client('c')]
+
+    def sync_namespaces(session, client, update_tag):
+        if client.name == 'a':
+            raise RuntimeError('unreachable')
+
+    mock_namespaces.side_effect = sync_namespaces
+    config = Config(
+        'bolt://localhost:7687', update_tag=1, k8s_kubeconfig='kubeconfig', k8s_cluster_max_workers=max_workers,
+    )
+
+    with pytest.raises(Exception, match='k8s clusters a'):
+        cartography.intel.kubernetes.start_k8s_ingestion(mock.MagicMock(), config)
+
+    # The other clusters are still synced, but nothing is cleaned up.
+    assert mock_services.call_count == 2
+    mock_cleanup.assert_not_called()
+
+
+@mock.patch.object(cartography.intel.kubernetes, 'sync_services')
+@mock.patch.object(cartography.intel.kubernetes, 'sync_pods')
+@mock.patch.object(cartography.intel.kubernetes, 'sync_namespaces')
+def test_sync_clusters_runs_contexts_of_one_server_on_one_worker(mock_namespaces, mock_pods, mock_services):
+    clients = [
+        _client('a-admin', 'https://a.example.com'),
+        _client('b', 'https://b.example.com'),
+        _client('a-readonly', 'https://a.example.com'),
+    ]
+    threads = {}
+
+    def sync_namespaces(session, client, update_tag):
+        threads[client.name] = threading.current_thread()
+        if client.name == 'a-readonly':
+            raise RuntimeError('forbidden')
+
+    mock_namespaces.side_effect = sync_namespaces
+
+    failed = cartography.intel.kubernetes._sync_clusters(
+        mock.MagicMock(), clients, 1, neo4j_driver=mock.MagicMock(), max_workers=3,
+    )
+
+    assert failed == ['a-readonly']
+    assert threads['a-admin'] is threads['a-readonly']
+    assert mock_namespaces.call_count == 3
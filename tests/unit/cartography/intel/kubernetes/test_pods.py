@@ -0,0 +1,101 @@
+from unittest import mock
+
+import pytest
+from kubernetes.client.rest import ApiException
+
+from cartography.intel.kubernetes.pods import sync_pods
+from cartography.intel.kubernetes.util import list_in_pages
+from tests.data.kubernetes.namespaces import GET_CLUSTER_DATA
+
+
+def _pod(uid):
+    pod = mock.MagicMock()
+    pod.metadata.uid = uid
+    pod.metadata.name = f"pod-{uid}"
+    pod.metadata.namespace = "default"
+    pod.metadata.labels = {"app": uid}
+    pod.metadata.creation_timestamp = None
+    pod.metadata.deletion_timestamp = None
+    pod.spec.containers = []
+    pod.status.container_statuses = None
+    return pod
+
+
+def _paged_list(items, page_size_calls):
+    def list_func(limit=None, _continue=None):
+        page_size_calls.append((limit, _continue))
+        start = int(_continue or 0)
+        response = mock.MagicMock()
+        response.items = items[start:start + limit]
+        response.metadata._continue = str(start + limit) if start + limit < len(items) else None
+        return response
+    return list_func
+
+
+def test_list_in_pages():
+    calls = []
+    pages = list(list_in_pages(_paged_list(list(range(5)), calls), 2))
+    assert pages == [[0, 1], [2, 3], [4]]
+    assert calls == [(2, None), (2, '2'), (2, '4')]
+
+
+def _expiring(list_func, expire_calls):
+    """
+    Wrap a paged list so that the calls numbered in `expire_calls` fail with an expired continue token.
+    """
+    calls = []
+
+    def expiring_list_func(limit=None, _continue=None):
+        calls.append(_continue)
+        if len(calls) in expire_calls:
+            raise ApiException(status=410, reason='Gone')
+        return list_func(limit=limit, _continue=_continue)
+    return expiring_list_func
+
+
+def test_list_in_pages_restarts_after_expired_continue_token():
+    calls = []
+    pages = list(list_in_pages(_expiring(_paged_list(list(range(5)), calls), {3}), 2))
+    # The third call, for the second page, failed; the listing started over from the first page.
+    assert pages == [[0, 1], [2, 3], [0, 1], [2, 3], [4]]
+    assert calls == [(2, None), (2, '2'), (2, None), (2, '2'), (2, '4')]
+
+
+def test_list_in_pages_gives_up_after_restart_limit():
+    list_func = _expiring(_paged_list(list(range(5)), []), {2, 4, 6, 8})
+    with pytest.raises(ApiException):
+        list(list_in_pages(list_func, 2))
+
+
+def test_list_in_pages_raises_other_errors():
+    list_func = _expiring(_paged_list(list(range(5)), []), {1})
+    with pytest.raises(ApiException):
+        list(list_in_pages(list_func, 2))
+
+
+def test_sync_pods_in_pages():
+    client = mock.MagicMock()
+    client.core.list_pod_for_all_namespaces.side_effect = _paged_list([_pod(str(i)) for i in range(5)], [])
+    session = mock.MagicMock()
+
+    pods = sync_pods(session, client, 1, GET_CLUSTER_DATA, page_size=2)
+
+    loaded = [c[1]['pods'] for c in session.run.call_args_list]
+    assert [[p['uid'] for p in page] for page in loaded] == [['0', '1'], ['2', '3'], ['4']]
+    assert loaded[0][0]['cluster_uid'] == GET_CLUSTER_DATA['uid']
+    assert pods == [
+        {"uid": str(i), "name": f"pod-{i}", "namespace": "default", "labels": {"app": str(i)}} for i in range(5)
+    ]
+
+
+def test_sync_pods_in_pages_returns_relisted_pods_once():
+    client = mock.MagicMock()
+    client.core.list_pod_for_all_namespaces.side_effect = _expiring(
+        _paged_list([_pod(str(i)) for i in range(3)], []), {2},
+    )
+    session = mock.MagicMock()
+
+    pods = sync_pods(session, client, 1, GET_CLUSTER_DATA, page_size=2)
+
+    assert session.run.call_count == 3
+    assert [p['uid'] for p in pods] == ['0', '1', '2']
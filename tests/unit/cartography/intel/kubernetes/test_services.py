@@ -0,0 +1,74 @@
+from unittest import mock
+
+from cartography.intel.kubernetes.services import build_pod_label_index
+from cartography.intel.kubernetes.services import get_selected_pods
+from cartography.intel.kubernetes.services import get_services
+from cartography.intel.kubernetes.services import sync_services
+from tests.data.kubernetes.namespaces import GET_CLUSTER_DATA
+from tests.data.kubernetes.pods import GET_PODS_DATA
+
+PODS = [
+    {"uid": "a", "labels": {"app": "web", "tier": "frontend"}},
+    {"uid": "b", "labels": {"app": "web", "tier": "backend"}},
+    {"uid": "c", "labels": None},
+    {"uid": "d", "labels": {"app": "web", "tier": "frontend", "canary": "true"}},
+]
+
+
+def test_build_pod_label_index():
+    index = build_pod_label_index(PODS)
+    assert index[("app", "web")] == {0, 1, 3}
+    assert index[("tier", "frontend")] == {0, 3}
+    assert ("tier", "web") not in index
+
+
+def test_get_selected_pods():
+    index = build_pod_label_index(PODS)
+    assert [p["uid"] for p in get_selected_pods(PODS, index, {"app": "web"})] == ["a", "b", "d"]
+    assert [p["uid"] for p in get_selected_pods(PODS, index, {"tier": "frontend", "app": "web"})] == ["a", "d"]
+    assert get_selected_pods(PODS, index, {"app": "web", "missing": "label"}) == []
+    assert get_selected_pods(PODS, index, {}) == []
+    assert get_selected_pods(PODS, index, None) == []
+
+
+def _service(name, selector):
+    service = mock.MagicMock()
+    service.metadata.name = name
+    service.metadata.creation_timestamp = None
+    service.metadata.deletion_timestamp = None
+    service.spec.selector = selector
+    service.status.load_balancer.ingress = None
+    return service
+
+
+def test_get_services():
+    client = mock.MagicMock()
+    client.core.list_service_for_all_namespaces.return_value.items = [
+        _service("my-service", {"key1": "val3"}),
+        _service("no-selector", None),
+    ]
+    services = get_services(client, GET_CLUSTER_DATA, GET_PODS_DATA)
+    assert [s["name"] for s in services] == ["my-service", "no-selector"]
+    assert services[0]["pods"] == [GET_PODS_DATA[1]]
+    assert services[1]["pods"] == []
+
+
+def test_sync_services_in_pages():
+    client = mock.MagicMock()
+    pages = [
+        mock.MagicMock(items=[_service("first", {"key1": "val3"})]),
+        mock.MagicMock(items=[_service("second", {"key1": "val1"})]),
+    ]
+    pages[0].metadata._continue = "token"
+    pages[1].metadata._continue = None
+    client.core.list_service_for_all_namespaces.side_effect = pages
+    session = mock.MagicMock()
+
+    sync_services(session, client, 1, GET_CLUSTER_DATA, GET_PODS_DATA, page_size=1)
+
+    loaded = [c[1]['services'] for c in session.run.call_args_list]
+    assert [[s["name"] for s in page] for page in loaded] == [["first"], ["second"]]
+    assert loaded[1][0]["pods"] == [GET_PODS_DATA[0]]
+    assert client.core.list_service_for_all_namespaces.call_args_list == [
+        mock.call(limit=1, _continue=None), mock.call(limit=1, _continue="token"),
+    ]
@@ -0,0 +1,56 @@
+from unittest import mock
+
+import neo4j.exceptions
+
+from cartography.intel import create_indexes
+
+
+def _session(failures):
+    """
+    Mock session that records the statements it runs. `failures` maps a statement to how many times it fails.
+    """
+    session = mock.MagicMock()
+    session.statements = []
+    failures = dict(failures)
+
+    def run(statement):
+        session.statements.append(statement)
+        result = mock.MagicMock()
+        if failures.get(statement):
+            failures[statement] -= 1
+            result.consume.side_effect = neo4j.exceptions.ClientError(statement)
+        return result
+
+    session.run.side_effect = run
+    return session
+
+
+CONSTRAINT = "CREATE CONSTRAINT ON (n:AWSPrincipal) ASSERT n.arn IS UNIQUE"
+
+
+def test_create_unique_constraint():
+    session = _session({})
+    assert create_indexes.create_unique_constraint(session, 'AWSPrincipal', 'arn')
+    assert session.statements == [CONSTRAINT]
+
+
+def test_create_unique_constraint_replaces_index():
+    # The first attempt fails because of the existing index, the one after dropping the index succeeds.
+    session = _session({CONSTRAINT: 1})
+    assert create_indexes.create_unique_constraint(session, 'AWSPrincipal', 'arn')
+    assert session.statements == [CONSTRAINT, "DROP INDEX ON :AWSPrincipal(arn)", CONSTRAINT]
+
+
+def test_create_unique_constraint_keeps_index_with_duplicates():
+    session = _session({CONSTRAINT: 2})
+    assert not create_indexes.create_unique_constraint(session, 'AWSPrincipal', 'arn')
+    assert session.statements == [
+        CONSTRAINT, "DROP INDEX ON :AWSPrincipal(arn)", CONSTRAINT, "CREATE INDEX ON :AWSPrincipal(arn)",
+    ]
+
+
+def test_unique_node_keys_have_no_plain_index():
+    # A plain index on a constrained key makes the constraint, or the index, fail to be created.
+    statements = create_indexes.get_index_statements()
+    for label, prop in create_indexes.UNIQUE_NODE_KEYS:
+        assert f"CREATE INDEX ON :{label}({prop});" not in statements
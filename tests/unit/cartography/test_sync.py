@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from cartography.config import Config
+from cartography.sync import build_default_sync
+from cartography.sync import Sync
+
+
+def _recording_stage(name, calls, lock=None):
+    def stage(neo4j_session, config):
+        if lock:
+            with lock:
+                calls.append(name)
+        else:
+            calls.append(name)
+    return stage
+
+
+def test_run_serial_preserves_stage_order(mocker):
+    calls = []
+    sync = Sync()
+    sync.add_stages([
+        ('a', _recording_stage('a', calls)),
+        ('b', _recording_stage('b', calls), ['a']),
+        ('c', _recording_stage('c', calls)),
+    ])
+    driver = mocker.MagicMock()
+    sync.run(driver, Config('bolt://localhost', update_tag=1))
+    assert calls == ['a', 'b', 'c']
+    driver.session.assert_called_once()
+
+
+def test_run_concurrent_respects_dependencies(mocker):
+    calls = []
+    lock = threading.Lock()
+    sync = Sync()
+    sync.add_stages([
+        ('indexes', _recording_stage('indexes', calls, lock)),
+        ('x', _recording_stage('x', calls, lock), ['indexes']),
+        ('y', _recording_stage('y', calls, lock), ['indexes']),
+        ('z', _recording_stage('z', calls, lock), ['indexes', 'x']),
+        ('analysis', _recording_stage('analysis', calls, lock), ['x', 'y', 'z', 'not-registered']),
+    ])
+    driver = mocker.MagicMock()
+    sync.run(driver, Config('bolt://localhost', update_tag=1, sync_max_workers=4))
+
+    assert sorted(calls) == ['analysis', 'indexes', 'x', 'y', 'z']
+    assert calls[0] == 'indexes'
+    assert calls[-1] == 'analysis'
+    assert calls.index('x') < calls.index('z')
+    # Every stage gets its own session
+    assert driver.session.call_count == 5
+
+
+def test_run_concurrent_stops_scheduling_after_failure(mocker):
+    calls = []
+
+    def failing_stage(neo4j_session, config):
+        raise RuntimeError('boom')
+
+    sync = Sync()
+    sync.add_stages([
+        ('a', failing_stage),
+        ('b', _recording_stage('b', calls), ['a']),
+    ])
+    with pytest.raises(RuntimeError):
+        sync.run(mocker.MagicMock(), Config('bolt://localhost', update_tag=1, sync_max_workers=2))
+    assert calls == []
+
+
+def test_run_rejects_circular_dependencies(mocker):
+    sync = Sync()
+    sync.add_stages([
+        ('a', _recording_stage('a', []), ['b']),
+        ('b', _recording_stage('b', []), ['a']),
+    ])
+    with pytest.raises(ValueError):
+        sync.run(mocker.MagicMock(), Config('bolt://localhost', update_tag=1, sync_max_workers=2))
+
+
+def test_default_sync_runs_analysis_last():
+    sync = build_default_sync()
+    assert sync.stage_names[-1] == 'analysis'
+    assert set(sync._dependencies['analysis']) == set(sync.stage_names) - {'analysis'}
+    assert 'crowdstrike' in sync._dependencies['cve']
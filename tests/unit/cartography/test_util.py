@@ -1,9 +1,13 @@
+import threading
+import time
+
 import botocore
 import pytest
 
 from cartography import util
 from cartography.util import aws_handle_regions
 from cartography.util import batch
+from cartography.util import run_with_dependencies
 
 
 def test_run_analysis_job_default_package(mocker):
@@ -84,3 +88,32 @@ def test_batch(mocker):
     assert actual == expected
     # Also check for empty input
     assert batch([], 3) == []
+
+
+def test_run_with_dependencies_serial_order():
+    calls = []
+    tasks = {name: (lambda name=name: calls.append(name)) for name in ['a', 'b', 'c', 'd']}
+    run_with_dependencies(tasks, {'a': ['c'], 'b': ['not-a-task']})
+    # 'a' waits for 'c'; everything else keeps its given order.
+    assert calls == ['b', 'c', 'a', 'd']
+
+
+def test_run_with_dependencies_concurrent():
+    calls = []
+    lock = threading.Lock()
+
+    def task(name):
+        time.sleep(0.01)
+        with lock:
+            calls.append(name)
+
+    tasks = {name: (lambda name=name: task(name)) for name in ['a', 'b', 'c', 'last']}
+    run_with_dependencies(tasks, {'b': ['a'], 'last': ['a', 'b', 'c']}, max_workers=3)
+    assert sorted(calls) == ['a', 'b', 'c', 'last']
+    assert calls.index('a') < calls.index('b')
+    assert calls[-1] == 'last'
+
+
+def test_run_with_dependencies_rejects_cycles():
+    with pytest.raises(ValueError):
+        run_with_dependencies({'a': lambda: None, 'b': lambda: None}, {'a': ['b'], 'b': ['a']})
@@ -1,6 +1,10 @@
 import pytest
 
+from cartography.driftdetect.detect_deviations import compare_states
 from cartography.driftdetect.detect_deviations import perform_drift_detection
+from cartography.driftdetect.detect_deviations import perform_keyed_drift_detection
+from cartography.driftdetect.model import State
+from cartography.driftdetect.reporter import get_drift_as_json
 from cartography.driftdetect.serializers import StateSchema
 from cartography.driftdetect.storage import FileSystem
 
@@ -37,3 +41,43 @@ def test_drift_detection_errors():
     start_state.validation_query = "Invalid Validation Query"
     with pytest.raises(ValueError):
         perform_drift_detection(start_state, end_state)
+
+
+def test_compare_states_keeps_duplicates_and_order():
+    start_state = State('s', 'q', ['a', 'b'], [['1', '2']])
+    end_state = State('s', 'q', ['a', 'b'], [['3', '4|5'], ['1', '2'], ['6', '7'], ['3', '4|5']])
+    assert compare_states(start_state, end_state) == [['3', ['4', '5']], ['6', '7'], ['3', ['4', '5']]]
+
+
+def test_keyed_drift_detection():
+    properties = ['n.id', 'n.name', 'n.tags']
+    start_state = State('s', 'q', properties, [['1', 'a', 'x'], ['2', 'b', 'x|y'], ['3', 'c', 'z']], 'n.id')
+    end_state = State('s', 'q', properties, [['1', 'a', 'x'], ['2', 'b2', 'x|y'], ['4', 'd', 'z']], 'n.id')
+    new_results, missing_results, changed_results = perform_keyed_drift_detection(start_state, end_state)
+    assert new_results == [['4', 'd', 'z']]
+    assert missing_results == [['3', 'c', 'z']]
+    assert changed_results == [(['2', 'b', ['x', 'y']], ['2', 'b2', ['x', 'y']])]
+
+    drift = get_drift_as_json(new_results, missing_results, end_state.name, properties, changed_results)
+    assert drift['changed'] == [
+        {
+            'before': {'n.id': '2', 'n.name': 'b', 'n.tags': ['x', 'y']},
+            'after': {'n.id': '2', 'n.name': 'b2', 'n.tags': ['x', 'y']},
+        },
+    ]
+
+
+def test_keyed_drift_detection_errors():
+    start_state = State('s', 'q', ['n.id'], [], 'n.missing')
+    end_state = State('s', 'q', ['n.id'], [], 'n.missing')
+    with pytest.raises(ValueError):
+        perform_keyed_drift_detection(start_state, end_state)
+
+
+def test_state_schema_primary_key():
+    data = FileSystem.load("tests/data/test_cli_detectors/detector/1.json")
+    assert StateSchema().load(data).primary_key is None
+    data['primary_key'] = 'd.test'
+    state = StateSchema().load(data)
+    assert state.primary_key == 'd.test'
+    assert StateSchema().dump(state)['primary_key'] == 'd.test'
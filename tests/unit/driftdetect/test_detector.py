@@ -1,7 +1,14 @@
+import json
+import shutil
 from unittest.mock import MagicMock
+from unittest.mock import patch
 
+from cartography.driftdetect.config import UpdateConfig
 from cartography.driftdetect.detect_deviations import compare_states
+from cartography.driftdetect.get_states import get_query_state
 from cartography.driftdetect.get_states import get_state
+from cartography.driftdetect.get_states import iter_sorted_results
+from cartography.driftdetect.get_states import run_get_states
 from cartography.driftdetect.model import State
 from cartography.driftdetect.serializers import StateSchema
 from cartography.driftdetect.storage import FileSystem
@@ -145,3 +152,52 @@ def test_json_loader():
     assert state.name == "Test-Expectations"
     assert state.validation_query == "MATCH (d) RETURN d.test"
     assert state.results == [['1'], ['2'], ['3'], ['4'], ['5'], ['6']]
+
+
+def test_iter_sorted_results_external_sort():
+    records = [{'a': str(i % 7), 'b': [str(i), 'x']} for i in range(20)]
+    expected = sorted([str(i % 7), '|'.join(sorted([str(i), 'x']))] for i in range(20))
+    assert list(iter_sorted_results(records, chunk_size=3)) == expected
+    assert list(iter_sorted_results(records)) == expected
+    assert list(iter_sorted_results([])) == []
+
+
+def _mock_result(records, keys):
+    mock_result = MagicMock()
+    mock_result.keys.return_value = keys
+    mock_result.__iter__.side_effect = records.__iter__
+    return mock_result
+
+
+def test_get_query_state_writes_state_file(tmp_path):
+    shutil.copytree("tests/data/test_update_detectors/test_detector", tmp_path / "detector")
+    query_directory = str(tmp_path / "detector")
+    keys = ["d.test", "d.test2", "d.test3"]
+    records = [{"d.test": "2", "d.test2": "9", "d.test3": ["30", "16"]}, {"d.test": "1", "d.test2": "8", "d.test3": []}]
+    mock_session = MagicMock()
+    mock_session.run.return_value = _mock_result(records, keys)
+
+    get_query_state(mock_session, query_directory, StateSchema(), FileSystem, "new.json")
+
+    state = StateSchema().load(FileSystem.load(str(tmp_path / "detector" / "new.json")))
+    assert state.name == "test_detector"
+    assert state.properties == keys
+    assert state.results == [["1", "8", ""], ["2", "9", "16|30"]]
+
+
+@patch('cartography.driftdetect.get_states.GraphDatabase')
+def test_run_get_states_concurrently(mock_graph_database, tmp_path):
+    for name in ["a", "b", "c"]:
+        shutil.copytree("tests/data/test_update_detectors/test_detector", tmp_path / name)
+    keys = ["d.test", "d.test2", "d.test3"]
+    mock_session = MagicMock()
+    mock_session.run.side_effect = lambda query: _mock_result([{k: "1" for k in keys}], keys)
+    mock_graph_database.driver.return_value.session.return_value.__enter__.return_value = mock_session
+
+    run_get_states(UpdateConfig(str(tmp_path), "bolt://localhost:7687", max_workers=3))
+
+    assert mock_session.run.call_count == 3
+    for name in ["a", "b", "c"]:
+        shortcut = json.loads((tmp_path / name / "shortcut.json").read_text())
+        state = FileSystem.load(str(tmp_path / name / shortcut["shortcuts"]["most-recent"]))
+        assert state["results"] == [["1", "1", "1"]]
@@ -0,0 +1,65 @@
+import shutil
+from unittest.mock import MagicMock
+
+import pytest
+
+from cartography.driftdetect.config import GetDriftConfig
+from cartography.driftdetect.detect_deviations import run_drift_detection
+from cartography.driftdetect.get_states import update_query_directory
+from cartography.driftdetect.storage import CompactFileSystem
+from cartography.driftdetect.storage import FileSystem
+from cartography.driftdetect.storage import get_storage
+
+
+def test_compact_state_round_trip(tmp_path):
+    data = FileSystem.load("tests/data/test_cli_detectors/detector/1.json")
+    results = data.pop('results')
+    path = str(tmp_path / "1.state")
+    CompactFileSystem.write_state(data, iter(results), path)
+    assert FileSystem.load_state(path) == {**data, 'results': results}
+
+    CompactFileSystem.write_state(data, iter([]), path)
+    assert FileSystem.load_state(path)['results'] == []
+
+
+def test_json_state_round_trip(tmp_path):
+    data = FileSystem.load("tests/data/test_cli_detectors/detector/1.json")
+    results = data.pop('results')
+    path = str(tmp_path / "1.json")
+    FileSystem.write_state(data, iter(results), path)
+    assert CompactFileSystem.load_state(path) == {**data, 'results': results}
+
+
+def test_compact_state_rejects_ragged_results(tmp_path):
+    with pytest.raises(ValueError):
+        CompactFileSystem.write_state({}, iter([['1', '2'], ['3']]), str(tmp_path / "1.state"))
+    assert not list(tmp_path.iterdir())
+
+
+def test_get_storage():
+    assert get_storage(None) is FileSystem
+    assert get_storage('json') is FileSystem
+    assert get_storage('compact') is CompactFileSystem
+    with pytest.raises(ValueError):
+        get_storage('parquet')
+
+
+def test_compact_storage_selected_by_template(tmp_path):
+    query_directory = tmp_path / "detector"
+    shutil.copytree("tests/data/test_update_detectors/test_detector", query_directory)
+    template = FileSystem.load(str(query_directory / "template.json"))
+    FileSystem.write({**template, 'storage': 'compact'}, str(query_directory / "template.json"))
+    keys = ["d.test", "d.test2", "d.test3"]
+    mock_result = MagicMock()
+    mock_result.keys.return_value = keys
+    mock_result.__iter__.side_effect = [{k: "1" for k in keys}, {k: "36" for k in keys}].__iter__
+    mock_driver = MagicMock()
+    mock_driver.session.return_value.__enter__.return_value.run.return_value = mock_result
+
+    update_query_directory(mock_driver, str(query_directory), "2019.1.1.0.0.3.1.1.0")
+
+    assert FileSystem.load(str(query_directory / "shortcut.json"))['shortcuts']['most-recent'] == \
+        "2019.1.1.0.0.3.1.1.0.state"
+    # States written by different storages can be compared.
+    drift = run_drift_detection(GetDriftConfig(str(query_directory), "2019-01-01_00_00_01.json", "most-recent"))
+    assert {'d.test': '36', 'd.test2': '36', 'd.test3': '36'} in drift['added']